@@ -21,6 +21,8 @@ from routes.my_devices import my_devices_bp
 from routes.settings import settings_bp
 from routes.actions import actions_bp
 from routes.analytics import analytics_bp
+from routes.metrics import metrics_bp, init_request_metrics
+from models.n_plus_one import init_n_plus_one_detection
 
 # إنشاء التطبيق
 app = Flask(__name__)
@@ -40,6 +42,13 @@ app.register_blueprint(my_devices_bp)
 app.register_blueprint(settings_bp)
 app.register_blueprint(actions_bp)
 app.register_blueprint(analytics_bp)
+app.register_blueprint(metrics_bp)
+
+# قياس زمن الطلبات واستعلامات قاعدة البيانات (يُعرض على /metrics)
+init_request_metrics(app)
+
+# كشف الاستعلامات المتكررة داخل الطلب (N+1) في وضع التطوير والاختبار
+init_n_plus_one_detection(app)
 
 # تهيئة قاعدة البيانات عند بدء التطبيق
 with app.app_context():
@@ -193,4 +202,9 @@ if __name__ == '__main__':
     print("\nالتطبيق يعمل على: http://localhost:5000")
     print("\n" + "=" * 60 + "\n")
     
+    # الفحص الدوري للأجهزة في الخلفية (في العملية التي تخدم الطلبات فقط وليس عملية المراقبة لإعادة التحميل)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from ml_models.fleet_sweeper import fleet_sweeper
+        fleet_sweeper.start(app)
+    
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+إنشاء أسطول أجهزة اصطناعي لقياس الأداء
+قاعدة بيانات مؤقتة بنفس مخطط device_monitoring.db تُملأ بعدد محدد من الأجهزة
+والقياسات التاريخية والتنبيهات، بنفس البذرة العشوائية تعطي نفس البيانات دائماً
+"""
+
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from models.alerts import alert_fingerprint
+
+DEVICE_TYPES = ('computer', 'laptop', 'server')
+ALERT_TYPES = ('high_cpu', 'high_ram', 'high_temperature', 'low_disk_space', 'low_battery')
+# توزيع حالات الأجهزة (سليم، تحذير، حرج)
+STATUS_WEIGHTS = (('healthy', 80), ('warning', 15), ('critical', 5))
+
+
+def create_database(path, schema_source):
+    """إنشاء قاعدة بيانات فارغة بنفس مخطط قاعدة بيانات موجودة
+
+    الترحيلات (migrate_db) تُطبق بعدها عند تشغيل init_db من التطبيق
+    """
+    source = sqlite3.connect(schema_source)
+    try:
+        statements = source.execute('''
+            SELECT sql FROM sqlite_master
+            WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+            ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END
+        ''').fetchall()
+    finally:
+        source.close()
+
+    db = sqlite3.connect(path)
+    try:
+        for (sql,) in statements:
+            db.execute(sql)
+        db.commit()
+    finally:
+        db.close()
+
+
+def populate(path, devices=100, history=20, interval_seconds=60, seed=42):
+    """ملء قاعدة البيانات بأسطول اصطناعي
+
+    devices: عدد الأجهزة، history: عدد القياسات التاريخية لكل جهاز
+    يعيد قائمة device_token للأجهزة (لقياس استقبال القياسات)
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    db = sqlite3.connect(path)
+
+    try:
+        # مستخدم أدمن ومستخدم عادي لكل 10 أجهزة
+        user_count = max(1, devices // 10)
+        db.executemany('''
+            INSERT INTO users (username, password, full_name, role)
+            VALUES (?, ?, ?, ?)
+        ''', [('bench_admin', 'x', 'Benchmark Admin', 'admin')] + [
+            (f'bench_user_{i}', 'x', f'Benchmark User {i}', 'user') for i in range(user_count)
+        ])
+        user_ids = [row[0] for row in db.execute("SELECT id FROM users WHERE role = 'user' ORDER BY id")]
+
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        weights = [weight for _, weight in STATUS_WEIGHTS]
+        device_rows = []
+        for i in range(devices):
+            device_rows.append((
+                f'bench-{i:05d}',
+                rng.choice(DEVICE_TYPES),
+                f'مبنى {i % 20 + 1}',
+                f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}',
+                '02:42:{:02x}:{:02x}:{:02x}:{:02x}'.format(i >> 24 & 0xff, i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff),
+                'Linux 6.1',
+                'x86_64',
+                rng.choice((4, 8, 16, 32)),
+                rng.choice((256, 512, 1024)),
+                rng.choices(statuses, weights)[0],
+                f'bench-token-{i}',
+                now - timedelta(seconds=rng.randint(0, 3600)),
+                # 20% من الأجهزة بدون مستخدم (تسجيل تلقائي)
+                rng.choice(user_ids) if rng.random() < 0.8 else None
+            ))
+        db.executemany('''
+            INSERT INTO devices
+            (name, device_type, location, ip_address, mac_address, operating_system, processor,
+             ram_total, disk_total, status, device_token, last_seen, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', device_rows)
+        device_ids = [row[0] for row in db.execute('SELECT id FROM devices ORDER BY id')]
+
+        # القياسات التاريخية: مستوى أساسي لكل جهاز مع تذبذب عشوائي
+        for device_id in device_ids:
+            base_cpu = rng.uniform(5, 60)
+            base_ram = rng.uniform(30, 80)
+            disk = rng.uniform(20, 95)
+            base_temperature = rng.uniform(40, 60)
+            battery = rng.uniform(20, 100) if rng.random() < 0.3 else None
+            # العدادات بالبايت وتُحفظ MB تراكمية (صيغة العميل)، والمعدل بايت/ثانية
+            network_in = rng.randint(0, 10 ** 9)
+            network_out = rng.randint(0, 10 ** 9)
+
+            rows = []
+            for step in range(history, 0, -1):
+                in_rate = rng.uniform(1, 1000) * 1024
+                out_rate = rng.uniform(1, 100) * 1024
+                network_in += int(in_rate * interval_seconds)
+                network_out += int(out_rate * interval_seconds)
+                cpu = min(100, max(0, base_cpu + rng.gauss(0, 10)))
+                rows.append((
+                    device_id,
+                    round(cpu, 2),
+                    round(min(100, max(0, base_ram + rng.gauss(0, 5))), 2),
+                    round(disk, 2),
+                    round(base_temperature + cpu * 0.2 + rng.gauss(0, 1), 2),
+                    round(battery, 2) if battery is not None else None,
+                    round(network_in / 1024 ** 2, 2),
+                    round(network_out / 1024 ** 2, 2),
+                    round(in_rate, 2),
+                    round(out_rate, 2),
+                    now - timedelta(seconds=step * interval_seconds)
+                ))
+            db.executemany('''
+                INSERT INTO device_metrics
+                (device_id, cpu_usage, ram_usage, disk_usage, temperature, battery_level,
+                 network_in, network_out, network_in_rate, network_out_rate, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+        # تنبيهات: نوع واحد لكل جهاز لـ 20% من الأجهزة، نصفها مفتوح
+        alert_rows = []
+        for device_id in rng.sample(device_ids, max(1, devices // 5)):
+            alert_type = rng.choice(ALERT_TYPES)
+            severity = rng.choice(('warning', 'critical'))
+            status = rng.choice(('active', 'acknowledged', 'resolved', 'resolved'))
+            alert_rows.append((
+                device_id,
+                alert_type,
+                severity,
+                f'bench-{device_id}: {alert_type}',
+                status,
+                now - timedelta(seconds=rng.randint(0, 7 * 24 * 3600)),
+                alert_fingerprint(device_id, alert_type, severity)
+            ))
+        db.executemany('''
+            INSERT INTO alerts (device_id, alert_type, severity, message, status, created_at, fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', alert_rows)
+
+        db.commit()
+        return [row[0] for row in db.execute('SELECT device_token FROM devices ORDER BY id')]
+    finally:
+        db.close()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+قياس أداء المسارات الحرجة على أساطيل اصطناعية
+يُنشأ لكل حجم أسطول قاعدة بيانات مؤقتة (benchmarks/fleet.py) وتُقاس عليها:
+استقبال القياسات، قائمة الأجهزة، إحصائيات لوحة التحكم، جميع واجهات التحليلات،
+فحص الأجهزة، والتنبؤ والتدريب. النتائج تُحفظ كـ JSON وتُقارن مع نتائج أساسية
+(baseline) لاكتشاف التراجع في الأداء
+
+استخدام:
+    python benchmarks/run_benchmarks.py --fleets 100,1000,10000 --history 20
+    python benchmarks/run_benchmarks.py --save-baseline          # حفظ النتائج كأساس للمقارنة
+    python benchmarks/run_benchmarks.py --fail-on-regression     # رمز خروج 1 عند التراجع
+    python benchmarks/run_benchmarks.py --query-profile          # أكثر الاستعلامات كلفة لكل أسطول
+
+كل حجم أسطول يُقاس في عملية Python منفصلة حتى لا تنتقل الحالة المحفوظة في الذاكرة
+(التخزين المؤقت للتنبؤات، مخزن الخصائص) بين الأحجام، والنموذج المدرب يُحفظ في
+مجلد مؤقت فلا تتغير ملفات ml_models
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from models.metrics import percentile
+
+BENCHMARKS_DIR = os.path.join(REPO_ROOT, 'benchmarks')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+ANALYTICS_ENDPOINTS = ('kpi', 'performance', 'devices-distribution', 'alerts-analysis',
+                       'resource-usage', 'trends', 'predictions', 'export')
+
+# عينة ثابتة للتنبؤ
+SAMPLE_DEVICE = {'cpu_usage': 72.5, 'ram_usage': 81.0, 'disk_usage': 64.0, 'temperature': 68.0, 'battery_level': None}
+SAMPLE_HISTORY = [
+    {'cpu_usage': 50 + i * 2.5, 'ram_usage': 70 + i, 'temperature': 55 + i * 1.3}
+    for i in range(10)
+]
+
+
+def measure(func, repeat, number=1, warmup=1):
+    """قياس زمن استدعاء واحد: repeat عينة، كل عينة متوسط number استدعاء
+
+    رسائل print من الكود المقاس لا تُطبع (حتى لا تؤثر الطباعة على الزمن)
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(warmup):
+            func()
+
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - started) / number)
+
+    samples.sort()
+    return {
+        'repeat': repeat,
+        'number': number,
+        'min_ms': round(samples[0] * 1000, 3),
+        'median_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3)
+    }
+
+
+def _http_case(client, method, path, **kwargs):
+    """استدعاء endpoint يفشل إذا لم يكن الرد ناجحاً (حتى لا يُقاس رد خطأ سريع)"""
+    def call():
+        response = client.open(path, method=method, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method} {path} -> {response.status_code}')
+        return response
+    return call
+
+
+def run_fleet(size, history, repeat, only, seed, work_dir, query_profile=False):
+    """إنشاء أسطول بحجم size وقياس جميع الحالات عليه (في عملية --worker منفصلة)"""
+    os.chdir(REPO_ROOT)
+    os.environ.setdefault('FLEET_SWEEP_INTERVAL', '0')
+
+    from benchmarks.fleet import create_database, populate
+    import models.database
+
+    db_path = os.path.join(work_dir, f'fleet_{size}.db')
+    setup_started = time.time()
+    create_database(db_path, os.path.join(REPO_ROOT, models.database.DATABASE))
+    models.database.DATABASE = db_path
+
+    # استيراد التطبيق يطبق الترحيلات على قاعدة البيانات المؤقتة
+    from app import app
+    tokens = populate(db_path, devices=size, history=history, seed=seed)
+
+    import ml_models.smart_predictor as smart_predictor_module
+    from ml_models.ml_trainer import MLTrainer
+
+    # نموذج مدرب على بيانات الأسطول في مجلد مؤقت (النتائج لا تعتمد على ملفات ml_models)
+    trainer = MLTrainer()
+    trainer.model_file = os.path.join(work_dir, 'trained_model.pkl')
+    trainer.scaler_file = os.path.join(work_dir, 'scaler.pkl')
+    trainer.model_info_file = os.path.join(work_dir, 'model_info.json')
+    with app.app_context(), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        trainer.train_model(use_synthetic=True, use_db=True)
+    smart_predictor_module.ml_trainer = trainer
+    predictor = smart_predictor_module.smart_predictor
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['role'] = 'admin'
+        session['username'] = 'bench_admin'
+
+    from models.query_profiler import query_profiler
+    if query_profile:
+        # بعد التهيئة والتدريب الأولي حتى لا تظهر استعلاماتهما
+        query_profiler.reset()
+        query_profiler.enabled = True
+
+    ingest_state = {'next': 0}
+
+    def ingest():
+        token = tokens[ingest_state['next'] % len(tokens)]
+        ingest_state['next'] += 1
+        # عدادات الشبكة MB تراكمية (صيغة العميل)، أعلى من عدادات الأسطول المولد
+        response = client.post('/devices/api/report', headers={'X-Device-Token': token}, json={
+            'cpu_usage': 42.0, 'ram_usage': 61.5, 'disk_usage': 70.2, 'temperature': 55.0,
+            'network_in': 10 ** 4 + ingest_state['next'] * 0.5, 'network_out': 10 ** 3 + ingest_state['next'] * 0.05
+        })
+        if response.status_code >= 400:
+            raise RuntimeError(f'report -> {response.status_code}')
+
+    def train():
+        with app.app_context():
+            if not trainer.train_model(use_synthetic=True, use_db=True):
+                raise RuntimeError('train_model failed')
+
+    heavy = min(repeat, 3)
+    cases = [
+        ('devices.report', ingest, {'number': 50}),
+        ('devices.list', _http_case(client, 'GET', '/devices/api'), {}),
+        ('dashboard.stats', _http_case(client, 'GET', '/api/stats'), {}),
+    ] + [
+        (f'analytics.{name}', _http_case(client, 'GET', f'/analytics/api/{name}'), {})
+        for name in ANALYTICS_ENDPOINTS
+    ] + [
+        ('alerts.check_devices', _http_case(client, 'POST', '/alerts/api/check-devices', json={}),
+         {'repeat': heavy, 'warmup': 0}),
+        ('ml.smart_predict', lambda: predictor.predict_failure(dict(SAMPLE_DEVICE), SAMPLE_HISTORY), {'number': 100}),
+        ('ml.predict', lambda: trainer.predict(SAMPLE_DEVICE), {'number': 100}),
+        ('ml.train_model', train, {'repeat': heavy, 'warmup': 0}),
+    ]
+
+    results = {
+        'devices': size,
+        'history': history,
+        'metric_rows': size * history,
+        'setup_seconds': round(time.time() - setup_started, 2),
+        'cases': {}
+    }
+    for name, func, options in cases:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        try:
+            results['cases'][name] = measure(
+                func,
+                repeat=options.get('repeat', repeat),
+                number=options.get('number', 1),
+                warmup=options.get('warmup', 1)
+            )
+        except Exception as e:
+            results['cases'][name] = {'error': str(e)}
+        print(f"  [{size}] {name}: {results['cases'][name].get('median_ms', results['cases'][name].get('error'))}",
+              flush=True)
+
+    if query_profile:
+        results['queries'] = query_profiler.top(limit=15)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """مقارنة الوسيط لكل حالة مع الأساس؛ يعيد قائمة (الأسطول، الحالة، الأساس، الحالي، النسبة)"""
+    rows = []
+    for fleet, fleet_results in results['fleets'].items():
+        baseline_cases = baseline.get('fleets', {}).get(fleet, {}).get('cases', {})
+        for case, stats in fleet_results['cases'].items():
+            base = baseline_cases.get(case, {})
+            if 'median_ms' not in stats or not base.get('median_ms'):
+                continue
+            ratio = stats['median_ms'] / base['median_ms']
+            if ratio > 1 + threshold:
+                verdict = 'regression'
+            elif ratio < 1 - threshold:
+                verdict = 'improvement'
+            else:
+                verdict = 'unchanged'
+            rows.append({
+                'fleet': fleet,
+                'case': case,
+                'baseline_ms': base['median_ms'],
+                'current_ms': stats['median_ms'],
+                'ratio': round(ratio, 3),
+                'verdict': verdict
+            })
+    return rows
+
+
+def print_report(results, comparison):
+    from models.query_profiler import format_top
+
+    by_case = {(row['fleet'], row['case']): row for row in comparison}
+    marks = {'regression': '⚠️ تراجع', 'improvement': '✅ تحسن', 'unchanged': ''}
+
+    for fleet, fleet_results in results['fleets'].items():
+        print("=" * 78)
+        print(f"أسطول {fleet} جهاز × {fleet_results['history']} قياس "
+              f"(التهيئة {fleet_results['setup_seconds']} ثانية)")
+        print("-" * 78)
+        print(f"{'case':<32} {'median ms':>10} {'p95 ms':>10} {'baseline':>10} {'change':>8}")
+        for case, stats in fleet_results['cases'].items():
+            if 'error' in stats:
+                print(f"{case:<32} خطأ: {stats['error']}")
+                continue
+            row = by_case.get((fleet, case))
+            baseline = f"{row['baseline_ms']:>10}" if row else f"{'-':>10}"
+            change = f"{(row['ratio'] - 1) * 100:>+7.1f}%" if row else f"{'-':>8}"
+            print(f"{case:<32} {stats['median_ms']:>10} {stats['p95_ms']:>10} {baseline} {change} "
+                  f"{marks[row['verdict']] if row else ''}")
+        if fleet_results.get('queries'):
+            print("-" * 78)
+            print("أكثر الاستعلامات كلفة (حسب الزمن الكلي):")
+            print(format_top(fleet_results['queries']))
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='قياس أداء المسارات الحرجة على أساطيل اصطناعية')
+    parser.add_argument('--fleets', default='100,1000,10000', help='أحجام الأساطيل مفصولة بفواصل')
+    parser.add_argument('--history', type=int, default=20, help='عدد القياسات التاريخية لكل جهاز')
+    parser.add_argument('--repeat', type=int, default=5, help='عدد العينات لكل حالة')
+    parser.add_argument('--only', help='قياس الحالات التي يحتوي اسمها على أحد هذه النصوص (مفصولة بفواصل)')
+    parser.add_argument('--seed', type=int, default=42, help='بذرة توليد الأسطول')
+    parser.add_argument('--output', help='ملف النتائج (افتراضياً benchmarks/results/bench-<الوقت>.json)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='ملف النتائج الأساسية للمقارنة')
+    parser.add_argument('--save-baseline', action='store_true', help='حفظ النتائج كنتائج أساسية')
+    parser.add_argument('--threshold', type=float, default=0.2, help='نسبة التغير التي تُعتبر تراجعاً (0.2 = 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='رمز خروج 1 عند وجود تراجع')
+    parser.add_argument('--keep-db', action='store_true', help='عدم حذف قواعد البيانات المؤقتة')
+    parser.add_argument('--query-profile', action='store_true',
+                        help='تفعيل محلل الاستعلامات وعرض أكثر الاستعلامات كلفة لكل أسطول')
+    # وضع العملية الفرعية: قياس أسطول واحد في المجلد المحدد وحفظ نتيجته فيه
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    only = [pattern.strip() for pattern in args.only.split(',')] if args.only else None
+
+    if args.worker is not None:
+        result = run_fleet(args.worker, args.history, args.repeat, only, args.seed, args.work_dir,
+                           query_profile=args.query_profile)
+        with open(os.path.join(args.work_dir, 'result.json'), 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        return
+
+    fleets = [int(size) for size in args.fleets.split(',') if size.strip()]
+    work_dir = tempfile.mkdtemp(prefix='device-bench-')
+
+    results = {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'history': args.history,
+            'repeat': args.repeat,
+            'seed': args.seed
+        },
+        'fleets': {}
+    }
+
+    try:
+        for size in fleets:
+            print(f"قياس أسطول {size} جهاز...", flush=True)
+            fleet_dir = os.path.join(work_dir, str(size))
+            os.makedirs(fleet_dir)
+            command = [sys.executable, os.path.abspath(__file__), '--worker', str(size),
+                       '--work-dir', fleet_dir, '--history', str(args.history),
+                       '--repeat', str(args.repeat), '--seed', str(args.seed)]
+            if args.only:
+                command += ['--only', args.only]
+            if args.query_profile:
+                command.append('--query-profile')
+            subprocess.run(command, cwd=REPO_ROOT, check=True)
+            with open(os.path.join(fleet_dir, 'result.json'), encoding='utf-8') as f:
+                results['fleets'][str(size)] = json.load(f)
+    finally:
+        if args.keep_db:
+            print(f"قواعد البيانات المؤقتة في {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    comparison = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            comparison = compare(results, json.load(f), args.threshold)
+        results['comparison'] = {'baseline': args.baseline, 'threshold': args.threshold, 'cases': comparison}
+
+    print_report(results, comparison)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"تم حفظ النتائج في {output}")
+
+    if args.save_baseline:
+        baseline = {key: value for key, value in results.items() if key != 'comparison'}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"تم حفظ النتائج الأساسية في {args.baseline}")
+
+    regressions = [row for row in comparison if row['verdict'] == 'regression']
+    if regressions:
+        print(f"⚠️ {len(regressions)} حالة أبطأ من الأساس بأكثر من {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,22 +9,592 @@ import requests
 import psutil
 import platform
 import time
+import random
+import asyncio
 import socket
 import uuid
 import json
+import gzip
+import hashlib
 import os
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+# msgpack اختياري - يُستخدم فقط إذا كان مثبتاً وأعلن الخادم دعمه
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # إعدادات الخادم
 # ملاحظة: يمكن تغيير هذا من خلال device_config.json أو كمعامل عند التشغيل
 SERVER_URL = "https://comment-tony-gifts-fabric.trycloudflare.com"  # السيرفر العام
 # SERVER_URL = "http://localhost:5000"  # السيرفر المحلي
 REPORT_INTERVAL = 2  # إرسال البيانات كل ثانيتين (للمراقبة المباشرة)
+ACTION_WAIT_SECONDS = 25  # مدة انتظار طلب الإجراءات (long-poll) قبل إعادة الطلب
+MAX_RETRIES = 3  # عدد إعادة المحاولة عند فشل الاتصال
+RETRY_BACKOFF_BASE = 0.5  # أساس التأخير الأسي بين المحاولات (ثانية)
+RETRY_BACKOFF_CAP = 10  # أقصى تأخير بين المحاولات (ثانية)
+SPOOL_FILE = "metrics_spool.db"  # الطابور المحلي للقياسات أثناء انقطاع الاتصال
+SPOOL_MAX_SAMPLES = 20000  # أقصى عدد قياسات مخزنة (~11 ساعة بفترة ثانيتين) - يُحذف الأقدم
+SPOOL_BATCH_SIZE = 200  # عدد القياسات في كل طلب دفعة
+SPOOL_DRAIN_INTERVAL = 1  # أقل فترة بين طلبات الدفعات (ثانية)
+SPOOL_RECONNECT_JITTER = 15  # تأخير عشوائي قبل أول دفعة بعد عودة الاتصال (ثانية)
+ADAPTIVE_MAX_INTERVAL = 30  # أقصى فترة إرسال عندما تكون القياسات مستقرة (ثانية)
+ADAPTIVE_GROWTH = 1.5  # معامل إبطاء الإرسال بعد كل إرسال مستقر
+# العتبات التي يعود عندها الإرسال للفترة الأساسية (نفس عتبات حالة warning في الخادم)
+ADAPTIVE_THRESHOLDS = {'cpu_usage': 70, 'ram_usage': 70, 'temperature': 65}
+# التغير بين قياسين متتاليين الذي يعتبر تذبذباً سريعاً
+ADAPTIVE_CHANGE = {'cpu_usage': 10, 'ram_usage': 5, 'temperature': 3}
+# النطاق الميت: لا يُرسل الحقل إذا تغير أقل من هذا المقدار عن آخر قياس استلمه الخادم
+# (عدادات الشبكة التراكمية تُرسل دائماً عند تغيرها لأن الخادم يحسب منها معدل الشبكة)
+DEAD_BAND = {
+    'cpu_usage': 2,
+    'ram_usage': 1,
+    'disk_usage': 0.5,
+    'temperature': 1,
+    'battery_level': 1,
+    'cpu_max': 2,
+    'cpu_p95': 2,
+    'ram_max': 1,
+    'ram_p95': 1,
+    'temperature_max': 1,
+    'temperature_p95': 1
+}
+COMPRESS_MIN_BYTES = 1024  # ضغط جسم الطلب بـ gzip فقط إذا تجاوز هذا الحجم
+SAMPLER_INTERVAL = 0.5  # فترة القياس في الخيط الخلفي (ثانية)
+SAMPLER_WINDOW_SECONDS = 10  # النافذة التي يُحسب عليها المتوسط والحد الأقصى و p95
+SAMPLER_SLOW_SECONDS = 5  # فترة قراءة القرص والحرارة والبطارية (أبطأ من CPU و RAM)
+SCAN_COLLECTOR_TIMEOUT = 10  # مهلة كل جامع معلومات في الفحص الشامل (ثانية)
+SCAN_STATIC_TTL = 24 * 3600  # مدة الاحتفاظ بمعلومات النظام والعتاد الثابتة بين الفحوصات (ثانية)
+# أقسام نتائج الفحص التي يُرسل منها ما تغير فقط
+SCAN_SECTIONS = ('system_info', 'hardware_info', 'storage_info', 'memory_info', 'network_info', 'processes_info')
+
+
+class Transport:
+    """طبقة الاتصال بالخادم
+
+    - جلسة requests.Session لكل خيط: اتصال TCP/TLS واحد يبقى مفتوحاً (keep-alive)
+      بدلاً من فتح اتصال جديد لكل طلب
+    - إعادة المحاولة عند أخطاء الاتصال و 502/503/504 مع تأخير أسي عشوائي (full jitter)
+      حتى لا تعيد جميع الأجهزة المحاولة في نفس اللحظة بعد انقطاع الخادم
+    - طلبات POST قد يكون الخادم نفذها رغم انتهاء المهلة أو رد الوكيل بـ 502/504، فتُعاد
+      فقط إذا فشل الاتصال قبل إرسالها، إلا إذا كانت آمنة للتكرار (idempotent=True)
+    """
+    
+    RETRY_STATUSES = (502, 503, 504)
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+    
+    def __init__(self, max_retries=MAX_RETRIES, backoff_base=RETRY_BACKOFF_BASE, backoff_cap=RETRY_BACKOFF_CAP):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._local = threading.local()
+        
+        # إحصائيات
+        self.requests_sent = 0
+        self.retries = 0
+    
+    @property
+    def session(self):
+        """جلسة الخيط الحالي (requests.Session غير مضمونة الأمان بين الخيوط)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+    
+    def backoff_delay(self, attempt):
+        """التأخير قبل المحاولة رقم attempt (full jitter)"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+    
+    @staticmethod
+    def _not_sent(error):
+        """هل فشل الطلب أثناء فتح الاتصال (أي قبل أن يصل أي شيء للخادم)"""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = error.args[0] if error.args else None
+        return isinstance(reason, MaxRetryError) and isinstance(reason.reason, ConnectTimeoutError)
+    
+    def request(self, method, url, retries=None, idempotent=None, **kwargs):
+        """إرسال طلب مع إعادة المحاولة
+
+        idempotent: هل تكرار الطلب آمن (افتراضياً حسب method)؛ الطلب غير الآمن
+        يُعاد فقط إذا تعذر الاتصال قبل إرساله
+        """
+        retries = self.max_retries if retries is None else retries
+        if idempotent is None:
+            idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                self.requests_sent += 1
+                response = self.session.request(method, url, **kwargs)
+                if (response.status_code not in self.RETRY_STATUSES or attempt >= retries
+                        or not idempotent):
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # إغلاق الجلسة حتى لا يُعاد استخدام اتصال مقطوع
+                self.session.close()
+                self._local.session = None
+                if attempt >= retries or not (idempotent or self._not_sent(e)):
+                    raise
+            
+            time.sleep(self.backoff_delay(attempt))
+            attempt += 1
+            self.retries += 1
+    
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+class MetricSpool:
+    """طابور محلي دائم (SQLite) للقياسات التي لم تصل للخادم
+
+    يحفظ كل قياس مع وقت أخذه، ويحذف الأقدم عند تجاوز الحد الأقصى، ويبقى
+    محفوظاً بعد إعادة تشغيل العميل حتى يُرسل عبر /devices/api/report/batch
+    """
+    
+    def __init__(self, path=SPOOL_FILE, max_samples=SPOOL_MAX_SAMPLES):
+        self.path = path
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS spool (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sampled_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+        ''')
+        self._count = self._conn.execute('SELECT COUNT(*) FROM spool').fetchone()[0]
+        
+        # إحصائيات
+        self.evicted = 0
+    
+    def __len__(self):
+        return self._count
+    
+    def push(self, metrics, sampled_at=None):
+        """إضافة قياس للطابور (مع حذف الأقدم إذا امتلأ)"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO spool (sampled_at, payload) VALUES (?, ?)',
+                (sampled_at or time.time(), json.dumps(metrics))
+            )
+            self._count += 1
+            
+            overflow = self._count - self.max_samples
+            if overflow > 0:
+                self._conn.execute('''
+                    DELETE FROM spool WHERE id IN (
+                        SELECT id FROM spool ORDER BY id LIMIT ?
+                    )
+                ''', (overflow,))
+                self._count -= overflow
+                self.evicted += overflow
+    
+    def peek(self, limit=SPOOL_BATCH_SIZE):
+        """أقدم القياسات في الطابور: قائمة (id، وقت القياس، القياس)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, sampled_at, payload FROM spool ORDER BY id LIMIT ?', (limit,)
+            ).fetchall()
+        return [(row_id, sampled_at, json.loads(payload)) for row_id, sampled_at, payload in rows]
+    
+    def remove_through(self, last_id):
+        """حذف القياسات التي تم إرسالها (حتى last_id)"""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM spool WHERE id <= ?', (last_id,))
+            self._count = max(0, self._count - cursor.rowcount)
+
+
+class AdaptiveScheduler:
+    """جدولة الإرسال حسب تذبذب القياسات
+
+    القياس يتم كل base_interval دائماً، أما الإرسال فيتباعد تدريجياً (حتى
+    max_interval) ما دامت القياسات مستقرة، ويعود فوراً للفترة الأساسية عند
+    تجاوز العتبات أو التغير السريع. min_interval حد أدنى يفرضه الخادم.
+    """
+    
+    def __init__(self, base_interval=REPORT_INTERVAL, max_interval=ADAPTIVE_MAX_INTERVAL, growth=ADAPTIVE_GROWTH):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.min_interval = 0
+        self.growth = growth
+        self.interval = base_interval
+        self.last_report_at = 0
+        self._previous = None
+        self._volatile = True
+        
+        # إحصائيات
+        self.samples = 0
+        self.reports = 0
+    
+    def _is_volatile(self, metrics):
+        """هل تجاوز القياس العتبات أو تغير بسرعة عن القياس السابق"""
+        for key, threshold in ADAPTIVE_THRESHOLDS.items():
+            value = metrics.get(key)
+            if value is not None and value >= threshold:
+                return True
+        
+        if self._previous is None:
+            return True
+        for key, change in ADAPTIVE_CHANGE.items():
+            value, previous = metrics.get(key), self._previous.get(key)
+            if value is not None and previous is not None and abs(value - previous) >= change:
+                return True
+        return False
+    
+    def should_report(self, metrics, now=None):
+        """هل يجب إرسال هذا القياس"""
+        now = now or time.time()
+        self.samples += 1
+        self._volatile = self._is_volatile(metrics)
+        self._previous = metrics
+        if self._volatile:
+            self.interval = self.base_interval
+        
+        elapsed = now - self.last_report_at
+        if elapsed < self.min_interval:
+            return False
+        return self._volatile or elapsed >= self.interval
+    
+    def mark_reported(self, now=None):
+        """تسجيل الإرسال وإبطاء الإرسال التالي إذا كانت القياسات مستقرة"""
+        self.last_report_at = now or time.time()
+        self.reports += 1
+        if not self._volatile:
+            self.interval = min(self.max_interval, max(self.interval, self.base_interval) * self.growth)
+    
+    def configure(self, base_interval=None, max_interval=None, min_interval=None):
+        """تطبيق الفترات المرسلة من الخادم"""
+        if base_interval is not None:
+            self.base_interval = max(1, base_interval)
+        if max_interval is not None:
+            self.max_interval = max(self.base_interval, max_interval)
+        if min_interval is not None:
+            self.min_interval = max(0, min_interval)
+        self.interval = min(max(self.interval, self.base_interval), self.max_interval)
+
+
+class MetricEncoder:
+    """ترميز القياسات قبل الإرسال
+
+    - delta: إرسال الحقول المتغيرة فقط مع base_metric_id (آخر قياس استلمه الخادم)
+      والخادم يكمل الباقي من القياس الأساسي
+    - النطاق الميت: التغير الأقل من DEAD_BAND لا يُرسل (الخطأ محدود بالنطاق لأن
+      المقارنة دائماً مع القياس كما أعاد الخادم بناءه وليس مع آخر قياس خام)
+    - صيغة الإرسال: msgpack أو JSON مضغوط حسب ما يعلنه الخادم في رده
+    """
+    
+    def __init__(self, dead_band=DEAD_BAND):
+        self.dead_band = dead_band
+        # تُفعَّل بعد أن يعلن الخادم دعمها (الخادم القديم سيحفظ الحقول الغائبة أصفاراً)
+        self.delta_enabled = False
+        self.encodings = ()
+        self.base_metric_id = None
+        self._base = None
+        self._pending = None
+        
+        # إحصائيات
+        self.fields_total = 0
+        self.fields_sent = 0
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+    
+    def encode(self, metrics):
+        """تحويل القياس إلى قياس delta (أو كامل إذا لم يوجد أساس)"""
+        self.fields_total += len(metrics)
+        if not self.delta_enabled or self.base_metric_id is None:
+            self._pending = dict(metrics)
+            self.fields_sent += len(metrics)
+            return dict(metrics)
+        
+        payload = {'base_metric_id': self.base_metric_id}
+        reconstructed = dict(self._base)
+        for key, value in metrics.items():
+            base_value = self._base.get(key)
+            if key in self._base and value == base_value:
+                continue
+            band = self.dead_band.get(key)
+            if band is not None and value is not None and base_value is not None and abs(value - base_value) < band:
+                continue
+            payload[key] = value
+            reconstructed[key] = value
+        
+        self._pending = reconstructed
+        self.fields_sent += len(payload) - 1
+        return payload
+    
+    def acknowledge(self, response):
+        """الخادم حفظ القياس: يصبح القياس المعاد بناؤه أساس القياس التالي"""
+        wire = response.get('wire') or {}
+        self.delta_enabled = bool(wire.get('delta'))
+        self.encodings = tuple(wire.get('encodings') or ())
+        
+        if self.delta_enabled and response.get('metric_id') is not None and self._pending is not None:
+            self.base_metric_id = response['metric_id']
+            self._base = self._pending
+        self._pending = None
+    
+    def reset(self):
+        """نسيان القياس الأساسي (القياس التالي يُرسل كاملاً)"""
+        self.base_metric_id = None
+        self._base = None
+    
+    def body(self, payload):
+        """جسم الطلب وترويساته: msgpack أو JSON، مضغوطاً بـ gzip إذا كان كبيراً"""
+        if msgpack is not None and 'msgpack' in self.encodings:
+            data = msgpack.packb(payload, use_bin_type=True)
+            headers = {'Content-Type': 'application/msgpack'}
+        else:
+            data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            headers = {'Content-Type': 'application/json'}
+        
+        self.bytes_raw += len(data)
+        if len(data) >= COMPRESS_MIN_BYTES and 'gzip' in self.encodings:
+            data = gzip.compress(data)
+            headers['Content-Encoding'] = 'gzip'
+        self.bytes_sent += len(data)
+        return data, headers
+
+
+def scan_hash(update_data):
+    """بصمة نتائج الفحص (نفس الحساب في الخادم للتحقق من الفحص الأساسي للفرق)"""
+    canonical = json.dumps(update_data['scan_results'], sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def scan_diff(previous, current):
+    """الفرق بين طلبي تحديث بعد الفحص: الحقول ومفاتيح الأقسام التي تغيرت فقط
+
+    القسم الذي حُذف منه مفتاح يُرسل كاملاً ويُذكر في scan_replaced
+    """
+    diff = {'scan_partial': True, 'base_scan_hash': scan_hash(previous), 'scan_replaced': []}
+    for key, value in current.items():
+        if key != 'scan_results' and previous.get(key) != value:
+            diff[key] = value
+    
+    previous_scan = previous['scan_results']
+    changes = {}
+    for key, value in current['scan_results'].items():
+        old = previous_scan.get(key)
+        if key not in SCAN_SECTIONS:
+            # التحذيرات والأخطاء ووقت الفحص تُرسل دائماً
+            changes[key] = value
+        elif isinstance(value, dict) and isinstance(old, dict) and set(old) <= set(value):
+            changed = {k: v for k, v in value.items() if old.get(k) != v}
+            if changed:
+                changes[key] = changed
+        elif old != value:
+            changes[key] = value
+            diff['scan_replaced'].append(key)
+    diff['scan_results'] = changes
+    return diff
+
+
+def _percentile(sorted_values, percent):
+    """النسبة المئوية (nearest-rank) لقائمة مرتبة
+
+    نفس تعريف models/metrics.percentile (العميل ملف مستقل يُنزّل وحده فلا يستوردها)
+    """
+    rank = -(-percent * len(sorted_values) // 100)
+    return sorted_values[max(0, rank - 1)]
+
+
+class MetricSampler:
+    """خيط خلفي يجمع القياسات باستمرار في حلقة (ring buffer)
+
+    CPU و RAM والشبكة كل SAMPLER_INTERVAL، والقرص والحرارة والبطارية كل
+    SAMPLER_SLOW_SECONDS. قراءة القياسات للإرسال فورية (بدون أي انتظار) وتعطي
+    المتوسط والحد الأقصى و p95 على آخر SAMPLER_WINDOW_SECONDS بدلاً من قراءة لحظية.
+    """
+    
+    # (اسم الحقل في العينة، بادئة حقول الملخص)
+    WINDOW_FIELDS = (('cpu_usage', 'cpu'), ('ram_usage', 'ram'), ('temperature', 'temperature'))
+    
+    def __init__(self, temperature_reader, interval=SAMPLER_INTERVAL, window_seconds=SAMPLER_WINDOW_SECONDS,
+                 slow_seconds=SAMPLER_SLOW_SECONDS):
+        self.temperature_reader = temperature_reader
+        self.interval = interval
+        self.window_seconds = window_seconds
+        self.slow_seconds = slow_seconds
+        # ضعف النافذة حتى تبقى النافذة ممتلئة مع تأخر بسيط في الخيط
+        self._samples = deque(maxlen=int(window_seconds / interval) * 2 + 1)
+        self._slow = {}
+        self._slow_read_at = 0
+        self._network = (None, None)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """تشغيل خيط القياس (مرة واحدة)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='metric-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _run(self):
+        # WMI (قراءة الحرارة على Windows) يحتاج تهيئة COM في كل خيط
+        if platform.system() == 'Windows':
+            try:
+                import pythoncom  # type: ignore
+                pythoncom.CoInitialize()
+            except ImportError:
+                pass
+        
+        while not self._stop.is_set():
+            started = time.time()
+            try:
+                self.collect(started)
+            except Exception as e:
+                print(f"⚠️ خطأ في جمع القياسات: {e}")
+            self._stop.wait(max(0, self.interval - (time.time() - started)))
+    
+    def collect(self, now=None):
+        """أخذ عينة واحدة وإضافتها للحلقة"""
+        now = now or time.time()
+        cpu = psutil.cpu_percent(interval=None)
+        per_core = psutil.cpu_percent(interval=None, percpu=True)
+        ram = psutil.virtual_memory().percent
+        net_io = psutil.net_io_counters()
+        
+        if now - self._slow_read_at >= self.slow_seconds:
+            disk = psutil.disk_usage('C:' if platform.system() == 'Windows' else '/')
+            try:
+                battery = psutil.sensors_battery()
+                battery_level = int(battery.percent) if battery else None
+            except Exception:
+                battery_level = None
+            self._slow = {
+                'disk_usage': disk.percent,
+                'battery_level': battery_level,
+                'temperature': self.temperature_reader(cpu, ram)
+            }
+            self._slow_read_at = now
+        
+        with self._lock:
+            self._samples.append((now, cpu, ram, self._slow.get('temperature'), per_core))
+            self._network = (net_io.bytes_recv, net_io.bytes_sent)
+    
+    def _window(self):
+        """عينات آخر نافذة (أو آخر عينة إذا تأخر الخيط)"""
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            samples = [s for s in self._samples if s[0] >= cutoff] or list(self._samples)[-1:]
+        return samples
+    
+    def window_stats(self):
+        """الحد الأدنى والمتوسط والحد الأقصى و p95 لكل قياس في النافذة"""
+        samples = self._window()
+        stats = {'samples': len(samples)}
+        for index, (field, _) in enumerate(self.WINDOW_FIELDS, start=1):
+            values = sorted(s[index] for s in samples if s[index] is not None)
+            if values:
+                stats[field] = {
+                    'min': values[0],
+                    'avg': sum(values) / len(values),
+                    'max': values[-1],
+                    'p95': _percentile(values, 95)
+                }
+        return stats
+    
+    def per_core_usage(self):
+        """متوسط استخدام كل نواة في النافذة"""
+        cores = [s[4] for s in self._window() if s[4]]
+        if not cores:
+            return None
+        return [round(sum(values) / len(values), 2) for values in zip(*cores)]
+    
+    def metrics(self):
+        """القياسات بنفس صيغة DeviceMonitor.get_metrics مع ملخص النافذة (أو None قبل أول عينة)"""
+        stats = self.window_stats()
+        if not stats['samples'] or 'cpu_usage' not in stats:
+            return None
+        
+        bytes_recv, bytes_sent = self._network
+        metrics = {
+            'disk_usage': round(self._slow.get('disk_usage', 0), 2),
+            'battery_level': self._slow.get('battery_level'),
+            'network_in': round(bytes_recv / (1024**2), 2),  # MB
+            'network_out': round(bytes_sent / (1024**2), 2)  # MB
+        }
+        for field, prefix in self.WINDOW_FIELDS:
+            if field in stats:
+                metrics[field] = round(stats[field]['avg'], 2)
+                metrics[f'{prefix}_max'] = round(stats[field]['max'], 2)
+                metrics[f'{prefix}_p95'] = round(stats[field]['p95'], 2)
+        return metrics
+
 
 class DeviceMonitor:
     def __init__(self, server_url, device_token=None):
         self.server_url = server_url.rstrip('/')
         self.config_file = "device_config.json"
+        self.transport = Transport()
+        
+        # إرسال القياسات بخط أنابيب asyncio (القياس والإرسال بالتوازي) - يُفعَّل من
+        # device_config.json ("async_pipeline": true) أو متغير البيئة DEVICE_CLIENT_ASYNC=1
+        self.async_pipeline = os.environ.get('DEVICE_CLIENT_ASYNC') == '1'
+        
+        # أول قراءة لـ cpu_percent تهيئ العداد؛ القراءات التالية بدون انتظار تعطي
+        # الاستخدام منذ القراءة السابقة بدلاً من حجب الحلقة ثانية كاملة
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+        # خيط القياس الخلفي (يبدأ مع run)
+        self.sampler = MetricSampler(self.read_temperature)
+        
+        # الإجراءات التي تم استلامها (حتى لا يُنفَّذ إجراء مرتين قبل وصول تحديث حالته للخادم)
+        self.handled_action_ids = set()
+        self.handled_action_order = deque()
+        self.actions_lock = threading.Lock()
+        self.action_listener_active = False
+        # مهلة يطلبها الخادم قبل طلب long-poll التالي عند امتلاء أماكن الانتظار فيه
+        self.action_poll_retry_after = None
+        
+        # فترة القياس الأساسية (يمكن للخادم تغييرها عبر config في رد /devices/api/report)
+        self.report_interval = REPORT_INTERVAL
+        # جدولة الإرسال: إرسال أقل عند استقرار القياسات وأسرع عند تذبذبها
+        self.scheduler = AdaptiveScheduler(REPORT_INTERVAL)
+        # ترميز القياسات (delta + نطاق ميت + ضغط)
+        self.encoder = MetricEncoder()
+        # هل يرجع الخادم الإجراءات المعلقة مع رد إرسال القياسات
+        self.report_includes_actions = False
+        
+        # الطابور المحلي للقياسات أثناء انقطاع الاتصال
+        try:
+            self.spool = MetricSpool()
+        except sqlite3.Error as e:
+            print(f"⚠️ تعذر فتح الطابور المحلي ({e}) - القياسات لن تُحفظ أثناء الانقطاع")
+            self.spool = None
+        self.spool_next_drain = 0
+        
+        # الفحص الشامل: معلومات العتاد الثابتة وآخر نتائج وصلت للخادم (لإرسال الفرق فقط)
+        self._static_cache = None
+        self._static_cache_at = 0
+        self._static_cache_lock = threading.Lock()
+        self.last_scan_sent = None
+        self.offline = False
         
         # إذا تم تمرير token كمعامل، استخدمه أولاً
         if device_token:
@@ -56,6 +626,8 @@ class DeviceMonitor:
                     # تحديث server_url من الملف إذا كان موجوداً
                     if config.get('server_url'):
                         self.server_url = config.get('server_url').rstrip('/')
+                    if config.get('async_pipeline'):
+                        self.async_pipeline = True
                     print(f"تم تحميل الإعدادات: Token موجود")
                     print(f"عنوان السيرفر: {self.server_url}")
             except Exception as e:
@@ -117,7 +689,7 @@ class DeviceMonitor:
             print(f"  MAC: {system_info.get('mac_address', 'غير متوفر')}")
             print(f"  IP: {system_info.get('ip_address', 'غير متوفر')}")
             
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.server_url}/devices/api/register",
                 json=system_info,
                 timeout=10
@@ -144,10 +716,19 @@ class DeviceMonitor:
             return False
     
     def get_metrics(self):
-        """الحصول على قياسات الجهاز"""
+        """الحصول على قياسات الجهاز
+
+        إذا كان خيط القياس الخلفي يعمل تُقرأ القياسات من نافذته فوراً (مع الحد
+        الأقصى و p95)، وإلا تُقرأ قراءة لحظية مباشرة
+        """
+        if self.sampler.running:
+            metrics = self.sampler.metrics()
+            if metrics:
+                return metrics
+        
         try:
-            # CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU (الاستخدام منذ القراءة السابقة - بدون حجب)
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # RAM
             memory = psutil.virtual_memory()
@@ -163,58 +744,8 @@ class DeviceMonitor:
             disk_percent = disk.percent
             disk_total_gb = disk.total / (1024**3)
             
-            # Temperature - جمع درجة الحرارة
-            temp = None
-            system_platform = platform.system()
-            
-            # محاولة الحصول على درجة الحرارة الحقيقية (على Linux فقط عادة)
-            if system_platform != 'Windows':
-                try:
-                    # على Linux/Unix، محاولة استخدام psutil.sensors_temperatures()
-                    if hasattr(psutil, 'sensors_temperatures'):
-                        temps = psutil.sensors_temperatures()
-                        if temps and len(temps) > 0:
-                            # الحصول على أول مستشعر حرارة متوفر
-                            for sensor_name, sensor_list in temps.items():
-                                if sensor_list and len(sensor_list) > 0:
-                                    temp_value = sensor_list[0].current
-                                    if temp_value and temp_value > 0:
-                                        temp = temp_value
-                                        break
-                except Exception:
-                    pass  # إذا فشل، سنستخدم طريقة تقريبية
-            
-            # على Windows، محاولة استخدام WMI
-            if system_platform == 'Windows' and (temp is None or temp == 0):
-                try:
-                    import wmi  # type: ignore
-                    w = wmi.WMI(namespace="root\\wmi")
-                    temperature_info = w.MSAcpi_ThermalZoneTemperature()
-                    if temperature_info and len(temperature_info) > 0:
-                        # تحويل من Kelvin إلى Celsius
-                        temp_kelvin = temperature_info[0].CurrentTemperature / 10.0
-                        temp_celsius = temp_kelvin - 273.15
-                        if 0 < temp_celsius < 150:  # التأكد من أن القيمة منطقية
-                            temp = temp_celsius
-                except (ImportError, Exception):
-                    pass  # WMI غير متوفر أو فشل - سنستخدم طريقة تقريبية
-            
-            # إذا لم يتم الحصول على درجة حرارة حقيقية، استخدام طريقة تقريبية
-            # بناءً على CPU usage و RAM usage (للمعالجات، كلما زاد الاستخدام زادت الحرارة)
-            if temp is None or temp == 0:
-                # درجة حرارة أساسية (درجة حرارة الغرفة + تأثير الاستخدام)
-                base_temp = 30.0  # درجة حرارة أساسية معقولة
-                cpu_heat = (cpu_percent / 100.0) * 25.0  # كل 100% CPU usage يضيف ~25 درجة
-                ram_heat = (ram_percent / 100.0) * 8.0   # كل 100% RAM usage يضيف ~8 درجات
-                
-                # حساب درجة حرارة تقريبية
-                estimated_temp = base_temp + cpu_heat + ram_heat
-                
-                # التأكد من أن القيمة ضمن نطاق منطقي (بين 25 و 85 درجة)
-                estimated_temp = max(25.0, min(85.0, estimated_temp))  # تقييد بين 25 و 85
-                temp = estimated_temp
-                # طباعة رسالة توضيحية عند أول استخدام
-                # print(f"ملاحظة: درجة حرارة تقريبية: {estimated_temp:.1f}°C (مبنية على استخدام CPU: {cpu_percent:.1f}% و RAM: {ram_percent:.1f}%)")
+            # Temperature - جمع درجة الحرارة (حقيقية أو تقريبية)
+            temp = self.read_temperature(cpu_percent, ram_percent)
             
             # Battery
             try:
@@ -250,6 +781,62 @@ class DeviceMonitor:
             print(f"خطأ في جمع القياسات: {e}")
             return None
     
+    def read_temperature(self, cpu_percent, ram_percent):
+        """قراءة درجة الحرارة (من المستشعرات إن وجدت، وإلا تقديرها من استخدام CPU و RAM)"""
+        temp = None
+        system_platform = platform.system()
+        
+        # محاولة الحصول على درجة الحرارة الحقيقية (على Linux فقط عادة)
+        if system_platform != 'Windows':
+            try:
+                # على Linux/Unix، محاولة استخدام psutil.sensors_temperatures()
+                if hasattr(psutil, 'sensors_temperatures'):
+                    temps = psutil.sensors_temperatures()
+                    if temps and len(temps) > 0:
+                        # الحصول على أول مستشعر حرارة متوفر
+                        for sensor_name, sensor_list in temps.items():
+                            if sensor_list and len(sensor_list) > 0:
+                                temp_value = sensor_list[0].current
+                                if temp_value and temp_value > 0:
+                                    temp = temp_value
+                                    break
+            except Exception:
+                pass  # إذا فشل، سنستخدم طريقة تقريبية
+        
+        # على Windows، محاولة استخدام WMI
+        if system_platform == 'Windows' and (temp is None or temp == 0):
+            try:
+                import wmi  # type: ignore
+                w = wmi.WMI(namespace="root\\wmi")
+                temperature_info = w.MSAcpi_ThermalZoneTemperature()
+                if temperature_info and len(temperature_info) > 0:
+                    # تحويل من Kelvin إلى Celsius
+                    temp_kelvin = temperature_info[0].CurrentTemperature / 10.0
+                    temp_celsius = temp_kelvin - 273.15
+                    if 0 < temp_celsius < 150:  # التأكد من أن القيمة منطقية
+                        temp = temp_celsius
+            except (ImportError, Exception):
+                pass  # WMI غير متوفر أو فشل - سنستخدم طريقة تقريبية
+        
+        # إذا لم يتم الحصول على درجة حرارة حقيقية، استخدام طريقة تقريبية
+        # بناءً على CPU usage و RAM usage (للمعالجات، كلما زاد الاستخدام زادت الحرارة)
+        if temp is None or temp == 0:
+            # درجة حرارة أساسية (درجة حرارة الغرفة + تأثير الاستخدام)
+            base_temp = 30.0  # درجة حرارة أساسية معقولة
+            cpu_heat = (cpu_percent / 100.0) * 25.0  # كل 100% CPU usage يضيف ~25 درجة
+            ram_heat = (ram_percent / 100.0) * 8.0   # كل 100% RAM usage يضيف ~8 درجات
+            
+            # حساب درجة حرارة تقريبية
+            estimated_temp = base_temp + cpu_heat + ram_heat
+            
+            # التأكد من أن القيمة ضمن نطاق منطقي (بين 25 و 85 درجة)
+            estimated_temp = max(25.0, min(85.0, estimated_temp))  # تقييد بين 25 و 85
+            temp = estimated_temp
+            # طباعة رسالة توضيحية عند أول استخدام
+            # print(f"ملاحظة: درجة حرارة تقريبية: {estimated_temp:.1f}°C (مبنية على استخدام CPU: {cpu_percent:.1f}% و RAM: {ram_percent:.1f}%)")
+        
+        return temp
+    
     def report_metrics(self):
         """إرسال القياسات إلى الخادم"""
         if not self.device_token:
@@ -261,29 +848,75 @@ class DeviceMonitor:
         if not metrics:
             return False
         
+        return self.send_metrics(metrics)
+    
+    def sample_and_report(self):
+        """دورة واحدة: أخذ قياس وإرساله فقط إذا قررت الجدولة ذلك
+
+        يعيد True/False لنتيجة الإرسال، أو None إذا لم يُرسل القياس
+        """
+        if not self.device_token:
+            print("لا يوجد token. جاري التسجيل...")
+            if not self.register_device():
+                return False
+        
+        metrics = self.get_metrics()
+        if not metrics or not self.scheduler.should_report(metrics):
+            return None
+        
+        self.scheduler.mark_reported()
+        return self.send_metrics(metrics)
+    
+    def send_metrics(self, metrics):
+        """إرسال قياسات تم جمعها إلى الخادم"""
         try:
-            headers = {
-                'X-Device-Token': self.device_token,
-                'Content-Type': 'application/json'
-            }
+            # معرّف القياس يبقى نفسه عند إعادة الإرسال أو من الطابور المحلي، فيتجاهل
+            # الخادم القياس الذي حفظه مسبقاً بدلاً من إدراجه مرتين
+            sample_id = metrics.setdefault('sample_id', uuid.uuid4().hex)
+            
+            # طلب الإعدادات والإجراءات المعلقة في نفس الطلب (بدلاً من طلب منفصل للإجراءات)
+            payload = self.encoder.encode({key: value for key, value in metrics.items() if key != 'sample_id'})
+            payload['sample_id'] = sample_id
+            payload['include_config'] = True
+            if not self.action_listener_active:
+                payload['include_actions'] = True
+            
+            body, headers = self.encoder.body(payload)
+            headers['X-Device-Token'] = self.device_token
             
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.server_url}/devices/api/report",
-                json=metrics,
+                data=body,
                 headers=headers,
-                timeout=10
+                timeout=10,
+                idempotent=True
             )
             
+            if response.status_code == 409 and self.encoder.base_metric_id is not None:
+                # القياس الأساسي لم يعد موجوداً على الخادم - إعادة الإرسال كاملاً
+                self.encoder.reset()
+                return self.send_metrics(metrics)
+            
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
+                    self.encoder.acknowledge(data)
+                    self.apply_server_config(data.get('config'))
+                    if 'actions' in data:
+                        self.report_includes_actions = True
+                        self.handle_actions(data['actions'])
                     print(f"[{datetime.now().strftime('%H:%M:%S')}] ✓ تم إرسال البيانات: "
                           f"CPU: {metrics['cpu_usage']}%, "
                           f"RAM: {metrics['ram_usage']}%, "
                           f"Status: {data.get('status', 'unknown')}")
+                    self._mark_online()
+                    self.drain_spool()
                     return True
             else:
                 print(f"✗ خطأ في إرسال البيانات: {response.text}")
+                # الخادم غير متاح مؤقتاً - حفظ القياس لإرساله لاحقاً
+                if response.status_code >= 500 or response.status_code == 429:
+                    self._spool_metrics(metrics)
                 # إذا كان الخطأ بسبب token غير صالح، إعادة التسجيل
                 if response.status_code == 404:
                     self.device_token = None
@@ -291,12 +924,82 @@ class DeviceMonitor:
                 return False
         except Exception as e:
             print(f"✗ خطأ في الاتصال: {e}")
+            self._spool_metrics(metrics)
             return False
     
-    def check_pending_actions(self):
-        """التحقق من الإجراءات المعلقة وتنفيذها"""
+    def _spool_metrics(self, metrics):
+        """حفظ قياس لم يصل للخادم في الطابور المحلي"""
+        self.offline = True
+        if self.spool is not None:
+            self.spool.push(metrics)
+            print(f"💾 تم حفظ القياس محلياً ({len(self.spool)} في الطابور)")
+    
+    def _mark_online(self):
+        """عند عودة الاتصال: تأخير عشوائي قبل إرسال الطابور حتى لا ترسل جميع
+        الأجهزة مخزونها في نفس اللحظة بعد عودة الخادم"""
+        if self.offline:
+            self.offline = False
+            self.spool_next_drain = time.time() + random.uniform(0, SPOOL_RECONNECT_JITTER)
+    
+    def drain_spool(self):
+        """إرسال دفعة واحدة من الطابور المحلي (دفعة كل SPOOL_DRAIN_INTERVAL على الأكثر)
+
+        يعيد عدد القياسات التي تم إرسالها
+        """
+        if self.spool is None or not len(self.spool) or not self.device_token:
+            return 0
+        if time.time() < self.spool_next_drain:
+            return 0
+        
+        batch = self.spool.peek(SPOOL_BATCH_SIZE)
+        if not batch:
+            return 0
+        
+        samples = [dict(metrics, sampled_at=sampled_at) for _, sampled_at, metrics in batch]
+        body, headers = self.encoder.body({'samples': samples})
+        headers['X-Device-Token'] = self.device_token
+        try:
+            response = self.transport.post(
+                f"{self.server_url}/devices/api/report/batch",
+                data=body,
+                headers=headers,
+                timeout=30,
+                retries=0
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.spool_next_drain = time.time() + self.report_interval
+            return 0
+        
+        if response.status_code == 200:
+            self.spool.remove_through(batch[-1][0])
+            self.spool_next_drain = time.time() + SPOOL_DRAIN_INTERVAL
+            print(f"📤 تم إرسال {len(batch)} قياس من الطابور المحلي (المتبقي: {len(self.spool)})")
+            return len(batch)
+        
+        if response.status_code in (429, 503):
+            # الخادم مشغول - احترام Retry-After
+            try:
+                delay = float(response.headers.get('Retry-After', ''))
+            except ValueError:
+                delay = self.transport.backoff_delay(4)
+            self.spool_next_drain = time.time() + delay
+        elif response.status_code in (404, 405) and 'application/json' not in response.headers.get('Content-Type', ''):
+            # خادم قديم بدون /api/report/batch - إبقاء القياسات والمحاولة لاحقاً
+            print("⚠️ الخادم لا يدعم إرسال الدفعات - القياسات محفوظة محلياً")
+            self.spool_next_drain = time.time() + 300
+        else:
+            print(f"✗ خطأ في إرسال الطابور المحلي: {response.status_code}")
+            self.spool_next_drain = time.time() + self.report_interval
+        return 0
+    
+    def check_pending_actions(self, wait=0):
+        """التحقق من الإجراءات المعلقة وتنفيذها
+
+        wait: مدة انتظار الخادم حتى يصل إجراء (long-poll)، 0 = إرجاع فوري
+        يعيد عدد الإجراءات التي أرجعها الخادم، أو None عند فشل الطلب
+        """
         if not self.device_token:
-            return
+            return None
         
         try:
             headers = {
@@ -304,26 +1007,25 @@ class DeviceMonitor:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            response = self.transport.get(
                 f"{self.server_url}/actions/api/pending",
+                params={'wait': wait} if wait else None,
                 headers=headers,
-                timeout=10
+                timeout=10 + wait,
+                # خيط long-poll يعيد الطلب بنفسه
+                retries=0 if wait else None
             )
             
             if response.status_code == 200:
+                self.action_poll_retry_after = None
+                if wait and response.headers.get('X-Long-Poll') == 'busy':
+                    try:
+                        self.action_poll_retry_after = float(response.headers.get('Retry-After', ''))
+                    except ValueError:
+                        self.action_poll_retry_after = ACTION_WAIT_SECONDS
                 actions = response.json()
-                if actions and len(actions) > 0:
-                    print(f"\n{'='*60}")
-                    print(f"🔔 تم العثور على {len(actions)} إجراء معلق!")
-                    print(f"{'='*60}")
-                    for action in actions:
-                        action_type = action.get('action_type', 'unknown')
-                        action_desc = action.get('action_description', '')
-                        action_id = action.get('id', 'N/A')
-                        print(f"  → معالجة إجراء #{action_id}: {action_type}")
-                        print(f"    الوصف: {action_desc}")
-                        self.execute_action(action)
-                    print(f"{'='*60}\n")
+                self.handle_actions(actions)
+                return len(actions)
             elif response.status_code == 404:
                 # لا نطبع رسالة خطأ لكل فحص (كل ثانيتين) - فقط في حالة الخطأ الحقيقي
                 pass
@@ -335,6 +1037,100 @@ class DeviceMonitor:
         except Exception as e:
             # فقط في حالة الخطأ الحقيقي، نطبع رسالة
             print(f"⚠️ خطأ في التحقق من الإجراءات: {e}")
+        return None
+    
+    def handle_actions(self, actions):
+        """تنفيذ الإجراءات المستلمة من الخادم (مع تجاهل ما تم استلامه مسبقاً)
+
+        يعيد عدد الإجراءات الجديدة
+        """
+        with self.actions_lock:
+            actions = [a for a in (actions or []) if a.get('id') not in self.handled_action_ids]
+            for action in actions:
+                self._mark_action_handled(action.get('id'))
+        
+        if actions and len(actions) > 0:
+            print(f"\n{'='*60}")
+            print(f"🔔 تم العثور على {len(actions)} إجراء معلق!")
+            print(f"{'='*60}")
+            for action in actions:
+                action_type = action.get('action_type', 'unknown')
+                action_desc = action.get('action_description', '')
+                action_id = action.get('id', 'N/A')
+                print(f"  → معالجة إجراء #{action_id}: {action_type}")
+                print(f"    الوصف: {action_desc}")
+                self.execute_action(action)
+            print(f"{'='*60}\n")
+        return len(actions)
+    
+    def apply_server_config(self, config):
+        """تطبيق الإعدادات المرسلة من الخادم (مثل فترة الإرسال)"""
+        if not config:
+            return
+        
+        interval = config.get('report_interval')
+        if interval and interval != self.report_interval:
+            try:
+                self.report_interval = max(1, float(interval))
+                print(f"⚙️ الخادم غيّر فترة الإرسال إلى كل {self.report_interval} ثانية")
+            except (ValueError, TypeError):
+                pass
+        
+        try:
+            max_interval = config.get('max_report_interval')
+            min_interval = config.get('min_report_interval')
+            if min_interval and min_interval != self.scheduler.min_interval:
+                print(f"⚙️ الخادم حدد أقل فترة إرسال بـ {min_interval} ثانية")
+            self.scheduler.configure(
+                base_interval=self.report_interval,
+                max_interval=float(max_interval) if max_interval is not None else None,
+                min_interval=float(min_interval) if min_interval is not None else None
+            )
+        except (ValueError, TypeError):
+            pass
+    
+    def _mark_action_handled(self, action_id):
+        """تسجيل إجراء كمستلم (آخر 1000 إجراء فقط)"""
+        if action_id is None:
+            return
+        self.handled_action_ids.add(action_id)
+        self.handled_action_order.append(action_id)
+        if len(self.handled_action_order) > 1000:
+            self.handled_action_ids.discard(self.handled_action_order.popleft())
+    
+    def start_action_listener(self):
+        """تشغيل خيط يستقبل الإجراءات فور إنشائها عبر long-poll"""
+        listener = threading.Thread(target=self._action_listener_loop, name='action-listener', daemon=True)
+        listener.start()
+        self.action_listener_active = True
+    
+    def _action_listener_loop(self):
+        """حلقة long-poll: الخادم يبقي الطلب مفتوحاً حتى يصل إجراء أو تنتهي المهلة"""
+        while True:
+            try:
+                started = time.time()
+                received = self.check_pending_actions(wait=ACTION_WAIT_SECONDS)
+                
+                if self.action_poll_retry_after:
+                    # الخادم مشغول بطلبات منتظرة كثيرة - استلام الإجراءات مع رد إرسال القياسات
+                    # حتى انتهاء المهلة ثم العودة للانتظار
+                    self.action_listener_active = False
+                    time.sleep(self.action_poll_retry_after)
+                    self.action_listener_active = True
+                elif received is None:
+                    # فشل الطلب - الانتظار قبل إعادة المحاولة
+                    time.sleep(self.report_interval)
+                elif time.time() - started < 1:
+                    if received == 0:
+                        # خادم قديم لا يدعم wait يعيد قائمة فارغة فوراً - إيقاف الخيط
+                        # والعودة لاستلام الإجراءات مع كل دورة إرسال
+                        self.action_listener_active = False
+                        return
+                    # إجراءات ما زالت معلقة (لم يصل تحديث حالتها بعد) - تجنب تكرار الطلب بسرعة
+                    time.sleep(self.report_interval)
+            except Exception as e:
+                print(f"⚠️ خطأ في استقبال الإجراءات: {e}")
+                time.sleep(self.report_interval)
     
     def execute_action(self, action):
         """تنفيذ إجراء معين"""
@@ -448,7 +1244,7 @@ class DeviceMonitor:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.server_url}/actions/api/action/{action_id}/complete",
                 headers=headers,
                 json={
@@ -1062,11 +1858,12 @@ class DeviceMonitor:
             return False
     
     def scan_device(self):
-        """فحص شامل للجهاز وجمع معلومات النظام"""
+        """فحص شامل للجهاز وجمع معلومات النظام
+
+        جامعو المعلومات يعملون بالتوازي ولكل منهم مهلة، ومعلومات العتاد الثابتة
+        محفوظة بين الفحوصات، ويُرسل للخادم ما تغير فقط منذ آخر فحص
+        """
         try:
-            import platform
-            import psutil
-            
             system = platform.system()
             scan_results = {
                 'success': True,
@@ -1085,232 +1882,49 @@ class DeviceMonitor:
             print("جاري فحص الجهاز بشكل شامل...")
             print("=" * 60)
             
-            # 1. معلومات النظام الأساسية
-            try:
-                scan_results['system_info'] = {
-                    'platform': platform.system(),
-                    'platform_release': platform.release(),
-                    'platform_version': platform.version(),
-                    'architecture': platform.machine(),
-                    'processor': platform.processor(),
-                    'hostname': platform.node(),
-                    'python_version': platform.python_version()
-                }
-                print(f"✓ نظام التشغيل: {scan_results['system_info']['platform']} {scan_results['system_info']['platform_release']}")
-                print(f"✓ المعالج: {scan_results['system_info']['processor']}")
-                print(f"✓ المعمارية: {scan_results['system_info']['architecture']}")
-            except Exception as e:
-                scan_results['errors'].append(f'خطأ في جمع معلومات النظام: {e}')
-                print(f"✗ خطأ في جمع معلومات النظام: {e}")
-            
-            # 2. معلومات المعالج (CPU)
-            try:
-                cpu_count_physical = psutil.cpu_count(logical=False)
-                cpu_count_logical = psutil.cpu_count(logical=True)
-                cpu_freq = psutil.cpu_freq()
-                cpu_percent = psutil.cpu_percent(interval=1)
-                cpu_per_core = psutil.cpu_percent(interval=1, percpu=True)
-                
-                scan_results['hardware_info']['cpu'] = {
-                    'physical_cores': cpu_count_physical,
-                    'logical_cores': cpu_count_logical,
-                    'current_frequency_mhz': cpu_freq.current if cpu_freq else None,
-                    'min_frequency_mhz': cpu_freq.min if cpu_freq else None,
-                    'max_frequency_mhz': cpu_freq.max if cpu_freq else None,
-                    'usage_percent': cpu_percent,
-                    'usage_per_core': cpu_per_core
-                }
-                print(f"✓ المعالج: {cpu_count_physical} نواة فيزيائية، {cpu_count_logical} نواة منطقية")
-                print(f"✓ استخدام المعالج: {cpu_percent}%")
-                
-                if cpu_percent > 90:
-                    scan_results['warnings'].append('استخدام المعالج عالي جداً (>90%)')
-            except Exception as e:
-                scan_results['errors'].append(f'خطأ في جمع معلومات المعالج: {e}')
-                print(f"✗ خطأ في جمع معلومات المعالج: {e}")
-            
-            # 3. معلومات الذاكرة (RAM)
-            try:
-                memory = psutil.virtual_memory()
-                swap = psutil.swap_memory()
-                
-                scan_results['memory_info'] = {
-                    'total_gb': round(memory.total / (1024**3), 2),
-                    'available_gb': round(memory.available / (1024**3), 2),
-                    'used_gb': round(memory.used / (1024**3), 2),
-                    'percent': memory.percent,
-                    'swap_total_gb': round(swap.total / (1024**3), 2) if swap.total > 0 else 0,
-                    'swap_used_gb': round(swap.used / (1024**3), 2) if swap.used > 0 else 0,
-                    'swap_percent': swap.percent if swap.total > 0 else 0
-                }
-                print(f"✓ الذاكرة: {scan_results['memory_info']['total_gb']} GB إجمالي، "
-                      f"{scan_results['memory_info']['used_gb']} GB مستخدم ({memory.percent}%)")
-                
-                if memory.percent > 90:
-                    scan_results['warnings'].append('استخدام الذاكرة عالي جداً (>90%)')
-            except Exception as e:
-                scan_results['errors'].append(f'خطأ في جمع معلومات الذاكرة: {e}')
-                print(f"✗ خطأ في جمع معلومات الذاكرة: {e}")
-            
-            # 4. معلومات التخزين (Disk)
-            try:
-                disk_info_list = []
-                if system == 'Windows':
-                    # فحص جميع الأقراص في Windows
-                    import string
-                    partitions = psutil.disk_partitions()
-                    for partition in partitions:
-                        try:
-                            if partition.device and partition.device[0] in string.ascii_uppercase:
-                                disk = psutil.disk_usage(partition.device)
-                                disk_info = {
-                                    'device': partition.device,
-                                    'mountpoint': partition.mountpoint,
-                                    'fstype': partition.fstype,
-                                    'total_gb': round(disk.total / (1024**3), 2),
-                                    'used_gb': round(disk.used / (1024**3), 2),
-                                    'free_gb': round(disk.free / (1024**3), 2),
-                                    'percent': disk.percent
-                                }
-                                disk_info_list.append(disk_info)
-                                print(f"✓ القرص {partition.device}: {disk_info['total_gb']} GB إجمالي، "
-                                      f"{disk_info['used_gb']} GB مستخدم ({disk.percent}%)")
-                                
-                                if disk.percent > 90:
-                                    scan_results['warnings'].append(f'مساحة القرص {partition.device} ممتلئة تقريباً (>90%)')
-                        except Exception:
-                            continue
-                    
-                    # استخدام القرص الرئيسي C: للإحصائيات العامة
-                    try:
-                        main_disk = psutil.disk_usage('C:')
-                        scan_results['storage_info'] = {
-                            'main_disk_total_gb': round(main_disk.total / (1024**3), 2),
-                            'main_disk_used_gb': round(main_disk.used / (1024**3), 2),
-                            'main_disk_free_gb': round(main_disk.free / (1024**3), 2),
-                            'main_disk_percent': main_disk.percent,
-                            'all_disks': disk_info_list
-                        }
-                    except:
-                        if disk_info_list:
-                            scan_results['storage_info'] = {
-                                'all_disks': disk_info_list,
-                                'main_disk_total_gb': disk_info_list[0]['total_gb'] if disk_info_list else None,
-                                'main_disk_used_gb': disk_info_list[0]['used_gb'] if disk_info_list else None,
-                                'main_disk_free_gb': disk_info_list[0]['free_gb'] if disk_info_list else None,
-                                'main_disk_percent': disk_info_list[0]['percent'] if disk_info_list else None
-                            }
-                else:
-                    # Linux/Mac
-                    disk = psutil.disk_usage('/')
-                    scan_results['storage_info'] = {
-                        'main_disk_total_gb': round(disk.total / (1024**3), 2),
-                        'main_disk_used_gb': round(disk.used / (1024**3), 2),
-                        'main_disk_free_gb': round(disk.free / (1024**3), 2),
-                        'main_disk_percent': disk.percent,
-                        'all_disks': [{
-                            'device': '/',
-                            'total_gb': round(disk.total / (1024**3), 2),
-                            'used_gb': round(disk.used / (1024**3), 2),
-                            'free_gb': round(disk.free / (1024**3), 2),
-                            'percent': disk.percent
-                        }]
-                    }
-                    print(f"✓ القرص: {scan_results['storage_info']['main_disk_total_gb']} GB إجمالي، "
-                          f"{scan_results['storage_info']['main_disk_used_gb']} GB مستخدم ({disk.percent}%)")
-                    
-                    if disk.percent > 90:
-                        scan_results['warnings'].append('مساحة القرص ممتلئة تقريباً (>90%)')
-            except Exception as e:
-                scan_results['errors'].append(f'خطأ في جمع معلومات القرص: {e}')
-                print(f"✗ خطأ في جمع معلومات القرص: {e}")
-            
-            # 5. معلومات الشبكة
-            try:
-                net_io = psutil.net_io_counters()
-                net_connections = len(psutil.net_connections(kind='inet'))
-                net_if_addrs = psutil.net_if_addrs()
-                
-                scan_results['network_info'] = {
-                    'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2),
-                    'bytes_recv_mb': round(net_io.bytes_recv / (1024**2), 2),
-                    'packets_sent': net_io.packets_sent,
-                    'packets_recv': net_io.packets_recv,
-                    'active_connections': net_connections,
-                    'network_interfaces': len(net_if_addrs)
-                }
-                print(f"✓ الشبكة: {scan_results['network_info']['bytes_sent_mb']} MB مرسل، "
-                      f"{scan_results['network_info']['bytes_recv_mb']} MB مستلم")
-            except Exception as e:
-                scan_results['errors'].append(f'خطأ في جمع معلومات الشبكة: {e}')
-                print(f"✗ خطأ في جمع معلومات الشبكة: {e}")
-            
-            # 6. معلومات العمليات (Processes)
-            try:
-                processes = list(psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']))
-                processes_info = []
-                total_processes = len(processes)
-                running_processes = sum(1 for p in processes if p.info['cpu_percent'] is not None)
-                
-                # الحصول على أفضل 5 عمليات من حيث استخدام CPU
-                top_cpu_processes = sorted(
-                    [p.info for p in processes if p.info['cpu_percent'] is not None],
-                    key=lambda x: x['cpu_percent'] or 0,
-                    reverse=True
-                )[:5]
-                
-                # الحصول على أفضل 5 عمليات من حيث استخدام الذاكرة
-                top_memory_processes = sorted(
-                    [p.info for p in processes if p.info['memory_percent'] is not None],
-                    key=lambda x: x['memory_percent'] or 0,
-                    reverse=True
-                )[:5]
+            # (الاسم في رسائل الخطأ، الجامع، المهلة بالثواني)
+            collectors = [
+                ('معلومات النظام', self._scan_system_info, SCAN_COLLECTOR_TIMEOUT),
+                ('معلومات المعالج', self._scan_cpu, SCAN_COLLECTOR_TIMEOUT),
+                ('معلومات الذاكرة', self._scan_memory, SCAN_COLLECTOR_TIMEOUT),
+                ('معلومات القرص', self._scan_storage, SCAN_COLLECTOR_TIMEOUT),
+                ('معلومات الشبكة', self._scan_network, SCAN_COLLECTOR_TIMEOUT),
+                ('معلومات العمليات', self._scan_processes, SCAN_COLLECTOR_TIMEOUT * 2),
+                ('معلومات البطارية', self._scan_battery, SCAN_COLLECTOR_TIMEOUT),
+                ('معلومات درجة الحرارة', self._scan_temperature, SCAN_COLLECTOR_TIMEOUT)
+            ]
+            
+            started = time.time()
+            executor = ThreadPoolExecutor(max_workers=len(collectors), thread_name_prefix='scan')
+            futures = [(label, executor.submit(collector, system), timeout) for label, collector, timeout in collectors]
+            
+            for label, future, timeout in futures:
+                try:
+                    sections, warnings = future.result(timeout=max(0, started + timeout - time.time()))
+                except FuturesTimeoutError:
+                    scan_results['errors'].append(f'انتهت مهلة جمع {label} ({timeout} ثانية)')
+                    print(f"✗ انتهت مهلة جمع {label}")
+                    continue
+                except Exception as e:
+                    scan_results['errors'].append(f'خطأ في جمع {label}: {e}')
+                    print(f"✗ خطأ في جمع {label}: {e}")
+                    continue
                 
-                scan_results['processes_info'] = {
-                    'total_processes': total_processes,
-                    'running_processes': running_processes,
-                    'top_cpu_processes': top_cpu_processes,
-                    'top_memory_processes': top_memory_processes
-                }
-                print(f"✓ العمليات: {total_processes} عملية إجمالي، {running_processes} عملية نشطة")
-            except Exception as e:
-                scan_results['errors'].append(f'خطأ في جمع معلومات العمليات: {e}')
-                print(f"✗ خطأ في جمع معلومات العمليات: {e}")
-            
-            # 7. معلومات البطارية (إن وجدت)
-            try:
-                battery = psutil.sensors_battery()
-                if battery:
-                    scan_results['hardware_info']['battery'] = {
-                        'percent': int(battery.percent),
-                        'power_plugged': battery.power_plugged,
-                        'secsleft': battery.secsleft if battery.secsleft != -1 else None
-                    }
-                    print(f"✓ البطارية: {battery.percent}% ({'موصول' if battery.power_plugged else 'غير موصول'})")
-            except:
-                pass  # البطارية غير متاحة (جهاز مكتبي)
+                for section, value in sections.items():
+                    # hardware_info يجمعه أكثر من جامع (المعالج والبطارية والحرارة)
+                    if isinstance(scan_results.get(section), dict) and isinstance(value, dict):
+                        scan_results[section].update(value)
+                    else:
+                        scan_results[section] = value
+                scan_results['warnings'].extend(warnings)
             
-            # 8. معلومات درجة الحرارة (إن وجدت)
-            try:
-                if hasattr(psutil, 'sensors_temperatures') and system != 'Windows':
-                    temps = psutil.sensors_temperatures()
-                    if temps:
-                        temp_info = {}
-                        for name, entries in temps.items():
-                            if entries:
-                                temp_info[name] = {
-                                    'current': entries[0].current,
-                                    'high': entries[0].high if entries[0].high else None,
-                                    'critical': entries[0].critical if entries[0].critical else None
-                                }
-                        scan_results['hardware_info']['temperature'] = temp_info
-                        print(f"✓ درجة الحرارة: {list(temp_info.values())[0]['current']:.1f}°C")
-            except:
-                pass  # درجة الحرارة غير متاحة
+            # الجامع الذي تجاوز مهلته يكمل في الخلفية ولا يؤخر إرسال النتائج
+            executor.shutdown(wait=False, cancel_futures=True)
+            scan_results['scan_duration_seconds'] = round(time.time() - started, 2)
             
             # 9. إرسال نتائج الفحص إلى السيرفر
             print("\n" + "=" * 60)
-            print("جاري إرسال نتائج الفحص إلى السيرفر...")
+            print(f"جاري إرسال نتائج الفحص إلى السيرفر... (مدة الفحص {scan_results['scan_duration_seconds']} ثانية)")
             print("=" * 60)
             
             # تحديث معلومات الجهاز في السيرفر
@@ -1345,8 +1959,250 @@ class DeviceMonitor:
             traceback.print_exc()
             return False
     
+    def _static_facts(self):
+        """معلومات النظام والعتاد الثابتة (محفوظة بين الفحوصات لمدة SCAN_STATIC_TTL)"""
+        with self._static_cache_lock:
+            if self._static_cache is None or time.time() - self._static_cache_at > SCAN_STATIC_TTL:
+                cpu_freq = psutil.cpu_freq()
+                self._static_cache = {
+                    'system_info': {
+                        'platform': platform.system(),
+                        'platform_release': platform.release(),
+                        'platform_version': platform.version(),
+                        'architecture': platform.machine(),
+                        'processor': platform.processor(),
+                        'hostname': platform.node(),
+                        'python_version': platform.python_version()
+                    },
+                    'cpu': {
+                        'physical_cores': psutil.cpu_count(logical=False),
+                        'logical_cores': psutil.cpu_count(logical=True),
+                        'min_frequency_mhz': cpu_freq.min if cpu_freq else None,
+                        'max_frequency_mhz': cpu_freq.max if cpu_freq else None
+                    }
+                }
+                self._static_cache_at = time.time()
+            return self._static_cache
+    
+    # جامعو معلومات الفحص: كل جامع يعيد (الأقسام، التحذيرات)
+    
+    def _scan_system_info(self, system):
+        """1. معلومات النظام الأساسية"""
+        system_info = dict(self._static_facts()['system_info'])
+        print(f"✓ نظام التشغيل: {system_info['platform']} {system_info['platform_release']}")
+        print(f"✓ المعالج: {system_info['processor']}")
+        print(f"✓ المعمارية: {system_info['architecture']}")
+        return {'system_info': system_info}, []
+    
+    def _scan_cpu(self, system):
+        """2. معلومات المعالج (CPU)"""
+        warnings = []
+        cpu_info = dict(self._static_facts()['cpu'])
+        cpu_freq = psutil.cpu_freq()
+        # من نافذة خيط القياس إن كان يعمل (بدون انتظار ثانيتين كما في السابق)
+        window = self.sampler.window_stats() if self.sampler.running else {}
+        if 'cpu_usage' in window:
+            cpu_percent = round(window['cpu_usage']['avg'], 2)
+            cpu_per_core = self.sampler.per_core_usage()
+        else:
+            cpu_percent = psutil.cpu_percent(interval=None)
+            cpu_per_core = psutil.cpu_percent(interval=None, percpu=True)
+        
+        cpu_info.update({
+            'current_frequency_mhz': cpu_freq.current if cpu_freq else None,
+            'usage_percent': cpu_percent,
+            'usage_per_core': cpu_per_core
+        })
+        print(f"✓ المعالج: {cpu_info['physical_cores']} نواة فيزيائية، {cpu_info['logical_cores']} نواة منطقية")
+        print(f"✓ استخدام المعالج: {cpu_percent}%")
+        
+        if cpu_percent > 90:
+            warnings.append('استخدام المعالج عالي جداً (>90%)')
+        return {'hardware_info': {'cpu': cpu_info}}, warnings
+    
+    def _scan_memory(self, system):
+        """3. معلومات الذاكرة (RAM)"""
+        warnings = []
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        
+        memory_info = {
+            'total_gb': round(memory.total / (1024**3), 2),
+            'available_gb': round(memory.available / (1024**3), 2),
+            'used_gb': round(memory.used / (1024**3), 2),
+            'percent': memory.percent,
+            'swap_total_gb': round(swap.total / (1024**3), 2) if swap.total > 0 else 0,
+            'swap_used_gb': round(swap.used / (1024**3), 2) if swap.used > 0 else 0,
+            'swap_percent': swap.percent if swap.total > 0 else 0
+        }
+        print(f"✓ الذاكرة: {memory_info['total_gb']} GB إجمالي، "
+              f"{memory_info['used_gb']} GB مستخدم ({memory.percent}%)")
+        
+        if memory.percent > 90:
+            warnings.append('استخدام الذاكرة عالي جداً (>90%)')
+        return {'memory_info': memory_info}, warnings
+    
+    def _scan_storage(self, system):
+        """4. معلومات التخزين (Disk)"""
+        warnings = []
+        storage_info = {}
+        disk_info_list = []
+        if system == 'Windows':
+            # فحص جميع الأقراص في Windows
+            import string
+            partitions = psutil.disk_partitions()
+            for partition in partitions:
+                try:
+                    if partition.device and partition.device[0] in string.ascii_uppercase:
+                        disk = psutil.disk_usage(partition.device)
+                        disk_info = {
+                            'device': partition.device,
+                            'mountpoint': partition.mountpoint,
+                            'fstype': partition.fstype,
+                            'total_gb': round(disk.total / (1024**3), 2),
+                            'used_gb': round(disk.used / (1024**3), 2),
+                            'free_gb': round(disk.free / (1024**3), 2),
+                            'percent': disk.percent
+                        }
+                        disk_info_list.append(disk_info)
+                        print(f"✓ القرص {partition.device}: {disk_info['total_gb']} GB إجمالي، "
+                              f"{disk_info['used_gb']} GB مستخدم ({disk.percent}%)")
+                        
+                        if disk.percent > 90:
+                            warnings.append(f'مساحة القرص {partition.device} ممتلئة تقريباً (>90%)')
+                except Exception:
+                    continue
+            
+            # استخدام القرص الرئيسي C: للإحصائيات العامة
+            try:
+                main_disk = psutil.disk_usage('C:')
+                storage_info = {
+                    'main_disk_total_gb': round(main_disk.total / (1024**3), 2),
+                    'main_disk_used_gb': round(main_disk.used / (1024**3), 2),
+                    'main_disk_free_gb': round(main_disk.free / (1024**3), 2),
+                    'main_disk_percent': main_disk.percent,
+                    'all_disks': disk_info_list
+                }
+            except:
+                if disk_info_list:
+                    storage_info = {
+                        'all_disks': disk_info_list,
+                        'main_disk_total_gb': disk_info_list[0]['total_gb'] if disk_info_list else None,
+                        'main_disk_used_gb': disk_info_list[0]['used_gb'] if disk_info_list else None,
+                        'main_disk_free_gb': disk_info_list[0]['free_gb'] if disk_info_list else None,
+                        'main_disk_percent': disk_info_list[0]['percent'] if disk_info_list else None
+                    }
+        else:
+            # Linux/Mac
+            disk = psutil.disk_usage('/')
+            storage_info = {
+                'main_disk_total_gb': round(disk.total / (1024**3), 2),
+                'main_disk_used_gb': round(disk.used / (1024**3), 2),
+                'main_disk_free_gb': round(disk.free / (1024**3), 2),
+                'main_disk_percent': disk.percent,
+                'all_disks': [{
+                    'device': '/',
+                    'total_gb': round(disk.total / (1024**3), 2),
+                    'used_gb': round(disk.used / (1024**3), 2),
+                    'free_gb': round(disk.free / (1024**3), 2),
+                    'percent': disk.percent
+                }]
+            }
+            print(f"✓ القرص: {storage_info['main_disk_total_gb']} GB إجمالي، "
+                  f"{storage_info['main_disk_used_gb']} GB مستخدم ({disk.percent}%)")
+            
+            if disk.percent > 90:
+                warnings.append('مساحة القرص ممتلئة تقريباً (>90%)')
+        return {'storage_info': storage_info}, warnings
+    
+    def _scan_network(self, system):
+        """5. معلومات الشبكة"""
+        net_io = psutil.net_io_counters()
+        net_connections = len(psutil.net_connections(kind='inet'))
+        net_if_addrs = psutil.net_if_addrs()
+        
+        network_info = {
+            'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2),
+            'bytes_recv_mb': round(net_io.bytes_recv / (1024**2), 2),
+            'packets_sent': net_io.packets_sent,
+            'packets_recv': net_io.packets_recv,
+            'active_connections': net_connections,
+            'network_interfaces': len(net_if_addrs)
+        }
+        print(f"✓ الشبكة: {network_info['bytes_sent_mb']} MB مرسل، "
+              f"{network_info['bytes_recv_mb']} MB مستلم")
+        return {'network_info': network_info}, []
+    
+    def _scan_processes(self, system):
+        """6. معلومات العمليات (Processes)"""
+        processes = list(psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']))
+        total_processes = len(processes)
+        running_processes = sum(1 for p in processes if p.info['cpu_percent'] is not None)
+        
+        # الحصول على أفضل 5 عمليات من حيث استخدام CPU
+        top_cpu_processes = sorted(
+            [p.info for p in processes if p.info['cpu_percent'] is not None],
+            key=lambda x: x['cpu_percent'] or 0,
+            reverse=True
+        )[:5]
+        
+        # الحصول على أفضل 5 عمليات من حيث استخدام الذاكرة
+        top_memory_processes = sorted(
+            [p.info for p in processes if p.info['memory_percent'] is not None],
+            key=lambda x: x['memory_percent'] or 0,
+            reverse=True
+        )[:5]
+        
+        processes_info = {
+            'total_processes': total_processes,
+            'running_processes': running_processes,
+            'top_cpu_processes': top_cpu_processes,
+            'top_memory_processes': top_memory_processes
+        }
+        print(f"✓ العمليات: {total_processes} عملية إجمالي، {running_processes} عملية نشطة")
+        return {'processes_info': processes_info}, []
+    
+    def _scan_battery(self, system):
+        """7. معلومات البطارية (إن وجدت)"""
+        try:
+            battery = psutil.sensors_battery()
+            if battery:
+                print(f"✓ البطارية: {battery.percent}% ({'موصول' if battery.power_plugged else 'غير موصول'})")
+                return {'hardware_info': {'battery': {
+                    'percent': int(battery.percent),
+                    'power_plugged': battery.power_plugged,
+                    'secsleft': battery.secsleft if battery.secsleft != -1 else None
+                }}}, []
+        except:
+            pass  # البطارية غير متاحة (جهاز مكتبي)
+        return {}, []
+    
+    def _scan_temperature(self, system):
+        """8. معلومات درجة الحرارة (إن وجدت)"""
+        try:
+            if hasattr(psutil, 'sensors_temperatures') and system != 'Windows':
+                temps = psutil.sensors_temperatures()
+                if temps:
+                    temp_info = {}
+                    for name, entries in temps.items():
+                        if entries:
+                            temp_info[name] = {
+                                'current': entries[0].current,
+                                'high': entries[0].high if entries[0].high else None,
+                                'critical': entries[0].critical if entries[0].critical else None
+                            }
+                    print(f"✓ درجة الحرارة: {list(temp_info.values())[0]['current']:.1f}°C")
+                    return {'hardware_info': {'temperature': temp_info}}, []
+        except:
+            pass  # درجة الحرارة غير متاحة
+        return {}, []
+    
     def update_device_info_after_scan(self, scan_results):
-        """تحديث معلومات الجهاز في السيرفر بعد الفحص"""
+        """تحديث معلومات الجهاز في السيرفر بعد الفحص
+
+        بعد أول فحص يصل للخادم يُرسل الفرق فقط (الحقول والمفاتيح التي تغيرت) مع
+        بصمة الفحص السابق؛ إذا رد الخادم بـ 409 يُعاد إرسال الفحص كاملاً
+        """
         try:
             if not self.device_token:
                 print("لا يوجد token. لا يمكن تحديث معلومات الجهاز.")
@@ -1360,6 +2216,11 @@ class DeviceMonitor:
                 'disk_total': int(scan_results.get('storage_info', {}).get('main_disk_total_gb', 0)),
                 'scan_results': scan_results  # إرسال نتائج الفحص الكاملة
             }
+            # تحويل القيم لصيغة JSON (مثل tuple إلى list) حتى تطابق ما يحفظه الخادم
+            update_data = json.loads(json.dumps(update_data, default=str))
+            
+            previous = self.last_scan_sent
+            payload = scan_diff(previous, update_data) if previous is not None else update_data
             
             headers = {
                 'X-Device-Token': self.device_token,
@@ -1367,14 +2228,20 @@ class DeviceMonitor:
             }
             
             # إرسال طلب التحديث
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.server_url}/devices/api/update-after-scan",
-                json=update_data,
+                json=payload,
                 headers=headers,
                 timeout=30
             )
             
+            if response.status_code == 409 and previous is not None:
+                # الخادم لا يملك الفحص السابق - إعادة الإرسال كاملاً
+                self.last_scan_sent = None
+                return self.update_device_info_after_scan(scan_results)
+            
             if response.status_code == 200:
+                self.last_scan_sent = update_data
                 return True
             else:
                 print(f"خطأ في تحديث معلومات الجهاز: {response.text}")
@@ -1683,7 +2550,7 @@ class DeviceMonitor:
                     if window_closed:
                         duration = (datetime.datetime.now() - window_opened_at).total_seconds()
                     
-                    response = requests.post(
+                    response = self.transport.post(
                         f"{self.server_url}/actions/api/action/{action_id}/user-action",
                         headers=headers,
                         json={
@@ -1852,7 +2719,7 @@ class DeviceMonitor:
         print("نظام مراقبة الأجهزة - العميل")
         print("=" * 60)
         print(f"الخادم: {self.server_url}")
-        print(f"فترة الإرسال: كل {REPORT_INTERVAL} ثانية")
+        print(f"فترة الإرسال: كل {self.report_interval} ثانية")
         
         # التحقق من الصلاحيات على Windows
         try:
@@ -1889,7 +2756,7 @@ class DeviceMonitor:
         print("اختبار الاتصال بالسيرفر...")
         print("=" * 60)
         try:
-            test_response = requests.get(f"{self.server_url}/", timeout=5)
+            test_response = self.transport.get(f"{self.server_url}/", timeout=5, retries=0)
             if test_response.status_code == 200:
                 print("✓ الاتصال بالسيرفر: ناجح")
             else:
@@ -1898,7 +2765,9 @@ class DeviceMonitor:
             print("❌ خطأ: لا يمكن الاتصال بالسيرفر!")
             print(f"  تأكد من أن السيرفر يعمل على: {self.server_url}")
             print("  تأكد من الاتصال بالإنترنت")
-            return
+            if self.spool is None:
+                return
+            print("  💾 سيتم حفظ القياسات محلياً وإرسالها عند عودة الاتصال")
         except Exception as e:
             print(f"⚠️ تحذير في الاتصال: {e}")
         
@@ -1911,12 +2780,31 @@ class DeviceMonitor:
         consecutive_failures = 0
         max_failures = 5
         
+        # استقبال الإجراءات في خيط منفصل (long-poll) بدلاً من الاستعلام في كل دورة
+        self.start_action_listener()
+        # جمع القياسات باستمرار في الخلفية (الإرسال يقرأ ملخص النافذة فوراً)
+        self.sampler.start()
+        
+        if self.async_pipeline:
+            print("⚡ وضع asyncio: القياس والإرسال يعملان بالتوازي")
+            try:
+                asyncio.run(self._run_async())
+            except KeyboardInterrupt:
+                print("\n\n" + "=" * 60)
+                print("تم إيقاف المراقبة.")
+                print("=" * 60)
+            return
+        
         while True:
             try:
-                # إرسال القياسات
-                success = self.report_metrics()
+                cycle_started = time.time()
                 
-                if success:
+                # أخذ القياس وإرساله حسب جدولة الإرسال
+                success = self.sample_and_report()
+                
+                if success is None:
+                    pass
+                elif success:
                     consecutive_failures = 0
                 else:
                     consecutive_failures += 1
@@ -1925,10 +2813,13 @@ class DeviceMonitor:
                         print("  جاري إعادة المحاولة...")
                         consecutive_failures = 0
                 
-                # التحقق من الإجراءات المعلقة
-                self.check_pending_actions()
+                # التحقق من الإجراءات المعلقة (إذا لم يكن خيط الاستقبال يعمل ولم
+                # تصل الإجراءات مع رد إرسال القياسات)
+                if not self.action_listener_active and not self.report_includes_actions:
+                    self.check_pending_actions()
                 
-                time.sleep(REPORT_INTERVAL)
+                # الحفاظ على فترة ثابتة بين الدورات (خصم وقت القياس والإرسال)
+                time.sleep(max(0, self.report_interval - (time.time() - cycle_started)))
             except KeyboardInterrupt:
                 print("\n\n" + "=" * 60)
                 print("تم إيقاف المراقبة.")
@@ -1941,7 +2832,45 @@ class DeviceMonitor:
                     print(f"\n⚠️ تحذير: حدث خطأ {max_failures} مرات متتالية!")
                     print("  جاري إعادة المحاولة...")
                     consecutive_failures = 0
-                time.sleep(REPORT_INTERVAL)
+                time.sleep(self.report_interval)
+    
+    async def _run_async(self):
+        """خط أنابيب asyncio: القياس والإرسال في مهمتين منفصلتين
+
+        القياس يستمر بفترته الثابتة حتى لو تأخر الخادم في الرد، والإرسال يأخذ من
+        طابور صغير (يُحذف الأقدم عند امتلائه). عمليات psutil و requests متزامنة
+        فتعمل داخل run_in_executor.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=10)
+        
+        async def sampler():
+            while True:
+                started = loop.time()
+                try:
+                    metrics = await loop.run_in_executor(None, self.get_metrics)
+                    if metrics and self.scheduler.should_report(metrics):
+                        self.scheduler.mark_reported()
+                        if queue.full():
+                            queue.get_nowait()
+                        queue.put_nowait(metrics)
+                except Exception as e:
+                    print(f"❌ خطأ في جمع القياسات: {e}")
+                await asyncio.sleep(max(0, self.report_interval - (loop.time() - started)))
+        
+        async def sender():
+            while True:
+                metrics = await queue.get()
+                try:
+                    if not self.device_token:
+                        await loop.run_in_executor(None, self.register_device)
+                    await loop.run_in_executor(None, self.send_metrics, metrics)
+                    if not self.action_listener_active and not self.report_includes_actions:
+                        await loop.run_in_executor(None, self.check_pending_actions)
+                except Exception as e:
+                    print(f"❌ خطأ: {e}")
+        
+        await asyncio.gather(sampler(), sender())
 
 
 if __name__ == "__main__":
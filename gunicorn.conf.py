@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+إعدادات gunicorn للتشغيل في بيئة الإنتاج
+
+الاستخدام:
+    gunicorn -c gunicorn.conf.py app:app
+
+وضع التحميل المسبق (ML_PRELOAD=1 - الافتراضي):
+    يتم تحميل التطبيق ونماذج التعلم الآلي مرة واحدة في العملية الرئيسية قبل fork،
+    فيتشارك جميع العمال صفحات الذاكرة نفسها (copy-on-write) بدلاً من أن يحمّل
+    كل عامل نسخته الخاصة من RandomForest و GradientBoosting.
+
+مقاييس /metrics تُجمع من كل العمال عبر ملفات في METRICS_MULTIPROC_DIR
+(افتراضياً مجلد مؤقت خاص بمنفذ الخادم، يُفرّغ عند بدء التشغيل).
+"""
+
+import gc
+import os
+import tempfile
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# قبل استيراد أي وحدة من التطبيق: models/metrics.py يقرأ المجلد عند استيرادها
+os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(
+    tempfile.gettempdir(), f"device-monitoring-metrics-{bind.rsplit(':', 1)[-1]}"))
+
+from ml_models.model_memory import process_memory
+from models.metrics import metrics
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+
+# طلبات long-poll (/actions/api/pending?wait=N) تحجز خيطاً طوال الانتظار،
+# لذلك يعمل كل عامل بعدة خيوط (gthread) بدلاً من عامل sync بخيط واحد
+threads = int(os.environ.get('GUNICORN_THREADS', '32'))
+
+# حساب السعة: كل جهاز يبقي طلب long-poll مفتوحاً دائماً، فبدون حد تحجز الأجهزة كل
+# الخيوط (workers × threads = 128 افتراضياً) ويتأخر استقبال القياسات والواجهة خلفها.
+# لذلك ينتظر في كل عامل LONG_POLL_MAX_WAITERS طلباً على الأكثر (الخيوط ناقص
+# LONG_POLL_RESERVED_THREADS)، وما يزيد يُرد عليه فوراً فيستلم الجهاز إجراءاته مع رد
+# إرسال القياسات حتى يجد مكاناً. الأجهزة المنتظرة فورياً = workers × LONG_POLL_MAX_WAITERS
+# (96 افتراضياً)؛ لأسطول أكبر تُرفع GUNICORN_THREADS (خيط منتظر لا يستهلك CPU ولا
+# اتصال قاعدة بيانات، فقط ذاكرة مكدسه)
+reserved_threads = int(os.environ.get('LONG_POLL_RESERVED_THREADS', '8'))
+os.environ.setdefault('LONG_POLL_MAX_WAITERS', str(max(1, threads - reserved_threads)))
+
+# تحميل التطبيق (والنماذج) في العملية الرئيسية قبل إنشاء العمال
+preload_app = os.environ.get('ML_PRELOAD', '1') == '1'
+
+
+def on_starting(server):
+    """قبل تحميل التطبيق: حذف ملفات مقاييس العمال من التشغيل السابق"""
+    metrics.clear_multiproc_dir()
+
+
+def when_ready(server):
+    """بعد تحميل التطبيق في العملية الرئيسية - طباعة الذاكرة قبل/بعد تحميل النموذج"""
+    if not preload_app:
+        server.log.info("وضع التحميل المسبق معطّل - كل عامل سيحمّل النماذج بنفسه")
+        return
+
+    from ml_models.ml_trainer import ml_trainer
+
+    stats = ml_trainer.load_stats
+    server.log.info(
+        "تم تحميل النماذج في العملية الرئيسية: RSS قبل التحميل %s MB، بعد التحميل %s MB",
+        stats.get('rss_before_load_mb'), stats.get('rss_after_load_mb')
+    )
+
+
+def pre_fork(server, worker):
+    """قبل fork: نقل جميع الكائنات الحالية إلى الجيل الدائم لـ GC
+
+    بدون ذلك يمر جامع القمامة في كل عامل على كائنات النماذج ويعدّل رؤوسها،
+    فتُنسخ الصفحات المشتركة وتضيع فائدة copy-on-write.
+    """
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """بعد إنشاء العامل - طباعة استهلاكه للذاكرة لحظة الإنشاء"""
+    # قيم المقاييس الموروثة من العملية الرئيسية (التهيئة) لا تُحسب مرة لكل عامل
+    metrics.reset()
+    info = process_memory()
+    if info:
+        server.log.info(
+            "العامل %s: RSS %s MB، خاص (USS) %s MB، مشترك %s MB",
+            worker.pid, info.get('rss_mb'), info.get('uss_mb'), info.get('shared_mb')
+        )
+
+
+def post_worker_init(worker):
+    """بعد تهيئة العامل - تشغيل الفحص الدوري للأجهزة
+
+    كل عامل يشغّل خيط الفحص، لكن قفل الفحص في قاعدة البيانات يضمن أن عاملاً
+    واحداً فقط ينفّذ كل دورة.
+    """
+    from ml_models.fleet_sweeper import fleet_sweeper
+
+    fleet_sweeper.start(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    """عند إيقاف العامل - كتابة آخر قيم مقاييسه حتى لا تضيع من المجموع"""
+    metrics.flush()
+
+
+def child_exit(server, worker):
+    """في العملية الرئيسية بعد انتهاء العامل - حذف مقاييسه اللحظية من /metrics"""
+    metrics.mark_process_dead(worker.pid)
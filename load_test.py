@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+اختبار الحمل: محاكاة آلاف الأجهزة على خادم المراقبة
+كل جهاز افتراضي يستخدم نفس بروتوكول device_client.py (التسجيل، إرسال القياسات
+بـ MetricEncoder، الإجراءات المعلقة، إكمال الإجراء) مع قياسات اصطناعية بدلاً
+من psutil، ويُطبع في النهاية معدل الطلبات وزمن الاستجابة p50/p95/p99 ونسبة
+الأخطاء لكل endpoint
+
+استخدام:
+    python load_test.py --server http://localhost:5000 --devices 1000 --duration 60
+
+الأجهزة الافتراضية تُعرَّف بعنوان MAC ثابت حسب رقمها، فإعادة التشغيل تستخدم
+نفس الأجهزة في قاعدة البيانات بدلاً من إنشاء أجهزة جديدة
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from device_client import Transport, MetricEncoder
+from models.metrics import percentile
+
+ENDPOINTS = {
+    'register': '/devices/api/register',
+    'report': '/devices/api/report',
+    'pending': '/actions/api/pending',
+    'complete': '/actions/api/action/{action_id}/complete'
+}
+
+
+class LoadStats:
+    """زمن الاستجابة والأخطاء لكل endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        # تأخر بدء دورات الأجهزة عن موعدها (يعني أن مولّد الحمل نفسه مشبع)
+        self.schedule_lag = []
+        self.started = time.time()
+        self.finished = None
+
+    def record(self, endpoint, latency, status):
+        """تسجيل طلب؛ status هو رمز HTTP أو اسم الاستثناء عند فشل الاتصال"""
+        self.latencies[endpoint].append(latency)
+        self.statuses[endpoint][status] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[endpoint] += 1
+
+    def summary(self):
+        elapsed = (self.finished or time.time()) - self.started
+        endpoints = {}
+        for endpoint, values in self.latencies.items():
+            values = sorted(values)
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'requests_per_second': round(len(values) / elapsed, 2) if elapsed > 0 else None,
+                'errors': self.errors[endpoint],
+                'error_rate': round(self.errors[endpoint] / len(values), 4),
+                'latency_ms': {
+                    'p50': round(percentile(values, 50) * 1000, 2),
+                    'p95': round(percentile(values, 95) * 1000, 2),
+                    'p99': round(percentile(values, 99) * 1000, 2),
+                    'max': round(values[-1] * 1000, 2)
+                },
+                'statuses': {str(status): count for status, count in self.statuses[endpoint].items()}
+            }
+
+        total = sum(len(values) for values in self.latencies.values())
+        errors = sum(self.errors.values())
+        lag = sorted(self.schedule_lag)
+        return {
+            'duration_seconds': round(elapsed, 2),
+            'requests': total,
+            'requests_per_second': round(total / elapsed, 2) if elapsed > 0 else None,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else None,
+            'schedule_lag_ms': {
+                'p95': round(percentile(lag, 95) * 1000, 2) if lag else None,
+                'max': round(lag[-1] * 1000, 2) if lag else None
+            },
+            'endpoints': endpoints
+        }
+
+
+class VirtualDevice:
+    """جهاز افتراضي بقياسات اصطناعية (مستوى أساسي + دورة يومية مضغوطة + ضجيج + ارتفاعات مفاجئة)"""
+
+    def __init__(self, index, rng, spike_rate=0.01):
+        self.index = index
+        self.rng = rng
+        self.spike_rate = spike_rate
+        self.device_token = None
+        self.device_id = None
+        self.encoder = MetricEncoder()
+
+        self.base_cpu = rng.uniform(5, 40)
+        self.base_ram = rng.uniform(30, 70)
+        self.disk_usage = rng.uniform(20, 90)
+        self.base_temperature = rng.uniform(40, 55)
+        self.battery_level = rng.uniform(20, 100) if rng.random() < 0.3 else None
+        self.phase = rng.uniform(0, 2 * math.pi)
+        # عدادات الشبكة بالبايت؛ تُرسل MB تراكمية مثل device_client.get_metrics
+        self.network_in = rng.randint(0, 10 ** 9)
+        self.network_out = rng.randint(0, 10 ** 9)
+        self.spike_left = 0
+
+    @property
+    def mac_address(self):
+        # عنوان محلي الإدارة (02:...) لا يتعارض مع أجهزة حقيقية
+        return '02:4c:54:{:02x}:{:02x}:{:02x}'.format(
+            (self.index >> 16) & 0xff, (self.index >> 8) & 0xff, self.index & 0xff)
+
+    def system_info(self):
+        return {
+            'name': f'loadtest-{self.index:05d}',
+            'operating_system': 'LoadTest 1.0',
+            'processor': 'virtual',
+            'mac_address': self.mac_address,
+            'ip_address': None,
+            'device_type': 'computer',
+            'location': f'loadtest-{self.index % 10}'
+        }
+
+    def next_metrics(self, now):
+        rng = self.rng
+        # دورة "يومية" كل 10 دقائق حتى تظهر تغيرات خلال اختبار قصير
+        wave = math.sin(now / 600 * 2 * math.pi + self.phase)
+
+        if self.spike_left == 0 and rng.random() < self.spike_rate:
+            self.spike_left = rng.randint(3, 10)
+        spike = 0
+        if self.spike_left:
+            self.spike_left -= 1
+            spike = rng.uniform(30, 55)
+
+        cpu = self.base_cpu + 10 * wave + rng.gauss(0, 3) + spike
+        ram = self.base_ram + 5 * wave + rng.gauss(0, 1)
+        self.disk_usage = min(99.0, self.disk_usage + rng.uniform(0, 0.001))
+        self.network_in += rng.randint(10 ** 3, 10 ** 6)
+        self.network_out += rng.randint(10 ** 3, 10 ** 5)
+
+        metrics = {
+            'cpu_usage': round(min(max(cpu, 0), 100), 2),
+            'ram_usage': round(min(max(ram, 0), 100), 2),
+            'disk_usage': round(self.disk_usage, 2),
+            'temperature': round(self.base_temperature + cpu * 0.3 + rng.gauss(0, 0.5), 2),
+            'network_in': round(self.network_in / 1024 ** 2, 2),
+            'network_out': round(self.network_out / 1024 ** 2, 2)
+        }
+        if self.battery_level is not None:
+            self.battery_level = max(5.0, self.battery_level - rng.uniform(0, 0.05))
+            metrics['battery_level'] = round(self.battery_level, 2)
+        return metrics
+
+
+class LoadTest:
+    """تشغيل الأجهزة الافتراضية كمهام asyncio والطلبات في مجموعة خيوط"""
+
+    def __init__(self, server_url, devices=100, duration=60, interval=2.0, ramp_up=10.0,
+                 concurrency=64, poll_every=1, include_actions=False, spike_rate=0.01, seed=None):
+        self.server_url = server_url.rstrip('/')
+        self.device_count = devices
+        self.duration = duration
+        self.interval = interval
+        self.ramp_up = ramp_up
+        self.concurrency = concurrency
+        self.poll_every = poll_every
+        self.include_actions = include_actions
+        self.spike_rate = spike_rate
+        self.seed = seed
+
+        # بدون إعادة محاولة حتى يقيس الزمن طلباً واحداً فعلياً
+        self.transport = Transport(max_retries=0)
+        self.stats = LoadStats()
+        self._executor = None
+
+    def _timed(self, method, url, **kwargs):
+        """إرسال طلب في خيط وإرجاع الرد (أو None عند فشل الاتصال) مع تسجيل زمنه"""
+        started = time.perf_counter()
+        try:
+            response = self.transport.request(method, url, timeout=30, **kwargs)
+            return response, time.perf_counter() - started, response.status_code
+        except Exception as e:
+            return None, time.perf_counter() - started, type(e).__name__
+
+    async def _call(self, endpoint, method, path, **kwargs):
+        loop = asyncio.get_running_loop()
+        response, latency, status = await loop.run_in_executor(
+            self._executor, lambda: self._timed(method, self.server_url + path, **kwargs))
+        self.stats.record(endpoint, latency, status)
+        return response
+
+    async def register(self, device):
+        info = device.system_info()
+        if device.device_token:
+            info['device_token'] = device.device_token
+        response = await self._call('register', 'POST', ENDPOINTS['register'], json=info)
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            device.device_token = data.get('device_token')
+            device.device_id = data.get('device_id')
+        return device.device_token is not None
+
+    def _headers(self, device, extra=None):
+        headers = {'X-Device-Token': device.device_token, 'Content-Type': 'application/json'}
+        headers.update(extra or {})
+        return headers
+
+    async def report(self, device, metrics):
+        payload = device.encoder.encode(metrics)
+        payload['include_config'] = True
+        if self.include_actions:
+            payload['include_actions'] = True
+        body, headers = device.encoder.body(payload)
+        response = await self._call('report', 'POST', ENDPOINTS['report'], data=body,
+                                    headers=self._headers(device, headers))
+        if response is None:
+            return []
+        if response.status_code == 409 and device.encoder.base_metric_id is not None:
+            device.encoder.reset()
+            return await self.report(device, metrics)
+        if response.status_code == 200:
+            data = response.json()
+            device.encoder.acknowledge(data)
+            return data.get('actions') or []
+        return []
+
+    async def pending(self, device):
+        response = await self._call('pending', 'GET', ENDPOINTS['pending'], headers=self._headers(device))
+        if response is not None and response.status_code == 200:
+            return response.json()
+        return []
+
+    async def complete(self, device, action):
+        path = ENDPOINTS['complete'].format(action_id=action['id'])
+        await self._call('complete', 'POST', path, headers=self._headers(device),
+                         json={'status': 'completed', 'error_message': 'load test'})
+
+    async def run_device(self, device, start_delay, deadline):
+        await asyncio.sleep(start_delay)
+        if not await self.register(device):
+            return
+
+        cycle = 0
+        next_run = time.time()
+        while next_run < deadline:
+            self.stats.schedule_lag.append(max(0.0, time.time() - next_run))
+
+            actions = await self.report(device, device.next_metrics(time.time()))
+            if not self.include_actions and self.poll_every and cycle % self.poll_every == 0:
+                actions = actions + await self.pending(device)
+            for action in actions:
+                await self.complete(device, action)
+
+            cycle += 1
+            next_run += self.interval
+            await asyncio.sleep(max(0.0, next_run - time.time()))
+
+    async def run(self):
+        rng = random.Random(self.seed)
+        devices = [VirtualDevice(i, random.Random(rng.random()), self.spike_rate)
+                   for i in range(self.device_count)]
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='load')
+        self.stats = LoadStats()
+        deadline = self.stats.started + self.ramp_up + self.duration
+        try:
+            await asyncio.gather(*(
+                self.run_device(device, self.ramp_up * i / self.device_count, deadline)
+                for i, device in enumerate(devices)
+            ))
+        finally:
+            self.stats.finished = time.time()
+            self._executor.shutdown(wait=True)
+
+        result = self.stats.summary()
+        result.update({
+            'server_url': self.server_url,
+            'devices': self.device_count,
+            'registered_devices': sum(1 for device in devices if device.device_token),
+            'interval_seconds': self.interval,
+            'concurrency': self.concurrency,
+            'finished_at': datetime.now().isoformat()
+        })
+        return result
+
+
+def print_summary(result):
+    print("=" * 78)
+    print(f"الأجهزة: {result['registered_devices']}/{result['devices']}  "
+          f"المدة: {result['duration_seconds']} ثانية  "
+          f"الطلبات: {result['requests']} ({result['requests_per_second']}/ثانية)  "
+          f"الأخطاء: {result['errors']}")
+    print("-" * 78)
+    print(f"{'endpoint':<10} {'requests':>9} {'req/s':>8} {'errors':>7} {'err%':>6} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, stats in result['endpoints'].items():
+        latency = stats['latency_ms']
+        print(f"{endpoint:<10} {stats['requests']:>9} {stats['requests_per_second']:>8} "
+              f"{stats['errors']:>7} {stats['error_rate'] * 100:>6.2f} "
+              f"{latency['p50']:>8} {latency['p95']:>8} {latency['p99']:>8} {latency['max']:>8}")
+        failed = {status: count for status, count in stats['statuses'].items() if status != '200'}
+        if failed:
+            print(f"{'':<10} الحالات: {failed}")
+    print("-" * 78)
+
+    lag = result['schedule_lag_ms']
+    print(f"تأخر الجدولة p95: {lag['p95']} ms، الأقصى: {lag['max']} ms")
+    if lag['p95'] is not None and lag['p95'] > result['interval_seconds'] * 1000 * 0.5:
+        print("⚠️ مولّد الحمل متأخر عن الجدول - زد --concurrency أو قلل عدد الأجهزة")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='اختبار حمل خادم مراقبة الأجهزة بأجهزة افتراضية')
+    parser.add_argument('--server', default='http://localhost:5000', help='عنوان الخادم')
+    parser.add_argument('--devices', type=int, default=100, help='عدد الأجهزة الافتراضية')
+    parser.add_argument('--duration', type=float, default=60, help='مدة الاختبار بعد التدرج (ثانية)')
+    parser.add_argument('--interval', type=float, default=2.0, help='فترة إرسال القياسات لكل جهاز (ثانية)')
+    parser.add_argument('--ramp-up', type=float, default=10.0, help='مدة تشغيل الأجهزة تدريجياً (ثانية)')
+    parser.add_argument('--concurrency', type=int, default=64, help='أقصى عدد طلبات متزامنة')
+    parser.add_argument('--poll-every', type=int, default=1,
+                        help='طلب الإجراءات المعلقة كل N دورة إرسال (0 = بدون)')
+    parser.add_argument('--include-actions', action='store_true',
+                        help='طلب الإجراءات مع رد إرسال القياسات بدلاً من /actions/api/pending')
+    parser.add_argument('--spike-rate', type=float, default=0.01, help='احتمال بدء ارتفاع مفاجئ في كل دورة')
+    parser.add_argument('--seed', type=int, default=None, help='بذرة العشوائية لتكرار نفس القياسات')
+    parser.add_argument('--output', help='حفظ النتائج كـ JSON في هذا الملف')
+    args = parser.parse_args()
+
+    load_test = LoadTest(
+        args.server,
+        devices=args.devices,
+        duration=args.duration,
+        interval=args.interval,
+        ramp_up=args.ramp_up,
+        concurrency=args.concurrency,
+        poll_every=args.poll_every,
+        include_actions=args.include_actions,
+        spike_rate=args.spike_rate,
+        seed=args.seed
+    )
+
+    print(f"تشغيل {args.devices} جهاز افتراضي على {args.server} لمدة {args.duration} ثانية...")
+    result = asyncio.run(load_test.run())
+    print_summary(result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"تم حفظ النتائج في {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,2 @@
-# ml_models package
-
+# ml_models package
+
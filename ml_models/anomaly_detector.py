@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+كاشف الشذوذ اللحظي على مسار استقبال القياسات
+يحتفظ لكل جهاز ولكل قياس بمتوسط وتباين متحركين أسيّين (EWMA)
+ويحسب z-score لكل قياس جديد بتكلفة ثابتة O(1)، فيُكتشف الارتفاع المفاجئ
+لحظة وصول القياس بدلاً من انتظار /predict أو الفحص الشامل للأجهزة
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# القياسات المراقبة وأسماؤها في رسائل التنبيه
+METRIC_LABELS = {
+    'cpu_usage': 'استخدام المعالج',
+    'ram_usage': 'استخدام الذاكرة',
+    'temperature': 'درجة الحرارة'
+}
+
+# حد أدنى للانحراف المعياري لكل قياس حتى لا يُعتبر تذبذب بسيط شذوذاً
+# على جهاز مستقر جداً (مثلاً ذاكرة ثابتة عند 40%)
+MIN_STD = {
+    'cpu_usage': 5.0,
+    'ram_usage': 3.0,
+    'temperature': 2.0
+}
+
+
+class StreamingAnomalyDetector:
+    """كاشف شذوذ EWMA / z-score لكل (جهاز، قياس)"""
+
+    def __init__(self, alpha=0.1, z_threshold=4.0, z_critical=6.0, warmup=10,
+                 cooldown_seconds=300, max_devices=10000):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.z_critical = z_critical
+        self.warmup = warmup
+        self.cooldown_seconds = cooldown_seconds
+        self.max_devices = max_devices
+        # device_id -> {metric: {'mean', 'var', 'count', 'last_alert_at'}}
+        self._devices = OrderedDict()
+        self._lock = threading.Lock()
+
+        # إحصائيات
+        self.observed = 0
+        self.anomalies = 0
+        self.suppressed = 0
+        self.alerts_emitted = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last = None
+
+    def observe(self, device_id, sample, now=None):
+        """تمرير قياس جديد للجهاز وإرجاع قائمة الشذوذ المكتشف فيه
+
+        يُحسب z-score مقابل الحالة قبل القياس ثم تُحدَّث الحالة. يُبلَّغ فقط عن
+        الارتفاع (القيم الأعلى من المتوسط) لأن الانخفاض ليس مشكلة لهذه القياسات.
+        """
+        now = now or time.time()
+        found = []
+
+        with self._lock:
+            state = self._devices.get(device_id)
+            if state is None:
+                state = {}
+                self._devices[device_id] = state
+                while len(self._devices) > self.max_devices:
+                    self._devices.popitem(last=False)
+            else:
+                self._devices.move_to_end(device_id)
+
+            self.observed += 1
+
+            for metric in METRIC_LABELS:
+                value = sample.get(metric)
+                if value is None:
+                    continue
+                value = float(value)
+
+                stats = state.get(metric)
+                if stats is None:
+                    state[metric] = {'mean': value, 'var': 0.0, 'count': 1, 'last_alert_at': 0}
+                    continue
+
+                # التقييم مقابل الحالة السابقة
+                std = max(math.sqrt(stats['var']), MIN_STD[metric])
+                z = (value - stats['mean']) / std
+
+                if stats['count'] >= self.warmup and z >= self.z_threshold:
+                    if now - stats['last_alert_at'] >= self.cooldown_seconds:
+                        stats['last_alert_at'] = now
+                        self.anomalies += 1
+                        found.append({
+                            'metric': metric,
+                            'label': METRIC_LABELS[metric],
+                            'value': round(value, 2),
+                            'mean': round(stats['mean'], 2),
+                            'std': round(std, 2),
+                            'z_score': round(z, 2),
+                            'severity': 'critical' if z >= self.z_critical else 'warning'
+                        })
+                    else:
+                        self.suppressed += 1
+
+                # تحديث المتوسط والتباين الأسيّين
+                diff = value - stats['mean']
+                increment = self.alpha * diff
+                stats['mean'] += increment
+                stats['var'] = (1 - self.alpha) * (stats['var'] + diff * increment)
+                stats['count'] += 1
+
+        return found
+
+    def record_alert(self, received_at):
+        """تسجيل زمن الاكتشاف (من استقبال القياس حتى حفظ التنبيه) بالثواني"""
+        latency = time.time() - received_at
+        with self._lock:
+            self.alerts_emitted += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.latency_last = latency
+
+    def discard(self, device_id):
+        """حذف حالة الجهاز (مثلاً عند حذف الجهاز)"""
+        with self._lock:
+            self._devices.pop(device_id, None)
+
+    def stats(self):
+        """إحصائيات الكاشف"""
+        with self._lock:
+            return {
+                'devices': len(self._devices),
+                'observed': self.observed,
+                'anomalies': self.anomalies,
+                'suppressed': self.suppressed,
+                'alerts_emitted': self.alerts_emitted,
+                'z_threshold': self.z_threshold,
+                'detection_latency_seconds': {
+                    'avg': round(self.latency_total / self.alerts_emitted, 4) if self.alerts_emitted else None,
+                    'max': round(self.latency_max, 4) if self.alerts_emitted else None,
+                    'last': round(self.latency_last, 4) if self.latency_last is not None else None
+                }
+            }
+
+# إنشاء كائن الكاشف
+anomaly_detector = StreamingAnomalyDetector(
+    z_threshold=float(os.environ.get('ANOMALY_Z_THRESHOLD', '4.0')),
+    cooldown_seconds=int(os.environ.get('ANOMALY_COOLDOWN_SECONDS', '300'))
+)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مخزن الخصائص المتدحرجة لتحليل الاتجاهات
+يحتفظ لكل جهاز بنافذة من آخر القياسات مع المجاميع اللازمة للانحدار الخطي
+(المجموع، مجموع المربعات، مجموع الجداءات) والمتوسط المتحرك الأسي،
+ويحدّثها بتكلفة ثابتة O(1) لكل قياس جديد
+"""
+
+import math
+import os
+import threading
+from collections import OrderedDict, deque
+
+# القياسات التي يمررها مسار التنبؤ كسجل تاريخي
+TRACKED_METRICS = ('cpu_usage', 'ram_usage', 'temperature')
+
+
+class RollingWindow:
+    """نافذة متدحرجة لقياس واحد
+
+    الترتيب مطابق للسجل التاريخي الذي تمرره المسارات (الأحدث أولاً)،
+    أي أن الموضع x = 0 هو أحدث قياس، حتى يطابق الميل ما يحسبه
+    AIEnhancedPredictor._calculate_trend_factor على نفس البيانات.
+    """
+    
+    # إعادة حساب المجاميع من القيم كل عدد من التحديثات لتفادي تراكم أخطاء الفاصلة العائمة
+    RESYNC_EVERY = 1000
+    
+    def __init__(self, size, ewma_alpha):
+        self.size = size
+        self.ewma_alpha = ewma_alpha
+        self.values = deque()  # الأحدث في البداية
+        self.sum_y = 0.0
+        self.sum_yy = 0.0
+        self.sum_xy = 0.0
+        self.ewma = None
+        self._updates = 0
+    
+    def push(self, value):
+        """إضافة قياس جديد (O(1))"""
+        value = float(value or 0)
+        
+        # إخراج أقدم قيمة (موضعها n - 1) عند امتلاء النافذة
+        if len(self.values) == self.size:
+            oldest = self.values.pop()
+            self.sum_y -= oldest
+            self.sum_yy -= oldest * oldest
+            self.sum_xy -= (len(self.values)) * oldest
+        
+        # إزاحة جميع القيم الحالية موضعاً واحداً: sum(x * y) يزيد بمقدار sum(y)
+        self.sum_xy += self.sum_y
+        
+        # القيمة الجديدة في الموضع 0 فلا تضيف شيئاً إلى sum_xy
+        self.values.appendleft(value)
+        self.sum_y += value
+        self.sum_yy += value * value
+        
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            self.ewma = self.ewma_alpha * value + (1 - self.ewma_alpha) * self.ewma
+        
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            self._resync()
+    
+    def _resync(self):
+        """إعادة حساب المجاميع بدقة من القيم المحفوظة"""
+        self.sum_y = sum(self.values)
+        self.sum_yy = sum(v * v for v in self.values)
+        self.sum_xy = sum(x * v for x, v in enumerate(self.values))
+    
+    def features(self):
+        """الميل والمتوسط والانحراف المعياري وعاملا الاتجاه والتقلب"""
+        n = len(self.values)
+        if n == 0:
+            return {'count': 0, 'mean': 0, 'std': 0, 'slope': 0, 'ewma': 0, 'trend': 0, 'volatility': 0}
+        
+        mean = self.sum_y / n
+        variance = max(0.0, self.sum_yy / n - mean * mean)
+        std = math.sqrt(variance)
+        
+        slope = 0.0
+        if n >= 2:
+            sum_x = n * (n - 1) / 2
+            sum_xx = (n - 1) * n * (2 * n - 1) / 6
+            slope = (n * self.sum_xy - sum_x * self.sum_y) / (n * sum_xx - sum_x * sum_x)
+        
+        # نفس تطبيع _calculate_trend_factor و _calculate_volatility
+        trend = math.tanh(slope / mean * 10) if (n >= 2 and mean > 0) else 0
+        volatility = min(1.0, std / mean) if (n >= 2 and mean > 0) else 0
+        
+        return {
+            'count': n,
+            'mean': mean,
+            'std': std,
+            'slope': slope,
+            'ewma': self.ewma,
+            'trend': trend,
+            'volatility': volatility
+        }
+
+
+class RollingFeatureStore:
+    """مخزن الخصائص المتدحرجة لجميع الأجهزة"""
+    
+    def __init__(self, window_size=20, ewma_alpha=0.3, max_devices=10000):
+        self.window_size = window_size
+        self.ewma_alpha = ewma_alpha
+        self.max_devices = max_devices
+        # device_id -> {'metric_id': معرّف آخر قياس في النافذة, 'windows': {metric: RollingWindow}}
+        self._devices = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # إحصائيات
+        self.updates = 0
+        self.rebuilds = 0
+    
+    def _new_state(self):
+        return {
+            'metric_id': None,
+            'windows': {m: RollingWindow(self.window_size, self.ewma_alpha) for m in TRACKED_METRICS}
+        }
+    
+    def _store_state(self, device_id, state):
+        self._devices[device_id] = state
+        self._devices.move_to_end(device_id)
+        while len(self._devices) > self.max_devices:
+            self._devices.popitem(last=False)
+    
+    def tracks(self, device_id):
+        """هل توجد نافذة محفوظة لهذا الجهاز (لتفادي استعلامات غير ضرورية عند الاستقبال)"""
+        with self._lock:
+            return device_id in self._devices
+    
+    def update(self, device_id, previous_metric_id, metric_id, sample):
+        """تحديث نافذة الجهاز بقياس جديد (يُستدعى من مسار استقبال القياسات)
+
+        يتم التحديث فقط إذا كانت النافذة تنتهي بالقياس السابق مباشرة؛ وإلا
+        (قياس استقبله عامل آخر مثلاً) تُحذف الحالة ويُعاد بناؤها عند القراءة.
+        """
+        with self._lock:
+            state = self._devices.get(device_id)
+            if state is None:
+                return
+            
+            if state['metric_id'] != previous_metric_id:
+                del self._devices[device_id]
+                return
+            
+            for metric, window in state['windows'].items():
+                window.push(sample.get(metric))
+            state['metric_id'] = metric_id
+            self._devices.move_to_end(device_id)
+            self.updates += 1
+    
+    def rebuild(self, device_id, samples):
+        """إعادة بناء نافذة الجهاز من قياسات قاعدة البيانات (الأحدث أولاً، مع id)"""
+        state = self._new_state()
+        samples = samples[:self.window_size]
+        
+        # الإضافة من الأقدم إلى الأحدث
+        for sample in reversed(samples):
+            for metric, window in state['windows'].items():
+                window.push(sample.get(metric))
+        state['metric_id'] = samples[0]['id'] if samples else None
+        
+        with self._lock:
+            self._store_state(device_id, state)
+            self.rebuilds += 1
+        
+        return self._features(state)
+    
+    def get(self, device_id, metric_id):
+        """الحصول على الخصائص المحسوبة إذا كانت النافذة محدّثة حتى القياس المحدد"""
+        with self._lock:
+            state = self._devices.get(device_id)
+            if state is None or state['metric_id'] != metric_id:
+                return None
+            self._devices.move_to_end(device_id)
+            return self._features(state)
+    
+    def discard(self, device_id):
+        """حذف حالة الجهاز (مثلاً عند حذف الجهاز)"""
+        with self._lock:
+            self._devices.pop(device_id, None)
+    
+    def _features(self, state):
+        features = {metric: window.features() for metric, window in state['windows'].items()}
+        features['count'] = len(state['windows'][TRACKED_METRICS[0]].values)
+        return features
+    
+    def stats(self):
+        """إحصائيات المخزن"""
+        with self._lock:
+            return {
+                'devices': len(self._devices),
+                'window_size': self.window_size,
+                'updates': self.updates,
+                'rebuilds': self.rebuilds
+            }
+
+# إنشاء كائن المخزن
+feature_store = RollingFeatureStore(window_size=int(os.environ.get('FEATURE_WINDOW_SIZE', '20')))
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+الفحص الدوري لصحة الأجهزة في الخلفية
+يقيّم الأجهزة على دفعات (shards) ويعيد تقييم الأجهزة التي وصلتها قياسات
+جديدة منذ آخر تقييم فقط، ويصدر التنبيهات من التنبؤات دون طلب يدوي
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+from models.database import get_db, query_db
+from models.alerts import upsert_open_alerts
+from ml_models.smart_predictor import smart_predictor as predictor
+
+# مفتاح قفل الفحص في جدول الإعدادات (حتى يفحص عامل واحد فقط في كل دورة)
+LEASE_KEY = 'fleet_sweep_lease'
+# نتيجة آخر فحص وعدد الفحوصات (مشتركة بين العمال لأن عاملاً واحداً فقط يفحص)
+STATS_KEY = 'fleet_sweep_stats'
+
+
+# عدد القياسات التاريخية لكل جهاز في الفحص (نفس سجل /alerts/api/check-devices الأصلي)
+SWEEP_HISTORY_SIZE = 10
+
+
+def _recent_history(device_ids, limit=SWEEP_HISTORY_SIZE):
+    """آخر limit قياس لكل جهاز في استعلام واحد للدفعة {device_id: [قياسات، الأحدث أولاً]}"""
+    placeholders = ','.join('?' * len(device_ids))
+    rows = query_db(f'''
+        SELECT device_id, cpu_usage, ram_usage, temperature FROM (
+            SELECT device_id, cpu_usage, ram_usage, temperature,
+                   ROW_NUMBER() OVER (PARTITION BY device_id ORDER BY timestamp DESC) AS position
+            FROM device_metrics
+            WHERE device_id IN ({placeholders})
+        )
+        WHERE position <= ?
+        ORDER BY device_id, position
+    ''', (*device_ids, limit))
+
+    history = {device_id: [] for device_id in device_ids}
+    for m in rows:
+        history[m['device_id']].append({
+            'cpu_usage': m['cpu_usage'] or 0,
+            'ram_usage': m['ram_usage'] or 0,
+            'temperature': m['temperature'] or 0
+        })
+    return history
+
+
+def evaluate_device(device, latest_metric, historical_metrics):
+    """تقييم جهاز واحد دون الكتابة في قاعدة البيانات
+
+    historical_metrics: آخر القياسات من _recent_history (الأحدث أولاً)
+    يعيد (الحالة الجديدة أو None إذا لم تتغير، قائمة التنبيهات لإدراجها عبر upsert_open_alerts)
+    """
+    # تحضير بيانات الجهاز
+    device_data = {
+        'cpu_usage': latest_metric['cpu_usage'] or 0,
+        'ram_usage': latest_metric['ram_usage'] or 0,
+        'disk_usage': latest_metric['disk_usage'] or 0,
+        'temperature': latest_metric['temperature'] or 0,
+        'battery_level': latest_metric['battery_level']
+    }
+
+    historical_data = historical_metrics if len(historical_metrics) > 1 else None
+
+    # استخدام النظام الذكي للتنبؤ (يتعلم من البيانات)
+    prediction = predictor.predict_failure(device_data, historical_data)
+
+    # الحالة الجديدة تُكتب مع باقي أجهزة الدفعة
+    new_status = prediction['risk_level'] if prediction['risk_level'] != 'low' else 'healthy'
+    if new_status == device['status']:
+        new_status = None
+
+    # تجهيز التنبيهات (منع التكرار يتم عند الإدراج بالبصمة)
+    alerts = [
+        {
+            'device_id': device['id'],
+            'location': device['location'],
+            'alert_type': alert['type'],
+            'severity': alert['severity'],
+            'message': f'{device["name"]}: {alert["message"]}',
+            'created_at': datetime.now()
+        }
+        for alert in prediction['alerts']
+    ]
+
+    return new_status, alerts
+
+
+class FleetSweeper:
+    """مجدول الفحص الدوري للأجهزة"""
+
+    def __init__(self, interval=60, shard_size=200):
+        self.interval = interval
+        self.shard_size = shard_size
+        # القفل يبقى صالحاً لفترة أطول من دورة واحدة حتى لا يبدأ عامل آخر أثناء الفحص
+        self.lease_seconds = max(30, interval * 2)
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        # مرات تخطي الفحص في هذا العامل لأن القفل مع عامل آخر
+        # (عدد الفحوصات ونتيجة آخر فحص في جدول الإعدادات: STATS_KEY)
+        self.lease_skipped = 0
+
+    def start(self, app):
+        """تشغيل الفحص الدوري في خيط خلفي (مرة واحدة لكل عملية)"""
+        if self.interval <= 0:
+            print("الفحص الدوري للأجهزة معطّل (FLEET_SWEEP_INTERVAL=0)")
+            return False
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+
+            self.owner = f'{socket.gethostname()}:{os.getpid()}'
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app,), name='fleet-sweeper', daemon=True)
+            self._thread.start()
+
+        print(f"تم تشغيل الفحص الدوري للأجهزة كل {self.interval} ثانية")
+        return True
+
+    def stop(self):
+        """إيقاف الفحص الدوري"""
+        self._stop.set()
+
+    def _run(self, app):
+        while not self._stop.wait(self.interval):
+            try:
+                with app.app_context():
+                    if self._acquire_lease():
+                        self.sweep()
+                    else:
+                        self.lease_skipped += 1
+            except Exception as e:
+                print(f"خطأ في الفحص الدوري للأجهزة: {e}")
+                try:
+                    with app.app_context():
+                        self._record_error(str(e))
+                except Exception:
+                    pass
+
+    def _acquire_lease(self):
+        """الحصول على قفل الفحص أو تجديده (compare-and-set على جدول الإعدادات)"""
+        db = get_db()
+        now = time.time()
+        db.execute('''
+            INSERT OR IGNORE INTO settings (setting_key, setting_value, description)
+            VALUES (?, '', 'قفل الفحص الدوري للأجهزة')
+        ''', (LEASE_KEY,))
+
+        # القيمة بصيغة "المالك|وقت الانتهاء"؛ يُمنح القفل إذا كان فارغاً أو منتهياً أو لنفس المالك
+        cursor = db.execute('''
+            UPDATE settings
+            SET setting_value = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE setting_key = ?
+            AND (setting_value = ''
+                 OR CAST(substr(setting_value, instr(setting_value, '|') + 1) AS REAL) < ?
+                 OR setting_value LIKE ?)
+        ''', (f'{self.owner}|{now + self.lease_seconds}', LEASE_KEY, now, f'{self.owner}|%'))
+        db.commit()
+        return cursor.rowcount == 1
+
+    def _fetch_shard(self, after_id):
+        return query_db('''
+            SELECT d.*,
+                   (SELECT id FROM device_metrics
+                    WHERE device_id = d.id
+                    ORDER BY timestamp DESC LIMIT 1) AS latest_metric_id
+            FROM devices d
+            WHERE d.is_active = 1 AND d.id > ?
+            ORDER BY d.id
+            LIMIT ?
+        ''', (after_id, self.shard_size))
+
+    def sweep(self, only_dirty=True):
+        """فحص جميع الأجهزة النشطة على دفعات
+
+        only_dirty: تقييم الأجهزة التي وصلتها قياسات جديدة منذ آخر تقييم فقط
+        """
+        started = time.time()
+        result = {
+            'started_at': datetime.now().isoformat(),
+            'only_dirty': only_dirty,
+            'scanned': 0,
+            'evaluated': 0,
+            'skipped': 0,
+            'shards': 0,
+            'new_alerts': 0,
+            'updated_devices': 0
+        }
+
+        db = get_db()
+        after_id = 0
+        while True:
+            devices = self._fetch_shard(after_id)
+            if not devices:
+                break
+
+            result['shards'] += 1
+            result['scanned'] += len(devices)
+
+            pending = []
+            for device in devices:
+                if device['latest_metric_id'] is None:
+                    continue
+                if only_dirty and device['latest_metric_id'] == device['last_evaluated_metric_id']:
+                    result['skipped'] += 1
+                    continue
+                pending.append(device)
+
+            if pending:
+                self._evaluate_shard(db, pending, result)
+
+            after_id = devices[-1]['id']
+            if len(devices) < self.shard_size:
+                break
+
+            # تجديد القفل بين الدفعات للفحوصات الطويلة
+            if only_dirty and self._thread is not None:
+                self._acquire_lease()
+
+        duration = time.time() - started
+        result['duration_seconds'] = round(duration, 3)
+        result['devices_per_second'] = round(result['evaluated'] / duration, 2) if duration > 0 else None
+        result['owner'] = self.owner
+
+        self._record_sweep(result)
+        return result
+
+    def _evaluate_shard(self, db, devices, result):
+        """تقييم أجهزة دفعة واحدة: قراءة القياسات باستعلامين وكتابة النتائج في commit واحد"""
+        metric_ids = [device['latest_metric_id'] for device in devices]
+        placeholders = ','.join('?' * len(metric_ids))
+        latest_metrics = {
+            m['id']: m
+            for m in query_db(f'SELECT * FROM device_metrics WHERE id IN ({placeholders})', tuple(metric_ids))
+        }
+
+        history = _recent_history([device['id'] for device in devices])
+
+        status_rows = []
+        evaluated_rows = []
+        shard_alerts = []
+        for device in devices:
+            latest_metric = latest_metrics.get(device['latest_metric_id'])
+            if not latest_metric:
+                continue
+
+            new_status, alerts = evaluate_device(device, latest_metric, history[device['id']])
+            evaluated_rows.append((device['latest_metric_id'], device['id']))
+            shard_alerts.extend(alerts)
+            if new_status:
+                status_rows.append((new_status, device['id']))
+
+        db.executemany('UPDATE devices SET status = ? WHERE id = ?', status_rows)
+        db.executemany('UPDATE devices SET last_evaluated_metric_id = ? WHERE id = ?', evaluated_rows)
+        # تنبيهات الدفعة كاملة في نفس المعاملة
+        result['new_alerts'] += upsert_open_alerts(shard_alerts, commit=False)
+        db.commit()
+
+        result['evaluated'] += len(evaluated_rows)
+        result['updated_devices'] += len(status_rows)
+
+    def _ensure_stats_row(self, db):
+        db.execute('''
+            INSERT OR IGNORE INTO settings (setting_key, setting_value, description)
+            VALUES (?, '{}', 'نتيجة آخر فحص دوري للأجهزة')
+        ''', (STATS_KEY,))
+
+    def _record_sweep(self, result):
+        """حفظ نتيجة الفحص وزيادة عدد الفحوصات في جدول الإعدادات (يقرؤها أي عامل)"""
+        db = get_db()
+        self._ensure_stats_row(db)
+        db.execute('''
+            UPDATE settings
+            SET setting_value = json_set(setting_value,
+                    '$.sweeps_run', COALESCE(json_extract(setting_value, '$.sweeps_run'), 0) + 1,
+                    '$.last_sweep', json(?),
+                    '$.last_error', NULL),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE setting_key = ?
+        ''', (json.dumps(result), STATS_KEY))
+        db.commit()
+
+    def _record_error(self, error):
+        db = get_db()
+        self._ensure_stats_row(db)
+        db.execute('''
+            UPDATE settings
+            SET setting_value = json_set(setting_value, '$.last_error', ?, '$.last_error_at', ?),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE setting_key = ?
+        ''', (error, datetime.now().isoformat(), STATS_KEY))
+        db.commit()
+
+    def stored_stats(self):
+        """عدد الفحوصات ونتيجة آخر فحص وآخر خطأ من جدول الإعدادات"""
+        row = query_db('SELECT setting_value FROM settings WHERE setting_key = ?', (STATS_KEY,), one=True)
+        stats = json.loads(row['setting_value']) if row and row['setting_value'] else {}
+        return {
+            'sweeps_run': stats.get('sweeps_run', 0),
+            'last_sweep': stats.get('last_sweep'),
+            'last_error': stats.get('last_error'),
+            'last_error_at': stats.get('last_error_at')
+        }
+
+    def backlog(self):
+        """عدد الأجهزة النشطة التي تنتظر إعادة التقييم"""
+        row = query_db('''
+            SELECT COUNT(*) AS count FROM (
+                SELECT d.last_evaluated_metric_id,
+                       (SELECT id FROM device_metrics
+                        WHERE device_id = d.id
+                        ORDER BY timestamp DESC LIMIT 1) AS latest_metric_id
+                FROM devices d
+                WHERE d.is_active = 1
+            )
+            WHERE latest_metric_id IS NOT NULL
+            AND latest_metric_id IS NOT last_evaluated_metric_id
+        ''', one=True)
+        return row['count'] if row else 0
+
+    def status(self):
+        """حالة المجدول وآخر فحص"""
+        lease = query_db('SELECT setting_value FROM settings WHERE setting_key = ?', (LEASE_KEY,), one=True)
+        lease_owner = None
+        if lease and lease['setting_value']:
+            owner, _, expires = lease['setting_value'].rpartition('|')
+            if float(expires or 0) > time.time():
+                lease_owner = owner
+
+        return dict(
+            self.stored_stats(),
+            running=self._thread is not None and self._thread.is_alive(),
+            owner=self.owner,
+            lease_owner=lease_owner,
+            interval_seconds=self.interval,
+            shard_size=self.shard_size,
+            lease_skipped=self.lease_skipped,
+            backlog=self.backlog()
+        )
+
+# إنشاء كائن المجدول
+fleet_sweeper = FleetSweeper(
+    interval=int(os.environ.get('FLEET_SWEEP_INTERVAL', '60')),
+    shard_size=int(os.environ.get('FLEET_SWEEP_SHARD_SIZE', '200'))
+)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تقرير استهلاك الذاكرة لنماذج التعلم الآلي
+يوضح استهلاك كل عامل (worker) من الذاكرة والجزء المشترك مع العملية الرئيسية
+"""
+
+import os
+
+# psutil اختياري - بدونه يعود التقرير فارغاً
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+
+def process_memory(pid=None):
+    """معلومات ذاكرة عملية واحدة (RSS و USS و الجزء المشترك) بالميغابايت"""
+    if psutil is None:
+        return None
+
+    try:
+        process = psutil.Process(pid or os.getpid())
+        info = {
+            'pid': process.pid,
+            'rss_mb': round(process.memory_info().rss / MB, 2)
+        }
+
+        # USS = الذاكرة الخاصة بالعملية فقط (ما لا تتشاركه مع غيرها)
+        try:
+            full_info = process.memory_full_info()
+            info['uss_mb'] = round(full_info.uss / MB, 2)
+            if hasattr(full_info, 'pss'):
+                info['pss_mb'] = round(full_info.pss / MB, 2)
+            info['shared_mb'] = round(max(0, info['rss_mb'] - info['uss_mb']), 2)
+        except (psutil.AccessDenied, AttributeError):
+            pass
+
+        return info
+    except psutil.Error:
+        return None
+
+
+def current_rss():
+    """RSS للعملية الحالية بالبايت (أو None إذا لم يكن psutil متوفراً)"""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process().memory_info().rss
+    except psutil.Error:
+        return None
+
+
+def workers_memory_report():
+    """تقرير الذاكرة لجميع العمال التابعين لنفس العملية الرئيسية (gunicorn master)"""
+    if psutil is None:
+        return {'available': False, 'message': 'psutil غير مثبت'}
+
+    report = {
+        'available': True,
+        'current': process_memory(),
+        'master': None,
+        'workers': []
+    }
+
+    try:
+        parent = psutil.Process(os.getpid()).parent()
+        # تحت gunicorn تكون العملية الأب هي master وباقي أبنائها هم العمال
+        if parent is not None and 'gunicorn' in ' '.join(parent.cmdline()):
+            report['master'] = process_memory(parent.pid)
+            for child in parent.children():
+                child_info = process_memory(child.pid)
+                if child_info:
+                    report['workers'].append(child_info)
+    except psutil.Error:
+        pass
+
+    if report['workers']:
+        report['total_rss_mb'] = round(sum(w['rss_mb'] for w in report['workers']), 2)
+        if all('uss_mb' in w for w in report['workers']):
+            report['total_uss_mb'] = round(sum(w['uss_mb'] for w in report['workers']), 2)
+
+    return report
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+قياس زمن مراحل سلسلة التنبؤ
+SmartPredictor.predict_failure يمر على MLTrainer.predict ثم مراحل AIEnhancedPredictor
+(المخاطرة، الاتجاهات، التنبيهات، التوصيات) ثم _merge_predictions؛ لكل مرحلة عداد وزمن
+كلي و p50/p95 تُعرض على /ml/profile وكمدرج ml_pipeline_stage_seconds على /metrics.
+اختيارياً يُلتقط cProfile لنسبة من التنبؤات (عينة) لمعرفة الدوال الأبطأ داخل المرحلة
+
+معطل افتراضياً (بدون كلفة تذكر):
+    PIPELINE_PROFILER=1             تفعيل مؤقتات المراحل
+    PIPELINE_CPROFILE_RATE=0.01     نسبة التنبؤات التي يُلتقط لها cProfile (0 = بدون)
+التغيير من POST /ml/profile يُحفظ في جدول settings ويطبقه كل عامل
+(models/profiler_settings.py)، والتقارير تُجمع من كل العمال (METRICS_MULTIPROC_DIR)
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+from models.metrics import PIPELINE_STAGE_DURATION, metrics, percentile
+
+# كائن فارغ يُعاد عند التعطيل حتى لا يُنشأ مؤقت لكل مرحلة
+_DISABLED = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.observe(self.name, time.perf_counter() - self.started, failed=exc_type is not None)
+        return False
+
+
+class _SampledProfile:
+    __slots__ = ('profiler', 'name', 'profile', 'started')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profile = cProfile.Profile()
+        self.started = time.perf_counter()
+        try:
+            self.profile.enable()
+        except ValueError:
+            # محلل آخر يعمل في نفس العملية
+            self.profile = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._local.profiling = False
+        if self.profile is not None:
+            self.profile.disable()
+            self.profiler.add_capture(self.name, time.perf_counter() - self.started, self.profile)
+        return False
+
+
+class PipelineProfiler:
+    """مؤقتات مراحل التنبؤ مع التقاط cProfile لعينة من الاستدعاءات"""
+
+    def __init__(self, enabled=False, cprofile_sample_rate=0.0, sample_size=1000, max_captures=10):
+        self.enabled = enabled
+        self.cprofile_sample_rate = cprofile_sample_rate
+        self.sample_size = sample_size
+        self._stages = {}
+        self._captures = deque(maxlen=max_captures)
+        self._lock = threading.Lock()
+        # cProfile لا يعمل متداخلاً، فالتقاط واحد لكل خيط في نفس الوقت
+        self._local = threading.local()
+        self.started_at = datetime.now()
+
+    def configure(self, config):
+        """تطبيق الإعدادات المشتركة بين العمال: enabled و cprofile_sample_rate و reset_at (epoch)"""
+        if 'enabled' in config:
+            self.enabled = bool(config['enabled'])
+        if config.get('cprofile_sample_rate') is not None:
+            self.cprofile_sample_rate = max(0.0, min(1.0, float(config['cprofile_sample_rate'])))
+        reset_at = config.get('reset_at')
+        if reset_at and datetime.fromtimestamp(reset_at) > self.started_at:
+            self.reset()
+
+    def stage(self, name):
+        """with pipeline_profiler.stage('ai.risk'): ... يقيس زمن المرحلة إذا كان المحلل مفعلاً"""
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, name)
+
+    def sampled_profile(self, name):
+        """التقاط cProfile لاستدعاء بنسبة cprofile_sample_rate"""
+        if (not self.enabled or self.cprofile_sample_rate <= 0
+                or getattr(self._local, 'profiling', False)
+                or random.random() >= self.cprofile_sample_rate):
+            return _DISABLED
+        self._local.profiling = True
+        return _SampledProfile(self, name)
+
+    def observe(self, name, duration, failed=False):
+        PIPELINE_STAGE_DURATION.observe(duration, stage=name)
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = {
+                    'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0,
+                    'durations': deque(maxlen=self.sample_size)
+                }
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            stats['durations'].append(duration)
+            if failed:
+                stats['errors'] += 1
+
+    def add_capture(self, name, duration, profile, limit=25):
+        output = io.StringIO()
+        pstats.Stats(profile, stream=output).strip_dirs().sort_stats('cumulative').print_stats(limit)
+        with self._lock:
+            self._captures.append({
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'stage': name,
+                'duration_ms': round(duration * 1000, 3),
+                'profile': output.getvalue()
+            })
+
+    def snapshot(self):
+        """حالة المحلل في هذا العامل بصيغة JSON (None إذا كانت فارغة)"""
+        with self._lock:
+            if not self._stages and not self._captures:
+                return None
+            return {
+                'stages': {name: dict(stats, durations=list(stats['durations'])) for name, stats in self._stages.items()},
+                'captures': list(self._captures)
+            }
+
+    def report(self):
+        """إحصائيات كل مرحلة من كل العمال مرتبة حسب الزمن الكلي"""
+        merged = {}
+        for _, state in metrics.worker_snapshots('pipeline_profiler'):
+            for name, stats in state['stages'].items():
+                entry = merged.get(name)
+                if entry is None:
+                    merged[name] = dict(stats, durations=list(stats['durations']))
+                    continue
+                for field in ('count', 'errors', 'total'):
+                    entry[field] += stats[field]
+                entry['max'] = max(entry['max'], stats['max'])
+                entry['durations'].extend(stats['durations'])
+
+        stages = []
+        for name, stats in merged.items():
+            durations = sorted(stats['durations'])
+            stages.append({
+                'stage': name,
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'total_ms': round(stats['total'] * 1000, 2),
+                'avg_ms': round(stats['total'] / stats['count'] * 1000, 4),
+                'p50_ms': round(percentile(durations, 50) * 1000, 4),
+                'p95_ms': round(percentile(durations, 95) * 1000, 4),
+                'max_ms': round(stats['max'] * 1000, 4)
+            })
+        stages.sort(key=lambda stage: stage['total_ms'], reverse=True)
+        return stages
+
+    def captures(self):
+        """آخر التقاطات cProfile من كل العمال (الأحدث أولاً)"""
+        captures = [
+            dict(capture, worker=pid)
+            for pid, state in metrics.worker_snapshots('pipeline_profiler')
+            for capture in state['captures']
+        ]
+        captures.sort(key=lambda capture: capture['timestamp'], reverse=True)
+        return captures[:self._captures.maxlen]
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._captures.clear()
+            self.started_at = datetime.now()
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'cprofile_sample_rate': self.cprofile_sample_rate,
+            'started_at': self.started_at.isoformat(timespec='seconds')
+        }
+
+# إنشاء كائن قياس مراحل التنبؤ
+pipeline_profiler = PipelineProfiler(
+    enabled=os.environ.get('PIPELINE_PROFILER') == '1',
+    cprofile_sample_rate=float(os.environ.get('PIPELINE_CPROFILE_RATE', '0'))
+)
+metrics.register_snapshot('pipeline_profiler', pipeline_profiler.snapshot)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ذاكرة تخزين مؤقت لنتائج التنبؤ
+تحفظ آخر تنبؤ لكل جهاز مرتبطاً بإصدار القياسات (معرّف آخر قياس)
+فلا يُعاد حساب التنبؤ إلا عند وصول قياس جديد
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """ذاكرة مؤقتة LRU محدودة الحجم لنتائج التنبؤ لكل جهاز"""
+    
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # device_id -> (metric_version, prediction)
+        self._lock = threading.Lock()
+        
+        # إحصائيات
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, device_id, metric_version):
+        """الحصول على التنبؤ المحفوظ إذا كان مطابقاً لإصدار القياسات الحالي"""
+        with self._lock:
+            entry = self._entries.get(device_id)
+            if entry is None or entry[0] != metric_version:
+                self.misses += 1
+                return None
+            
+            # تحديث ترتيب الاستخدام (LRU)
+            self._entries.move_to_end(device_id)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, device_id, metric_version, prediction):
+        """حفظ نتيجة التنبؤ لإصدار قياسات معين"""
+        with self._lock:
+            self._entries[device_id] = (metric_version, prediction)
+            self._entries.move_to_end(device_id)
+            
+            # إخراج الأقدم استخداماً عند تجاوز الحجم الأقصى
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, device_id):
+        """إبطال التنبؤ المحفوظ لجهاز (يُستدعى من مسار استقبال القياسات)"""
+        with self._lock:
+            if self._entries.pop(device_id, None) is not None:
+                self.invalidations += 1
+    
+    def clear(self):
+        """مسح جميع التنبؤات المحفوظة (مثلاً بعد إعادة تدريب النموذج)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """إحصائيات الذاكرة المؤقتة"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total * 100, 2) if total > 0 else 0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+# إنشاء كائن الذاكرة المؤقتة
+prediction_cache = PredictionCache(max_size=int(os.environ.get('PREDICTION_CACHE_SIZE', '1024')))
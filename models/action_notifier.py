@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+سجل الإيقاظ للإجراءات المعلقة (long-poll)
+يحتفظ لكل جهاز برقم إصدار يزيد عند إنشاء إجراء له، فيستيقظ طلب
+/actions/api/pending?wait=N المنتظر لهذا الجهاز فوراً بدلاً من انتظار دورة الاستعلام التالية
+
+كل طلب منتظر يحجز خيطاً من خيوط العامل (gthread) طوال الانتظار، لذلك عدد الطلبات
+المنتظرة في العامل محدود بـ LONG_POLL_MAX_WAITERS؛ ما يزيد يُرد عليه فوراً
+"""
+
+import os
+import threading
+
+
+class ActionNotifier:
+    """سجل إيقاظ لكل جهاز داخل العملية الحالية"""
+    
+    def __init__(self, max_waiters=24):
+        self.max_waiters = max_waiters
+        self._lock = threading.Lock()
+        # طلبات long-poll التي تحجز خيطاً الآن (من acquire_slot حتى release_slot)
+        self._active_polls = 0
+        # device_id -> رقم الإصدار (يزيد مع كل إجراء جديد)
+        self._versions = {}
+        # device_id -> Condition (موجودة فقط أثناء وجود طلبات منتظرة)
+        self._conditions = {}
+        self._waiters = {}
+        
+        # إحصائيات
+        self.notifications = 0
+        self.wakeups = 0
+        self.timeouts = 0
+        self.rejected = 0
+    
+    def acquire_slot(self):
+        """حجز مكان لطلب long-poll (False إذا وصل العامل للحد الأقصى من الطلبات المنتظرة)"""
+        with self._lock:
+            if self._active_polls >= self.max_waiters:
+                self.rejected += 1
+                return False
+            self._active_polls += 1
+            return True
+    
+    def release_slot(self):
+        with self._lock:
+            self._active_polls -= 1
+    
+    def version(self, device_id):
+        """رقم الإصدار الحالي (يُقرأ قبل فحص قاعدة البيانات حتى لا يضيع إشعار بينهما)"""
+        with self._lock:
+            return self._versions.get(device_id, 0)
+    
+    def wait(self, device_id, version, timeout):
+        """الانتظار حتى يتغير إصدار الجهاز أو انتهاء المهلة (يعيد True عند الإيقاظ)"""
+        with self._lock:
+            condition = self._conditions.get(device_id)
+            if condition is None:
+                condition = threading.Condition(self._lock)
+                self._conditions[device_id] = condition
+            self._waiters[device_id] = self._waiters.get(device_id, 0) + 1
+            
+            try:
+                woken = condition.wait_for(lambda: self._versions.get(device_id, 0) != version, timeout)
+            finally:
+                self._waiters[device_id] -= 1
+                if self._waiters[device_id] == 0:
+                    del self._waiters[device_id]
+                    del self._conditions[device_id]
+            
+            if woken:
+                self.wakeups += 1
+            else:
+                self.timeouts += 1
+            return woken
+    
+    def notify(self, device_ids):
+        """إيقاظ الطلبات المنتظرة للأجهزة المحددة"""
+        with self._lock:
+            for device_id in device_ids:
+                self._versions[device_id] = self._versions.get(device_id, 0) + 1
+                condition = self._conditions.get(device_id)
+                if condition is not None:
+                    condition.notify_all()
+                self.notifications += 1
+    
+    def stats(self):
+        """إحصائيات السجل"""
+        with self._lock:
+            return {
+                'waiting_devices': len(self._waiters),
+                'waiting_requests': sum(self._waiters.values()),
+                'active_polls': self._active_polls,
+                'max_waiters': self.max_waiters,
+                'rejected': self.rejected,
+                'notifications': self.notifications,
+                'wakeups': self.wakeups,
+                'timeouts': self.timeouts
+            }
+
+# إنشاء كائن السجل
+action_notifier = ActionNotifier(max_waiters=int(os.environ.get('LONG_POLL_MAX_WAITERS', '24')))
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+نموذج التنبيهات
+منع تكرار التنبيهات المفتوحة باستخدام بصمة (fingerprint) مفهرسة،
+وتجميع عواصف التنبيهات في حوادث (incidents) مع تحديد معدل الكتابة
+"""
+
+import os
+import time
+from datetime import datetime
+
+from models.database import get_db
+
+# حالات التنبيه المفتوح (يُسمح بتنبيه مفتوح واحد فقط لكل بصمة)
+OPEN_STATUSES = ('active', 'acknowledged')
+
+# نافذة تجميع الحوادث بالثواني (الموقع + النوع + النافذة = حادثة واحدة)
+INCIDENT_WINDOW_SECONDS = int(os.environ.get('INCIDENT_WINDOW_SECONDS', '600'))
+# أقصى عدد تنبيهات تُكتب لكل جهاز خلال النافذة
+DEVICE_ALERT_LIMIT = int(os.environ.get('DEVICE_ALERT_LIMIT', '5'))
+# أقصى عدد تنبيهات تُكتب لكل حادثة؛ الباقي يُحسب في عدادات الحادثة فقط
+INCIDENT_MAX_WRITTEN = int(os.environ.get('INCIDENT_MAX_WRITTEN', '10'))
+
+SEVERITY_RANK = {'info': 0, 'low': 0, 'medium': 1, 'warning': 1, 'high': 2, 'critical': 2}
+
+
+def alert_fingerprint(device_id, alert_type, severity):
+    """البصمة الموحدة للتنبيه: الجهاز + النوع + الخطورة"""
+    return f'{device_id}:{alert_type}:{severity}'
+
+
+def incident_window_start(now=None):
+    """بداية نافذة الحادثة التي يقع فيها الوقت المحدد"""
+    now = now or time.time()
+    return datetime.fromtimestamp(now - now % INCIDENT_WINDOW_SECONDS)
+
+
+def _open_incidents(db, alerts, window_start, now):
+    """إنشاء حادثة لكل (موقع، نوع) في الدفعة إذا لم تكن موجودة وإرجاع {المفتاح: الحادثة}
+
+    العدادات و last_seen تُحدَّث في upsert_open_alerts بعد معرفة ما كُتب وما حُدّ معدله
+    """
+    groups = {}
+    for alert in alerts:
+        key = (alert.get('location') or '', alert['alert_type'])
+        group = groups.setdefault(key, {'severity': alert['severity']})
+        if SEVERITY_RANK.get(alert['severity'], 0) > SEVERITY_RANK.get(group['severity'], 0):
+            group['severity'] = alert['severity']
+
+    incidents = {}
+    for (location, alert_type), group in groups.items():
+        db.execute('''
+            INSERT INTO alert_incidents
+            (location, alert_type, severity, window_start, alert_count, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+            ON CONFLICT(location, alert_type, window_start) DO NOTHING
+        ''', (location, alert_type, group['severity'], window_start, now, now))
+
+        incident = db.execute('''
+            SELECT id, severity, written_count FROM alert_incidents
+            WHERE location = ? AND alert_type = ? AND window_start = ?
+        ''', (location, alert_type, window_start)).fetchone()
+
+        # رفع خطورة الحادثة إذا وصل تنبيه أخطر
+        if SEVERITY_RANK.get(group['severity'], 0) > SEVERITY_RANK.get(incident['severity'], 0):
+            db.execute('UPDATE alert_incidents SET severity = ? WHERE id = ?', (group['severity'], incident['id']))
+
+        incidents[(location, alert_type)] = {
+            'id': incident['id'],
+            'written': incident['written_count'],
+            'new_written': 0,
+            'new_suppressed': 0
+        }
+
+    return incidents
+
+
+def _device_alert_counts(db, device_ids, window_start):
+    """عدد التنبيهات المكتوبة لكل جهاز منذ بداية النافذة (استعلام واحد للدفعة)"""
+    placeholders = ','.join('?' * len(device_ids))
+    rows = db.execute(f'''
+        SELECT device_id, COUNT(*) AS count FROM alerts
+        WHERE device_id IN ({placeholders}) AND created_at >= ?
+        GROUP BY device_id
+    ''', (*device_ids, window_start)).fetchall()
+    return {row['device_id']: row['count'] for row in rows}
+
+
+def _new_alerts(db, alerts, window_start):
+    """استبعاد التنبيهات التي لها تنبيه مفتوح بنفس البصمة أو المكررة في نفس الدفعة
+    أو التي حُسبت مسبقاً في حادثة النافذة الحالية دون كتابتها (تحديد المعدل)
+
+    إعادة اكتشاف حالة مستمرة (كل فحص دوري) ليست تنبيهاً جديداً فلا تُحسب في الحوادث
+    """
+    by_fingerprint = {}
+    for alert in alerts:
+        by_fingerprint.setdefault(alert_fingerprint(alert['device_id'], alert['alert_type'], alert['severity']), alert)
+
+    placeholders = ','.join('?' * len(by_fingerprint))
+    rows = db.execute(f'''
+        SELECT fingerprint FROM alerts
+        WHERE fingerprint IN ({placeholders}) AND status IN ('active', 'acknowledged')
+    ''', tuple(by_fingerprint)).fetchall()
+    already_open = {row['fingerprint'] for row in rows}
+
+    rows = db.execute(f'''
+        SELECT fingerprint FROM incident_members
+        WHERE incident_id IN (SELECT id FROM alert_incidents WHERE window_start = ?)
+          AND fingerprint IN ({placeholders})
+    ''', (window_start, *by_fingerprint)).fetchall()
+    already_counted = {row['fingerprint'] for row in rows}
+
+    return [alert for fingerprint, alert in by_fingerprint.items()
+            if fingerprint not in already_open and fingerprint not in already_counted]
+
+
+def upsert_open_alerts(alerts, commit=True):
+    """إدراج مجموعة تنبيهات دفعة واحدة مع التجميع في حوادث وتحديد المعدل
+
+    alerts: قائمة قواميس تحتوي device_id و alert_type و severity و message و created_at
+            و location (اختياري - موقع الجهاز لتجميع الحوادث)
+    التنبيهات التي لها تنبيه مفتوح بنفس البصمة أو حُسبت في حادثة النافذة تُتجاهل؛ الباقي
+    يُحسب في حادثته ويُكتب فقط إذا لم يتجاوز الجهاز حده في النافذة ولم تتجاوز الحادثة حدها،
+    وإلا تُسجل بصمته في incident_members.
+    commit=False: يترك الـ commit للمستدعي (مثلاً مع باقي كتابات دفعة الفحص الدوري)
+    يعيد عدد التنبيهات التي أُدرجت فعلاً
+    """
+    if not alerts:
+        return 0
+
+    db = get_db()
+    now = datetime.now()
+    window_start = incident_window_start()
+
+    alerts = _new_alerts(db, alerts, window_start)
+    if not alerts:
+        return 0
+
+    incidents = _open_incidents(db, alerts, window_start, now)
+    device_counts = _device_alert_counts(db, sorted({a['device_id'] for a in alerts}), window_start)
+
+    written = 0
+    for alert in alerts:
+        incident = incidents[(alert.get('location') or '', alert['alert_type'])]
+        device_count = device_counts.get(alert['device_id'], 0)
+        fingerprint = alert_fingerprint(alert['device_id'], alert['alert_type'], alert['severity'])
+
+        if (device_count >= DEVICE_ALERT_LIMIT or
+                incident['written'] + incident['new_written'] >= INCIDENT_MAX_WRITTEN):
+            # تسجيل البصمة في الحادثة حتى لا تُحسب مرة أخرى في الفحوص التالية
+            cursor = db.execute('''
+                INSERT INTO incident_members (incident_id, fingerprint, device_id, created_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(incident_id, fingerprint) DO NOTHING
+            ''', (incident['id'], fingerprint, alert['device_id'], now))
+            if cursor.rowcount == 1:
+                incident['new_suppressed'] += 1
+            continue
+
+        # الفهرس الفريد الجزئي idx_alerts_open_fingerprint يحل محل البحث بـ LIKE
+        cursor = db.execute('''
+            INSERT INTO alerts
+            (device_id, alert_type, severity, message, status, created_at, fingerprint, incident_id)
+            VALUES (?, ?, ?, ?, 'active', ?, ?, ?)
+            ON CONFLICT(fingerprint) WHERE status IN ('active', 'acknowledged') DO NOTHING
+        ''', (
+            alert['device_id'],
+            alert['alert_type'],
+            alert['severity'],
+            alert['message'],
+            alert['created_at'],
+            fingerprint,
+            incident['id']
+        ))
+
+        if cursor.rowcount == 1:
+            incident['new_written'] += 1
+            device_counts[alert['device_id']] = device_count + 1
+            written += 1
+        # وإلا فقد فُتح تنبيه بنفس البصمة من طلب متزامن بعد _new_alerts فلا يُحسب
+
+    db.executemany('''
+        UPDATE alert_incidents
+        SET alert_count = alert_count + ?,
+            written_count = written_count + ?,
+            suppressed_count = suppressed_count + ?,
+            last_seen = ?
+        WHERE id = ?
+    ''', [
+        (incident['new_written'] + incident['new_suppressed'], incident['new_written'],
+         incident['new_suppressed'], now, incident['id'])
+        for incident in incidents.values()
+        if incident['new_written'] or incident['new_suppressed']
+    ])
+    if commit:
+        db.commit()
+    return written
@@ -1,53 +1,314 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-نموذج قاعدة البيانات
-إدارة الاتصال بقاعدة البيانات وعملياتها الأساسية
-"""
-
-import sqlite3
-from flask import g
-from contextlib import closing
-
-DATABASE = 'device_monitoring.db'
-
-def get_db():
-    """الحصول على اتصال قاعدة البيانات"""
-    if 'db' not in g:
-        g.db = sqlite3.connect(DATABASE)
-        g.db.row_factory = sqlite3.Row
-        # تفعيل المفاتيح الأجنبية
-        g.db.execute('PRAGMA foreign_keys = ON')
-    return g.db
-
-def init_db():
-    """تهيئة قاعدة البيانات"""
-    db = get_db()
-    # التحقق من وجود الجداول
-    try:
-        db.execute('SELECT COUNT(*) FROM users').fetchone()
-        print("قاعدة البيانات جاهزة!")
-    except sqlite3.OperationalError:
-        print("خطأ: قاعدة البيانات غير موجودة. يرجى تشغيل init_database.py أولاً")
-
-def close_db(e=None):
-    """إغلاق اتصال قاعدة البيانات"""
-    db = g.pop('db', None)
-    if db is not None:
-        db.close()
-
-def query_db(query, args=(), one=False):
-    """تنفيذ استعلام قاعدة البيانات"""
-    db = get_db()
-    cursor = db.execute(query, args)
-    result = cursor.fetchall()
-    # لا نستخدم commit هنا لأنها للقراءة فقط
-    return (result[0] if result else None) if one else result
-
-def execute_db(query, args=()):
-    """تنفيذ أمر قاعدة البيانات"""
-    db = get_db()
-    cursor = db.execute(query, args)
-    db.commit()
-    return cursor.lastrowid
-
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+نموذج قاعدة البيانات
+إدارة الاتصال بقاعدة البيانات وعملياتها الأساسية
+"""
+
+import sqlite3
+import time
+from flask import g
+from contextlib import closing
+from models.metrics import record_db_query
+from models.query_profiler import query_profiler
+from models.n_plus_one import n_plus_one_detector
+
+DATABASE = 'device_monitoring.db'
+
+# أوامر القراءة (تُسجل كـ query وغيرها كـ execute)
+_READ_STATEMENTS = ('SELECT', 'WITH', 'PRAGMA')
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """اتصال يقيس كل أمر يُنفذ عليه (وليس فقط ما يمر عبر query_db و execute_db)
+
+    كل execute و executemany يُسجل في مقياس زمن الاستعلامات وعدادات الطلب
+    ومحلل الاستعلامات (عند تفعيله) وكاشف N+1، والـ commit في مقياس الزمن فقط.
+    زمن SELECT يشمل التنفيذ حتى أول صف (الجلب بعدها لا يُحسب).
+    """
+
+    def execute(self, sql, parameters=()):
+        if sql.startswith('EXPLAIN'):
+            # خطة التنفيذ التي يطلبها المحلل نفسه لا تُسجل
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        self._record(sql, parameters, time.perf_counter() - started)
+        return cursor
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        cursor = super().executemany(sql, seq_of_parameters)
+        # خطة التنفيذ (للاستعلام البطيء) بقيم أول صف إن كانت القائمة متاحة
+        sample = seq_of_parameters[0] if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters else ()
+        self._record(sql, sample, time.perf_counter() - started)
+        return cursor
+
+    def commit(self):
+        started = time.perf_counter()
+        super().commit()
+        record_db_query('commit', time.perf_counter() - started)
+
+    def _record(self, sql, parameters, duration):
+        operation = 'query' if sql.lstrip()[:6].upper().startswith(_READ_STATEMENTS) else 'execute'
+        record_db_query(operation, duration)
+        if query_profiler.enabled:
+            query_profiler.record(self, operation, sql, parameters, duration)
+        n_plus_one_detector.record(sql)
+
+
+def get_db():
+    """الحصول على اتصال قاعدة البيانات"""
+    if 'db' not in g:
+        g.db = sqlite3.connect(DATABASE, factory=InstrumentedConnection)
+        g.db.row_factory = sqlite3.Row
+        # تفعيل المفاتيح الأجنبية
+        g.db.execute('PRAGMA foreign_keys = ON')
+    return g.db
+
+def init_db():
+    """تهيئة قاعدة البيانات"""
+    db = get_db()
+    # التحقق من وجود الجداول
+    try:
+        db.execute('SELECT COUNT(*) FROM users').fetchone()
+        migrate_db(db)
+        print("قاعدة البيانات جاهزة!")
+    except sqlite3.OperationalError:
+        print("خطأ: قاعدة البيانات غير موجودة. يرجى تشغيل init_database.py أولاً")
+
+def migrate_db(db):
+    """تطبيق التحديثات على بنية قاعدة البيانات (آمنة للتكرار عند كل تشغيل)"""
+    # فهرس لجلب آخر قياسات الجهاز دون المرور على جدول القياسات كاملاً
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_device_metrics_device_timestamp
+        ON device_metrics(device_id, timestamp)
+    ''')
+    
+    # ملخص نافذة القياس من عميل الجهاز (الحد الأقصى و p95 بين إرسالين)
+    for column in ('cpu_max', 'cpu_p95', 'ram_max', 'ram_p95', 'temperature_max', 'temperature_p95'):
+        _ensure_column(db, 'device_metrics', column, 'REAL')
+    
+    # معدل الشبكة (بايت/ثانية) محسوباً عند الاستقبال من العدادات التراكمية network_in/network_out
+    added_in_rate = _ensure_column(db, 'device_metrics', 'network_in_rate', 'REAL')
+    added_out_rate = _ensure_column(db, 'device_metrics', 'network_out_rate', 'REAL')
+    if added_in_rate or added_out_rate:
+        # حساب المعدل للقياسات القديمة مرة واحدة (نقص العداد = إعادة تشغيل الجهاز)
+        db.execute('''
+            WITH ordered AS (
+                SELECT id, network_in, network_out,
+                       (julianday(timestamp) - julianday(LAG(timestamp) OVER w)) * 86400 AS elapsed,
+                       LAG(network_in) OVER w AS previous_in,
+                       LAG(network_out) OVER w AS previous_out
+                FROM device_metrics
+                WINDOW w AS (PARTITION BY device_id ORDER BY timestamp)
+            )
+            UPDATE device_metrics
+            SET network_in_rate = (CASE WHEN ordered.network_in >= ordered.previous_in
+                                        THEN ordered.network_in - ordered.previous_in
+                                        ELSE ordered.network_in END) * 1048576.0 / ordered.elapsed,
+                network_out_rate = (CASE WHEN ordered.network_out >= ordered.previous_out
+                                         THEN ordered.network_out - ordered.previous_out
+                                         ELSE ordered.network_out END) * 1048576.0 / ordered.elapsed
+            FROM ordered
+            WHERE device_metrics.id = ordered.id AND ordered.elapsed > 0
+        ''')
+    
+    # معرّف القياس من عميل الجهاز: إعادة إرسال قياس حفظه الخادم (انتهت مهلة الرد قبل وصوله
+    # للعميل، أو أُعيد من الطابور المحلي) لا تُدرج صفاً مكرراً
+    _ensure_column(db, 'device_metrics', 'sample_id', 'TEXT')
+    db.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_device_metrics_sample
+        ON device_metrics(device_id, sample_id)
+        WHERE sample_id IS NOT NULL
+    ''')
+    
+    # آخر قياس تم تقييمه لكل جهاز (ليعيد الفحص الدوري تقييم الأجهزة التي وصلتها قياسات جديدة فقط)
+    _ensure_column(db, 'devices', 'last_evaluated_metric_id', 'INTEGER')
+    
+    # بصمة التنبيه (الجهاز:النوع:الخطورة) مع فهرس فريد على التنبيهات المفتوحة
+    # بدلاً من البحث بـ LIKE في نص الرسالة
+    if _ensure_column(db, 'alerts', 'fingerprint', 'TEXT'):
+        # التنبيهات الطارئة رسائل مستقلة من الإدارة ولا تُدمج، فتبقى بدون بصمة
+        db.execute('''
+            UPDATE alerts
+            SET fingerprint = device_id || ':' || alert_type || ':' || severity
+            WHERE alert_type != 'emergency_alert'
+        ''')
+        # إبقاء أقدم تنبيه مفتوح لكل بصمة وإزالة البصمة من التكرارات القديمة
+        db.execute('''
+            UPDATE alerts
+            SET fingerprint = NULL
+            WHERE fingerprint IS NOT NULL
+            AND status IN ('active', 'acknowledged')
+            AND id NOT IN (
+                SELECT MIN(id) FROM alerts
+                WHERE fingerprint IS NOT NULL
+                AND status IN ('active', 'acknowledged')
+                GROUP BY fingerprint
+            )
+        ''')
+    db.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_open_fingerprint
+        ON alerts(fingerprint)
+        WHERE status IN ('active', 'acknowledged')
+    ''')
+    
+    # حوادث التنبيهات: تجميع التنبيهات حسب الموقع والنوع ونافذة زمنية
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS alert_incidents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            location TEXT NOT NULL DEFAULT '',
+            alert_type TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            window_start TIMESTAMP NOT NULL,
+            alert_count INTEGER DEFAULT 0,
+            written_count INTEGER DEFAULT 0,
+            suppressed_count INTEGER DEFAULT 0,
+            first_seen TIMESTAMP,
+            last_seen TIMESTAMP,
+            UNIQUE (location, alert_type, window_start)
+        )
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_alert_incidents_last_seen
+        ON alert_incidents(last_seen)
+    ''')
+    # البصمات التي حُسبت في الحادثة دون كتابة تنبيه (تحديد المعدل)
+    # حتى لا تُعد إعادة اكتشافها في كل فحص تنبيهاً جديداً
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS incident_members (
+            incident_id INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL,
+            device_id INTEGER NOT NULL,
+            created_at TIMESTAMP,
+            PRIMARY KEY (incident_id, fingerprint),
+            FOREIGN KEY (incident_id) REFERENCES alert_incidents(id) ON DELETE CASCADE,
+            FOREIGN KEY (device_id) REFERENCES devices(id) ON DELETE CASCADE
+        )
+    ''')
+    _ensure_column(db, 'alerts', 'incident_id', 'INTEGER REFERENCES alert_incidents(id)')
+    # لحساب عدد تنبيهات الجهاز في النافذة الحالية (تحديد المعدل)
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_alerts_device_created
+        ON alerts(device_id, created_at)
+    ''')
+    
+    # حملات الإجراءات الجماعية (مثل تحديث أو إعادة تشغيل مجموعة أجهزة)
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS action_campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            action_type TEXT NOT NULL,
+            action_description TEXT,
+            target_filter TEXT,
+            target_count INTEGER DEFAULT 0,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (created_by) REFERENCES users(id)
+        )
+    ''')
+    _ensure_column(db, 'system_actions', 'campaign_id', 'INTEGER REFERENCES action_campaigns(id)')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_system_actions_campaign_status
+        ON system_actions(campaign_id, status)
+    ''')
+    # فحص الإجراءات المعلقة للجهاز (يتكرر أثناء طلبات long-poll)
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_system_actions_device_status
+        ON system_actions(device_id, status)
+    ''')
+
+    # نتائج الفحص الشامل: أقسام مضغوطة بدون تكرار حسب بصمة المحتوى
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS scan_blobs (
+            hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # كل فحص يحفظ مراجع أقسامه فقط (القسم -> بصمة المحتوى)
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS device_scans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            device_id INTEGER NOT NULL,
+            scan_hash TEXT NOT NULL,
+            sections TEXT NOT NULL,
+            changed_sections TEXT,
+            warnings_count INTEGER DEFAULT 0,
+            errors_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (device_id) REFERENCES devices(id)
+        )
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_device_scans_device
+        ON device_scans(device_id, id)
+    ''')
+    # عدد مراجع كل قسم في device_scans (يُحذف القسم عندما لا يشير إليه أي فحص)
+    if _ensure_column(db, 'scan_blobs', 'ref_count', 'INTEGER NOT NULL DEFAULT 0'):
+        db.execute('''
+            WITH refs AS (
+                SELECT j.value AS hash, COUNT(*) AS count
+                FROM device_scans s, json_each(s.sections) j
+                GROUP BY j.value
+            )
+            UPDATE scan_blobs
+            SET ref_count = COALESCE((SELECT count FROM refs WHERE refs.hash = scan_blobs.hash), 0)
+        ''')
+        # الأقسام اليتيمة من الأجهزة المحذوفة قبل إضافة العداد
+        db.execute('DELETE FROM scan_blobs WHERE ref_count = 0')
+    # ملخص عتاد آخر فحص لكل جهاز (للاستعلام بدون إعادة فحص الأجهزة)
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS device_inventory (
+            device_id INTEGER PRIMARY KEY,
+            scan_id INTEGER,
+            os_name TEXT,
+            os_release TEXT,
+            architecture TEXT,
+            processor TEXT,
+            cpu_physical_cores INTEGER,
+            cpu_logical_cores INTEGER,
+            ram_total_gb REAL,
+            disk_total_gb REAL,
+            disk_free_gb REAL,
+            updated_at TIMESTAMP,
+            FOREIGN KEY (device_id) REFERENCES devices(id),
+            FOREIGN KEY (scan_id) REFERENCES device_scans(id)
+        )
+    ''')
+    for column in ('ram_total_gb', 'disk_total_gb', 'disk_free_gb', 'cpu_logical_cores', 'os_name'):
+        db.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_device_inventory_{column}
+            ON device_inventory({column})
+        ''')
+
+    db.commit()
+
+def _ensure_column(db, table, column, definition):
+    """إضافة عمود إلى جدول إذا لم يكن موجوداً (يعيد True إذا تمت الإضافة)"""
+    columns = [col[1] for col in db.execute(f'PRAGMA table_info({table})').fetchall()]
+    if column not in columns:
+        db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        return True
+    return False
+
+def close_db(e=None):
+    """إغلاق اتصال قاعدة البيانات"""
+    db = g.pop('db', None)
+    if db is not None:
+        db.close()
+
+def query_db(query, args=(), one=False):
+    """تنفيذ استعلام قاعدة البيانات"""
+    cursor = get_db().execute(query, args)
+    result = cursor.fetchall()
+    # لا نستخدم commit هنا لأنها للقراءة فقط
+    return (result[0] if result else None) if one else result
+
+def execute_db(query, args=()):
+    """تنفيذ أمر قاعدة البيانات"""
+    db = get_db()
+    cursor = db.execute(query, args)
+    db.commit()
+    return cursor.lastrowid
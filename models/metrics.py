@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+سجل مقاييس الأداء بصيغة Prometheus
+عدادات (Counter) ومقاييس لحظية (Gauge) ومدرجات تكرارية (Histogram) تُعرض على /metrics
+
+عدة عمال (gunicorn): لكل عامل سجله في ذاكرته، فبدون تجميع يرد /metrics بأرقام العامل
+الذي استقبل الطلب فقط. عند تحديد METRICS_MULTIPROC_DIR (يحدده gunicorn.conf.py تلقائياً)
+يكتب كل عامل حالة مقاييسه في ملف metrics_<pid>.json كل METRICS_FLUSH_INTERVAL ثانية،
+والعامل الذي يستقبل /metrics يكتب حالته ثم يجمع ملفات كل العمال:
+    - العدادات والمدرجات: مجموع العمال (تشمل العمال المنتهين فلا يبدو العداد وكأنه صُفّر)
+    - المقاييس اللحظية: سلسلة لكل عامل بتسمية pid (تُحذف عند انتهاء العامل)
+قيم العمال الآخرين متأخرة حتى METRICS_FLUSH_INTERVAL ثانية.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+
+from flask import g, has_app_context
+
+# حدود المدرج الافتراضية للأزمنة (ثانية)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# حدود أحجام الردود (بايت)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+# حدود عدد الاستعلامات في الطلب الواحد
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _render_family(name, type_name, documentation, buckets, samples):
+    """أسطر Prometheus لعائلة مقياس؛ samples: [(تسميات، القيمة)] مرتبة
+
+    قيمة المدرج [عدد كل حد (غير تراكمي، آخرها +Inf)، المجموع، العدد]
+    """
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {type_name}']
+    for labels, value in samples:
+        if value is None:
+            continue
+        if type_name != 'histogram':
+            lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+        counts, total, count = value
+        cumulative = 0
+        for bound, bucket_count in zip(tuple(buckets) + (math.inf,), counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{_format_labels(list(labels) + [("le", _format_value(bound))])} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+        lines.append(f'{name}_count{_format_labels(labels)} {_format_value(count)}')
+    return lines
+
+
+def percentile(sorted_values, percent):
+    """النسبة المئوية (nearest-rank) لقائمة مرتبة، None للقائمة الفارغة
+
+    التعريف الوحيد لـ p50/p95 في /metrics/queries و /ml/profile وتقارير benchmarks
+    و load_test.py (device_client.py مستقل فيحمل نسخة مطابقة)
+    """
+    if not sorted_values:
+        return None
+    rank = math.ceil(percent * len(sorted_values) / 100)
+    return sorted_values[max(0, rank - 1)]
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """تصفير القيم (في العامل بعد fork حتى لا تُحسب قيم العملية الرئيسية مرة لكل عامل)"""
+        with self._lock:
+            self._values = {}
+            # المقياس بدون تسميات يظهر بقيمة 0 من البداية
+            if not self.labelnames and self.type_name in ('counter', 'gauge'):
+                self._values[()] = 0
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name}: التسميات المطلوبة {self.labelnames}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _value(self, value):
+        return value
+
+    def family(self):
+        """العائلة بصيغة قابلة للتخزين في ملف العامل: (الاسم، النوع، الوصف، الحدود، [(تسميات، القيمة)])"""
+        with self._lock:
+            items = sorted((key, self._value(value)) for key, value in self._values.items())
+        samples = [(list(zip(self.labelnames, key)), value) for key, value in items]
+        return self.name, self.type_name, self.documentation, None, samples
+
+    def render(self):
+        return _render_family(*self.family())
+
+
+class Counter(_Metric):
+    """عداد تراكمي (يزيد فقط)"""
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """قيمة لحظية (تزيد وتنقص)"""
+
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """مدرج تكراري تراكمي (يُحسب منه p50/p95/p99 في Prometheus)"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def time(self, **labels):
+        """قياس زمن كتلة with وتسجيله"""
+        return _Timer(self, labels)
+
+    def _value(self, state):
+        return [list(state['buckets']), state['sum'], state['count']]
+
+    def family(self):
+        name, type_name, documentation, _, samples = super().family()
+        return name, type_name, documentation, list(self.buckets[:-1]), samples
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+def _merge_families(worker_families):
+    """جمع عائلات العمال: [(pid، العائلات)] ← العائلات المجمعة بترتيب ظهورها
+
+    العدادات والمدرجات تُجمع، والمقاييس اللحظية سلسلة لكل عامل بتسمية pid
+    """
+    merged = {}
+    for pid, families in worker_families:
+        for name, type_name, documentation, buckets, samples in families:
+            family = merged.setdefault(name, (type_name, documentation, buckets, {}))
+            values = family[3]
+            for labels, value in samples:
+                if value is None:
+                    continue
+                key = tuple(tuple(label) for label in labels)
+                if type_name == 'gauge':
+                    values[key + (('pid', str(pid)),)] = value
+                elif type_name == 'histogram':
+                    current = values.get(key)
+                    if current is None or len(current[0]) != len(value[0]):
+                        values[key] = [list(value[0]), value[1], value[2]]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], value[0])]
+                        current[1] += value[1]
+                        current[2] += value[2]
+                else:
+                    values[key] = values.get(key, 0) + value
+    return [
+        (name, type_name, documentation, buckets, sorted(values.items()))
+        for name, (type_name, documentation, buckets, values) in merged.items()
+    ]
+
+
+class MetricsRegistry:
+    """سجل جميع المقاييس مع دوال جمع تُستدعى عند كل قراءة لـ /metrics
+
+    multiproc_dir: مجلد ملفات العمال لتجميع المقاييس بين عدة عمليات (None = العملية الحالية فقط)
+    """
+
+    def __init__(self, multiproc_dir=None, flush_interval=5):
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._collectors = []
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher_pid = None
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'المقياس {metric.name} مسجل مسبقاً')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector=None, per_process=True):
+        """collector: دالة تعيد قائمة (الاسم، النوع، الوصف، [(تسميات dict، القيمة)])
+
+        للقيم الموجودة أصلاً في كائنات أخرى (إحصائيات الذاكرة المؤقتة، الطوابير)
+        فتُقرأ وقت الطلب بدلاً من نسخها إلى عدادات.
+        per_process=False للقيم المشتركة بين العمال (من قاعدة البيانات): تُقرأ مرة واحدة
+        عند الطلب ولا تُجمع بين العمال. يُستخدم كـ decorator بمعاملات أو بدونها
+        """
+        if collector is None:
+            return lambda function: self.register_collector(function, per_process)
+        with self._lock:
+            self._collectors.append((collector, per_process))
+        return collector
+
+    def register_snapshot(self, name, snapshot):
+        """snapshot: دالة تعيد حالة قابلة لـ JSON (أو None) تُكتب في ملف العامل
+
+        لتقارير تُجمع من كل العمال غير المقاييس نفسها (محلل الاستعلامات ومراحل التنبؤ)
+        """
+        with self._lock:
+            self._snapshots[name] = snapshot
+        return snapshot
+
+    def _take_snapshots(self):
+        with self._lock:
+            snapshots = dict(self._snapshots)
+        taken = {}
+        for name, snapshot in snapshots.items():
+            try:
+                taken[name] = snapshot()
+            except Exception as e:
+                print(f"خطأ في حالة {name} للمقاييس: {e}")
+        return taken
+
+    def worker_snapshots(self, name):
+        """حالة name من كل العمال [(pid، الحالة)] (العامل الحالي فقط بدون multiproc_dir)"""
+        if not self.multiproc_dir:
+            state = self._take_snapshots().get(name)
+            return [(os.getpid(), state)] if state is not None else []
+        self.flush()
+        return [
+            (pid, snapshots[name]) for pid, _, snapshots in self._read_workers()
+            if snapshots.get(name) is not None
+        ]
+
+    def _collect(self, per_process):
+        families = []
+        with self._lock:
+            collectors = [collector for collector, local in self._collectors if local == per_process]
+        for collector in collectors:
+            try:
+                result = collector()
+            except Exception as e:
+                print(f"خطأ في جمع المقاييس ({getattr(collector, '__name__', collector)}): {e}")
+                continue
+            for name, type_name, documentation, samples in result:
+                families.append((name, type_name, documentation, None, [
+                    (sorted(labels.items()), value) for labels, value in samples if value is not None
+                ]))
+        return families
+
+    def _process_families(self):
+        """مقاييس العملية الحالية ودوال الجمع الخاصة بها"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return [metric.family() for metric in metrics] + self._collect(per_process=True)
+
+    def reset(self):
+        """تصفير كل المقاييس (في العامل بعد fork من العملية الرئيسية)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def _worker_path(self, pid):
+        return os.path.join(self.multiproc_dir, f'metrics_{pid}.json')
+
+    def flush(self):
+        """كتابة حالة مقاييس هذا العامل في ملفه (استبدال ذري حتى لا يُقرأ ملف ناقص)"""
+        if not self.multiproc_dir:
+            return
+        pid = os.getpid()
+        path = self._worker_path(pid)
+        data = json.dumps({
+            'pid': pid,
+            'written_at': time.time(),
+            'families': self._process_families(),
+            'snapshots': self._take_snapshots()
+        })
+        with self._flush_lock:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"خطأ في كتابة ملف المقاييس: {e}")
+
+    def ensure_flusher(self):
+        """تشغيل خيط الكتابة الدورية في العملية الحالية (مرة لكل عملية، فيعمل بعد fork أيضاً)"""
+        if not self.multiproc_dir or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _read_workers(self):
+        workers = []
+        try:
+            names = sorted(os.listdir(self.multiproc_dir))
+        except FileNotFoundError:
+            return workers
+        for name in names:
+            if not (name.startswith('metrics_') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, name), encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            workers.append((data['pid'], data['families'], data.get('snapshots') or {}))
+        return workers
+
+    def mark_process_dead(self, pid):
+        """عند انتهاء عامل: إبقاء عداداته ومدرجاته في المجموع وحذف مقاييسه اللحظية وتقاريره"""
+        if not self.multiproc_dir:
+            return
+        path = self._worker_path(pid)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        data['families'] = [family for family in data['families'] if family[1] != 'gauge']
+        data['snapshots'] = {}
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+    def clear_multiproc_dir(self):
+        """حذف ملفات العمال من تشغيل سابق (من العملية الرئيسية عند البدء)"""
+        if not self.multiproc_dir or not os.path.isdir(self.multiproc_dir):
+            return
+        for name in os.listdir(self.multiproc_dir):
+            if name.startswith('metrics_'):
+                os.remove(os.path.join(self.multiproc_dir, name))
+
+    def render(self):
+        """كل المقاييس بصيغة Prometheus النصية (0.0.4)، مجمعة من كل العمال إن أمكن"""
+        if self.multiproc_dir:
+            self.flush()
+            families = _merge_families([(pid, families) for pid, families, _ in self._read_workers()])
+        else:
+            families = self._process_families()
+        families += self._collect(per_process=False)
+
+        lines = []
+        for family in families:
+            lines.extend(_render_family(*family))
+        return '\n'.join(lines) + '\n'
+
+# إنشاء كائن السجل
+metrics = MetricsRegistry(
+    multiproc_dir=os.environ.get('METRICS_MULTIPROC_DIR') or None,
+    flush_interval=float(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+)
+
+# مقاييس الطلبات (تُسجل من routes/metrics.py قبل وبعد كل طلب)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    'http_request_duration_seconds', 'زمن معالجة الطلب',
+    ('blueprint', 'endpoint', 'method', 'status'))
+HTTP_RESPONSE_SIZE = metrics.histogram(
+    'http_response_size_bytes', 'حجم جسم الرد',
+    ('blueprint', 'endpoint'), SIZE_BUCKETS)
+HTTP_REQUEST_DB_QUERIES = metrics.histogram(
+    'http_request_db_queries', 'عدد استعلامات قاعدة البيانات في الطلب',
+    ('blueprint', 'endpoint'), COUNT_BUCKETS)
+HTTP_REQUEST_DB_SECONDS = metrics.histogram(
+    'http_request_db_seconds', 'زمن استعلامات قاعدة البيانات في الطلب',
+    ('blueprint', 'endpoint'))
+
+# قاعدة البيانات (كل أمر على اتصال get_db: query للقراءة و execute للكتابة و commit)
+DB_QUERY_DURATION = metrics.histogram(
+    'db_query_duration_seconds', 'زمن تنفيذ استعلام قاعدة البيانات', ('operation',))
+
+# استقبال القياسات والتنبؤ
+METRICS_INGESTED = metrics.counter(
+    'device_metrics_ingested_total', 'عدد القياسات المستقبلة من الأجهزة', ('source',))
+BATCH_INGEST_IN_FLIGHT = metrics.gauge(
+    'batch_ingest_in_flight', 'طلبات دفعات القياسات قيد المعالجة')
+MODEL_INFERENCE_DURATION = metrics.histogram(
+    'model_inference_seconds', 'زمن التنبؤ', ('model',))
+# مراحل سلسلة التنبؤ (تُسجل فقط عند تفعيل ml_models/pipeline_profiler.py)
+PIPELINE_STAGE_DURATION = metrics.histogram(
+    'ml_pipeline_stage_seconds', 'زمن كل مرحلة في سلسلة التنبؤ', ('stage',),
+    (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+
+
+def record_db_query(operation, duration):
+    """تسجيل استعلام في المقياس العام وفي إحصائيات الطلب الحالي (إن وُجد)
+
+    commit يُحسب في زمن قاعدة البيانات للطلب وليس في عدد استعلاماته
+    """
+    DB_QUERY_DURATION.observe(duration, operation=operation)
+    if has_app_context() and 'metrics_db_queries' in g:
+        if operation != 'commit':
+            g.metrics_db_queries += 1
+        g.metrics_db_seconds += duration
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+كاشف استعلامات N+1 داخل الطلب الواحد (لبيئة التطوير والاختبار)
+يعدّ استعلامات كل طلب حسب بصمتها (models/query_profiler.fingerprint)، فإذا تكرر نفس
+الاستعلام أكثر من الحد يُطبع تحذير مع مسار الاستدعاء (stack trace) لكل موضع في الكود
+نفّذه، وهو غالباً استعلام داخل حلقة يمكن استبداله باستعلام واحد
+
+التفعيل (N_PLUS_ONE_DETECTION):
+    auto (الافتراضي): عند تشغيل التطبيق بـ debug أو testing فقط
+    1: دائماً، 0: أبداً
+N_PLUS_ONE_THRESHOLD: أقصى عدد مسموح لتكرار نفس الاستعلام في الطلب (افتراضياً 5)
+N_PLUS_ONE_RAISE=1: إنهاء الطلب بخطأ NPlusOneError بدلاً من التحذير فقط
+
+في الاختبارات:
+    with n_plus_one_detector.assert_no_repeats(threshold=3):
+        client.post('/alerts/api/check-devices')
+"""
+
+import os
+import sys
+import threading
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import current_app, g, has_request_context, request
+
+from models.query_profiler import fingerprint
+
+# مجلد المشروع: مسار الاستدعاء يُختصر على ملفات المشروع فقط
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# ملفات طبقة قاعدة البيانات نفسها لا تُعتبر موضع الاستدعاء
+_SKIP_FILES = (os.path.join('models', 'database.py'), os.path.join('models', 'n_plus_one.py'))
+
+
+class NPlusOneError(AssertionError):
+    """تكرار نفس الاستعلام أكثر من الحد المسموح في طلب واحد"""
+
+
+def _call_site():
+    """أول إطار في كود المشروع خارج طبقة قاعدة البيانات (ملف، سطر)"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_ROOT) and not filename.endswith(_SKIP_FILES):
+            return frame
+        frame = frame.f_back
+    return None
+
+
+def _project_stack(frame):
+    """مسار الاستدعاء حتى frame مقتصراً على ملفات المشروع"""
+    lines = []
+    for entry in traceback.extract_stack(frame):
+        if entry.filename.startswith(PROJECT_ROOT):
+            lines.append(f"{os.path.relpath(entry.filename, PROJECT_ROOT)}:{entry.lineno} in {entry.name}"
+                         + (f"\n    {entry.line}" if entry.line else ''))
+    return lines
+
+
+class NPlusOneDetector:
+    """عدّ الاستعلامات المتكررة في كل طلب والتبليغ عن ما يتجاوز الحد"""
+
+    def __init__(self, mode='auto', threshold=5, raise_errors=False, history_size=100):
+        self.mode = mode
+        self.threshold = threshold
+        self.raise_errors = raise_errors
+        self._reports = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        # مستمعو assert_no_repeats (في الاختبارات)
+        self._listeners = []
+
+    def is_active(self):
+        if self.mode == '1' or self._listeners:
+            return True
+        if self.mode == '0':
+            return False
+        return current_app.debug or current_app.testing
+
+    def start_request(self):
+        if self.is_active():
+            g.n_plus_one_queries = {}
+
+    def record(self, sql):
+        """تسجيل استعلام في الطلب الحالي (يُستدعى من InstrumentedConnection لكل أمر)"""
+        if not has_request_context() or 'n_plus_one_queries' not in g:
+            return
+        entry = g.n_plus_one_queries.setdefault(fingerprint(sql), {'count': 0, 'sites': {}})
+        entry['count'] += 1
+
+        frame = _call_site()
+        if frame is None:
+            return
+        site = f"{os.path.relpath(frame.f_code.co_filename, PROJECT_ROOT)}:{frame.f_lineno}"
+        if site in entry['sites']:
+            entry['sites'][site]['count'] += 1
+        else:
+            # مسار الاستدعاء يُحسب مرة واحدة لكل موضع
+            entry['sites'][site] = {'count': 1, 'stack': _project_stack(frame)}
+
+    def finish_request(self, response):
+        queries = g.pop('n_plus_one_queries', None)
+        if not queries:
+            return response
+
+        threshold = min([self.threshold] + [listener['threshold'] for listener in self._listeners])
+        offenders = [
+            {
+                'fingerprint': key,
+                'count': entry['count'],
+                'call_sites': [
+                    {'site': site, 'count': info['count'], 'stack': info['stack']}
+                    for site, info in sorted(entry['sites'].items(), key=lambda item: -item[1]['count'])
+                ]
+            }
+            for key, entry in queries.items() if entry['count'] > threshold
+        ]
+        if not offenders:
+            return response
+
+        offenders.sort(key=lambda offender: -offender['count'])
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'queries': offenders
+        }
+        # الاستعلامات فوق الحد العام (الحد الأقل قد يكون من assert_no_repeats فقط)
+        worst = dict(report, queries=[o for o in offenders if o['count'] > self.threshold])
+        with self._lock:
+            for listener in self._listeners:
+                listener['reports'].append(report)
+            if worst['queries']:
+                self._reports.append(worst)
+
+        if worst['queries']:
+            self._print_report(worst)
+            response.headers['X-N-Plus-One'] = str(len(worst['queries']))
+            if self.raise_errors:
+                raise NPlusOneError(self.describe(worst))
+        return response
+
+    def _print_report(self, report):
+        print(f"⚠️ N+1: {report['method']} {report['path']} ({report['endpoint']})")
+        for offender in report['queries']:
+            print(f"  {offender['count']}× {offender['fingerprint'][:200]}")
+            for site in offender['call_sites']:
+                print(f"    {site['count']}× من {site['site']}")
+                for line in site['stack'][-4:]:
+                    print('      ' + line.replace('\n', '\n      '))
+
+    @staticmethod
+    def describe(report):
+        lines = [f"N+1 في {report['method']} {report['path']}:"]
+        for offender in report['queries']:
+            sites = ', '.join(f"{site['site']} ×{site['count']}" for site in offender['call_sites'])
+            lines.append(f"  {offender['count']}× {offender['fingerprint'][:200]} ({sites})")
+        return '\n'.join(lines)
+
+    def reports(self, limit=20):
+        """آخر تقارير N+1 (الأحدث أولاً)"""
+        with self._lock:
+            return list(self._reports)[::-1][:limit]
+
+    @contextmanager
+    def assert_no_repeats(self, threshold=None):
+        """يفشل بـ NPlusOneError إذا نفّذ أي طلب داخل الكتلة نفس الاستعلام أكثر من threshold مرة"""
+        listener = {'threshold': self.threshold if threshold is None else threshold, 'reports': []}
+        with self._lock:
+            self._listeners.append(listener)
+        try:
+            yield listener['reports']
+        finally:
+            with self._lock:
+                self._listeners.remove(listener)
+
+        failures = []
+        for report in listener['reports']:
+            queries = [o for o in report['queries'] if o['count'] > listener['threshold']]
+            if queries:
+                failures.append(self.describe(dict(report, queries=queries)))
+        if failures:
+            raise NPlusOneError('\n'.join(failures))
+
+
+def init_n_plus_one_detection(app):
+    """تسجيل الكاشف على التطبيق (يعمل فقط حسب N_PLUS_ONE_DETECTION)"""
+    if n_plus_one_detector.mode == '0':
+        return
+    app.before_request(n_plus_one_detector.start_request)
+    app.after_request(n_plus_one_detector.finish_request)
+
+# إنشاء كائن كاشف N+1
+n_plus_one_detector = NPlusOneDetector(
+    mode=os.environ.get('N_PLUS_ONE_DETECTION', 'auto'),
+    threshold=int(os.environ.get('N_PLUS_ONE_THRESHOLD', '5')),
+    raise_errors=os.environ.get('N_PLUS_ONE_RAISE') == '1'
+)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+إعدادات المحللات المشتركة بين العمال
+تفعيل محلل الاستعلامات ومحلل مراحل التنبؤ من واجهة الأدمن يُحفظ كـ JSON في جدول
+settings، وكل عامل يعيد قراءته في بداية الطلبات (مرة كل PROFILER_SETTINGS_REFRESH
+ثانية على الأكثر) فيُطبق في كل العمال وليس في العامل الذي استقبل الطلب فقط.
+متغيرات البيئة (QUERY_PROFILER، PIPELINE_PROFILER ...) هي القيم عند البدء حتى يُحفظ إعداد
+"""
+
+import json
+import os
+import threading
+import time
+
+from models.database import get_db, query_db
+
+# كل الإعدادات المسجلة (تُقرأ من refresh_profiler_settings)
+_registered = []
+
+
+class ProfilerSettings:
+    """إعداد JSON في جدول settings يُطبق على المحلل عبر apply(config)"""
+
+    def __init__(self, key, description, apply, refresh_seconds=None):
+        self.key = key
+        self.description = description
+        self.apply = apply
+        self.refresh_seconds = (float(os.environ.get('PROFILER_SETTINGS_REFRESH', '5'))
+                                if refresh_seconds is None else refresh_seconds)
+        self._checked_at = None
+        self._lock = threading.Lock()
+        _registered.append(self)
+
+    def load(self):
+        """الإعداد المحفوظ ({} إذا لم يُحفظ بعد)"""
+        row = query_db('SELECT setting_value FROM settings WHERE setting_key = ?', (self.key,), one=True)
+        return json.loads(row['setting_value']) if row and row['setting_value'] else {}
+
+    def refresh(self, force=False):
+        """قراءة الإعداد وتطبيقه (مرة كل refresh_seconds على الأكثر)"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < self.refresh_seconds:
+                return
+            self._checked_at = now
+        config = self.load()
+        if config:
+            self.apply(config)
+
+    def update(self, **changes):
+        """دمج التغييرات في الإعداد المحفوظ وتطبيقه فوراً في هذا العامل (الباقون خلال refresh_seconds)"""
+        db = get_db()
+        db.execute('''
+            INSERT OR IGNORE INTO settings (setting_key, setting_value, description)
+            VALUES (?, '{}', ?)
+        ''', (self.key, self.description))
+        db.execute('''
+            UPDATE settings
+            SET setting_value = json_patch(setting_value, ?), updated_at = CURRENT_TIMESTAMP
+            WHERE setting_key = ?
+        ''', (json.dumps(changes), self.key))
+        db.commit()
+        self.refresh(force=True)
+
+
+def refresh_profiler_settings():
+    """إعادة قراءة إعدادات كل المحللات (يُستدعى في بداية كل طلب)"""
+    for settings in list(_registered):
+        try:
+            settings.refresh()
+        except Exception as e:
+            print(f"خطأ في قراءة إعدادات {settings.key}: {e}")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+محلل استعلامات قاعدة البيانات وسجل الاستعلامات البطيئة
+يقيس كل استعلام يُنفذ على اتصال get_db ويجمعه حسب بصمته (نص الاستعلام بعد
+استبدال القيم الثابتة) فيظهر الاستعلام الذي يتكرر داخل الحلقات كسطر واحد بعدد كبير.
+الاستعلامات الأبطأ من الحد تُسجل مع خطة التنفيذ (EXPLAIN QUERY PLAN)
+
+معطل افتراضياً؛ يُفعّل بـ QUERY_PROFILER=1 أو من /metrics/queries/toggle (للأدمن) فيُحفظ
+في جدول settings ويطبقه كل عامل (models/profiler_settings.py). التقارير تُجمع من كل
+العمال عبر ملفات METRICS_MULTIPROC_DIR (models/metrics.py)
+"""
+
+import os
+import re
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache
+
+from flask import has_request_context, request
+
+from models.metrics import metrics, percentile
+
+_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.I)
+_VALUES_RE = re.compile(r'\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+', re.I)
+_SPACE_RE = re.compile(r'\s+')
+
+# الأوامر التي يمكن طلب خطة تنفيذها
+_EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """بصمة الاستعلام: القيم الثابتة تصبح ? وقوائم IN و VALUES تُختصر والمسافات تُوحد
+
+    SELECT * FROM devices WHERE id = 5  و  SELECT * FROM devices WHERE id = ?
+    لهما نفس البصمة، وكذلك IN (?, ?) و IN (?, ?, ?)
+    """
+    text = _COMMENT_RE.sub(' ', sql)
+    text = _STRING_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _IN_LIST_RE.sub('IN (...)', text)
+    text = _VALUES_RE.sub(r'VALUES \1, ...', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+class _FingerprintStats:
+    __slots__ = ('count', 'total', 'max', 'durations', 'endpoints', 'operations')
+
+    def __init__(self, sample_size):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # آخر الأزمنة فقط لحساب p95 بذاكرة محدودة
+        self.durations = deque(maxlen=sample_size)
+        self.endpoints = Counter()
+        self.operations = Counter()
+
+
+class QueryProfiler:
+    """تجميع أزمنة الاستعلامات حسب البصمة وسجل الاستعلامات البطيئة"""
+
+    def __init__(self, enabled=False, slow_threshold_ms=100, sample_size=500, slow_log_size=200):
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.sample_size = sample_size
+        self._stats = {}
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+
+    def record(self, db, operation, sql, args, duration):
+        """تسجيل استعلام منفذ (يُستدعى من InstrumentedConnection عند التفعيل)"""
+        key = fingerprint(sql)
+        endpoint = (request.endpoint or 'unmatched') if has_request_context() else None
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _FingerprintStats(self.sample_size)
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.durations.append(duration)
+            stats.operations[operation] += 1
+            if endpoint:
+                stats.endpoints[endpoint] += 1
+
+        duration_ms = duration * 1000
+        if duration_ms >= self.slow_threshold_ms:
+            plan = self.explain(db, sql, args)
+            with self._lock:
+                self._slow_log.append({
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'fingerprint': key,
+                    'duration_ms': round(duration_ms, 2),
+                    'endpoint': endpoint,
+                    'plan': plan
+                })
+            print(f"⚠️ استعلام بطيء ({duration_ms:.1f}ms) في {endpoint or '-'}: {key[:200]}")
+            for line in plan:
+                print(f"    {line}")
+
+    def configure(self, config):
+        """تطبيق الإعدادات المشتركة بين العمال: enabled و slow_threshold_ms و reset_at (epoch)"""
+        if 'enabled' in config:
+            self.enabled = bool(config['enabled'])
+        if config.get('slow_threshold_ms') is not None:
+            self.slow_threshold_ms = float(config['slow_threshold_ms'])
+        reset_at = config.get('reset_at')
+        if reset_at and datetime.fromtimestamp(reset_at) > self.started_at:
+            self.reset()
+
+    @staticmethod
+    def explain(db, sql, args=()):
+        """خطة تنفيذ SQLite للاستعلام كأسطر نصية (فارغة إذا لم تكن متاحة)"""
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return []
+        try:
+            rows = db.execute('EXPLAIN QUERY PLAN ' + sql, args).fetchall()
+        except Exception as e:
+            return [f'تعذر الحصول على الخطة: {e}']
+        # الأعمدة: id, parent, notused, detail؛ المسافة البادئة حسب العمق
+        depth = {0: -1}
+        lines = []
+        for row in rows:
+            node_id, parent, detail = row[0], row[1], row[3]
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return lines
+
+    def snapshot(self):
+        """حالة المحلل في هذا العامل بصيغة JSON (None إذا كانت فارغة)"""
+        with self._lock:
+            if not self._stats and not self._slow_log:
+                return None
+            return {
+                'stats': {
+                    key: [stats.count, stats.total, stats.max, list(stats.durations),
+                          dict(stats.endpoints), dict(stats.operations)]
+                    for key, stats in self._stats.items()
+                },
+                'slow': list(self._slow_log)
+            }
+
+    def _merged(self):
+        """حالة المحلل مجمعة من كل العمال: (الإحصائيات حسب البصمة، الاستعلامات البطيئة، عدد العمال)"""
+        workers = metrics.worker_snapshots('query_profiler')
+        merged = {}
+        slow = []
+        for pid, state in workers:
+            for key, (count, total, maximum, durations, endpoints, operations) in state['stats'].items():
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = [count, total, maximum, list(durations), Counter(endpoints), Counter(operations)]
+                    continue
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], maximum)
+                entry[3].extend(durations)
+                entry[4].update(endpoints)
+                entry[5].update(operations)
+            slow.extend(dict(entry, worker=pid) for entry in state['slow'])
+        slow.sort(key=lambda entry: entry['timestamp'], reverse=True)
+        return merged, slow, len(workers)
+
+    def top(self, limit=20, sort_by='total'):
+        """أكثر الاستعلامات كلفة (من كل العمال) مرتبة حسب total أو count أو p95 أو max"""
+        merged, _, _ = self._merged()
+        rows = []
+        for key, (count, total, maximum, durations, endpoints, operations) in merged.items():
+            durations.sort()
+            endpoints = endpoints.most_common(3)
+            operations = dict(operations)
+            rows.append({
+                'fingerprint': key,
+                'count': count,
+                'total_ms': round(total * 1000, 2),
+                'avg_ms': round(total / count * 1000, 3),
+                'p95_ms': round(percentile(durations, 95) * 1000, 3),
+                'max_ms': round(maximum * 1000, 3),
+                'operations': operations,
+                'endpoints': [{'endpoint': name, 'count': n} for name, n in endpoints]
+            })
+
+        sort_key = {'total': 'total_ms', 'count': 'count', 'p95': 'p95_ms', 'max': 'max_ms'}.get(sort_by, 'total_ms')
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+        return rows[:limit]
+
+    def slow_queries(self, limit=50):
+        """آخر الاستعلامات البطيئة من كل العمال (الأحدث أولاً)"""
+        _, slow, _ = self._merged()
+        return slow[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow_log.clear()
+            self.started_at = datetime.now()
+
+    def stats(self):
+        merged, slow, workers = self._merged()
+        return {
+            'enabled': self.enabled,
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'workers': workers,
+            'fingerprints': len(merged),
+            'queries': sum(entry[0] for entry in merged.values()),
+            'slow_queries': len(slow),
+            'started_at': self.started_at.isoformat(timespec='seconds')
+        }
+
+
+def format_top(rows):
+    """جدول نصي لأكثر الاستعلامات كلفة (للطباعة من سطر الأوامر)"""
+    lines = [f"{'count':>8} {'total ms':>10} {'avg ms':>8} {'p95 ms':>8} {'max ms':>8}  query"]
+    for row in rows:
+        lines.append(f"{row['count']:>8} {row['total_ms']:>10} {row['avg_ms']:>8} {row['p95_ms']:>8} "
+                     f"{row['max_ms']:>8}  {row['fingerprint'][:120]}")
+        if row['endpoints']:
+            lines.append(' ' * 47 + '← ' + ', '.join(f"{e['endpoint']} ×{e['count']}" for e in row['endpoints']))
+    return '\n'.join(lines)
+
+# إنشاء كائن محلل الاستعلامات
+query_profiler = QueryProfiler(
+    enabled=os.environ.get('QUERY_PROFILER') == '1',
+    slow_threshold_ms=float(os.environ.get('QUERY_SLOW_MS', '100'))
+)
+metrics.register_snapshot('query_profiler', query_profiler.snapshot)
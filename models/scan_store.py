@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مخزن نتائج الفحص الشامل للأجهزة
+كل قسم من نتائج الفحص يُحفظ مضغوطاً مرة واحدة حسب بصمة محتواه (scan_blobs)،
+وكل فحص يحفظ فقط مراجع أقسامه، فالأقسام التي لم تتغير لا تُخزن من جديد.
+ملخص آخر فحص لكل جهاز في device_inventory مع فهارس للاستعلام عن العتاد
+
+سجل الفحوصات محدود لكل جهاز (SCAN_RETENTION_COUNT و SCAN_RETENTION_DAYS)، ولكل قسم
+عداد مراجع (ref_count) فيُحذف من scan_blobs عندما لا يشير إليه أي فحص
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+
+from models.database import get_db, query_db
+
+# أقسام نتائج الفحص التي تُدمج مفاتيحها عند استلام فرق (scan_partial)
+SCAN_SECTIONS = ('system_info', 'hardware_info', 'storage_info', 'memory_info', 'network_info', 'processes_info')
+
+# الاحتفاظ بآخر عدد من الفحوصات لكل جهاز وحذف الأقدم من عدد الأيام (0 = بدون حد)
+# آخر فحص يبقى دائماً لأنه أساس الفروق (scan_partial) وملخص العتاد
+SCAN_RETENTION_COUNT = int(os.environ.get('SCAN_RETENTION_COUNT', '20'))
+SCAN_RETENTION_DAYS = int(os.environ.get('SCAN_RETENTION_DAYS', '30'))
+
+# فلاتر استعلام العتاد: اسم المعامل -> (العمود، المقارنة)
+INVENTORY_FILTERS = {
+    'min_ram_gb': ('ram_total_gb', '>='),
+    'max_ram_gb': ('ram_total_gb', '<'),
+    'min_disk_gb': ('disk_total_gb', '>='),
+    'max_disk_gb': ('disk_total_gb', '<'),
+    'max_disk_free_gb': ('disk_free_gb', '<'),
+    'min_cores': ('cpu_logical_cores', '>='),
+    'max_cores': ('cpu_logical_cores', '<'),
+    'os': ('os_name', '='),
+    'architecture': ('architecture', '=')
+}
+
+
+class ScanBaseMismatch(Exception):
+    """الفرق المرسل مبني على فحص غير آخر فحص محفوظ للجهاز (يجب إرسال الفحص كاملاً)"""
+
+
+def canonical_json(value):
+    """تمثيل JSON ثابت (نفس الترتيب والفواصل في العميل والخادم)"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def scan_hash(scan_results):
+    """بصمة نتائج الفحص كاملة (تطابق scan_hash في device_client.py)"""
+    return hashlib.sha256(canonical_json(scan_results).encode('utf-8')).hexdigest()
+
+
+def _store_blob(db, value):
+    """حفظ قسم مضغوطاً (مرة واحدة لكل محتوى) وزيادة عدد مراجعه وإرجاع بصمته"""
+    raw = canonical_json(value).encode('utf-8')
+    blob_hash = hashlib.sha256(raw).hexdigest()
+    db.execute('''
+        INSERT INTO scan_blobs (hash, data, size, ref_count)
+        VALUES (?, ?, ?, 1)
+        ON CONFLICT(hash) DO UPDATE SET ref_count = ref_count + 1
+    ''', (blob_hash, zlib.compress(raw), len(raw)))
+    return blob_hash
+
+
+def _delete_scans(db, scans):
+    """حذف فحوصات (صفوف فيها id و sections) وإنقاص مراجع أقسامها
+
+    الأقسام التي لم يعد يشير إليها أي فحص تُحذف من scan_blobs. يعيد عدد الفحوصات المحذوفة
+    """
+    if not scans:
+        return 0
+
+    refs = Counter()
+    for scan in scans:
+        refs.update(json.loads(scan['sections']).values())
+
+    db.execute('DELETE FROM device_scans WHERE id IN (SELECT value FROM json_each(?))',
+               (json.dumps([scan['id'] for scan in scans]),))
+    db.executemany('UPDATE scan_blobs SET ref_count = ref_count - ? WHERE hash = ?',
+                   [(count, blob_hash) for blob_hash, count in refs.items()])
+    db.execute('''
+        DELETE FROM scan_blobs
+        WHERE ref_count <= 0 AND hash IN (SELECT value FROM json_each(?))
+    ''', (json.dumps(list(refs)),))
+    return len(scans)
+
+
+def prune_scans(db, device_id, latest_scan_id):
+    """حذف فحوصات الجهاز خارج حد الاحتفاظ (عدداً أو عمراً) ما عدا آخر فحص"""
+    conditions = []
+    params = []
+    if SCAN_RETENTION_COUNT > 0:
+        conditions.append('''id NOT IN (
+            SELECT id FROM device_scans WHERE device_id = ? ORDER BY id DESC LIMIT ?
+        )''')
+        params.extend((device_id, SCAN_RETENTION_COUNT))
+    if SCAN_RETENTION_DAYS > 0:
+        conditions.append('created_at < ?')
+        params.append(datetime.now() - timedelta(days=SCAN_RETENTION_DAYS))
+    if not conditions:
+        return 0
+
+    expired = db.execute(f'''
+        SELECT id, sections FROM device_scans
+        WHERE device_id = ? AND id < ? AND ({' OR '.join(conditions)})
+    ''', (device_id, latest_scan_id, *params)).fetchall()
+    return _delete_scans(db, expired)
+
+
+def delete_device_scans(device_id):
+    """حذف سجل فحوصات الجهاز وملخص عتاده والأقسام التي لم تعد مستخدمة (عند حذف الجهاز)"""
+    db = get_db()
+    db.execute('DELETE FROM device_inventory WHERE device_id = ?', (device_id,))
+    scans = db.execute('SELECT id, sections FROM device_scans WHERE device_id = ?', (device_id,)).fetchall()
+    deleted = _delete_scans(db, scans)
+    db.commit()
+    return deleted
+
+
+def load_scan(scan):
+    """إعادة بناء نتائج فحص كاملة من صف device_scans"""
+    sections = json.loads(scan['sections'])
+    if not sections:
+        return {}
+
+    hashes = tuple(set(sections.values()))
+    placeholders = ','.join('?' * len(hashes))
+    blobs = {
+        row['hash']: row['data']
+        for row in query_db(f'SELECT hash, data FROM scan_blobs WHERE hash IN ({placeholders})', hashes)
+    }
+    return {
+        key: json.loads(zlib.decompress(blobs[blob_hash]))
+        for key, blob_hash in sections.items()
+    }
+
+
+def latest_scan(device_id):
+    """آخر فحص محفوظ للجهاز (صف device_scans أو None)"""
+    return query_db('''
+        SELECT * FROM device_scans
+        WHERE device_id = ?
+        ORDER BY id DESC
+        LIMIT 1
+    ''', (device_id,), one=True)
+
+
+def _merge_partial(base, payload):
+    """دمج فرق الفحص (scan_partial) مع الفحص الأساسي"""
+    replaced = set(payload.get('scan_replaced') or [])
+    merged = dict(base)
+    for key, value in (payload.get('scan_results') or {}).items():
+        if key in SCAN_SECTIONS and key not in replaced and isinstance(value, dict) and isinstance(merged.get(key), dict):
+            section = dict(merged[key])
+            section.update(value)
+            merged[key] = section
+        else:
+            merged[key] = value
+    return merged
+
+
+def _inventory_row(scan_results):
+    """ملخص العتاد القابل للاستعلام من نتائج الفحص"""
+    system_info = scan_results.get('system_info') or {}
+    memory_info = scan_results.get('memory_info') or {}
+    storage_info = scan_results.get('storage_info') or {}
+    cpu_info = (scan_results.get('hardware_info') or {}).get('cpu') or {}
+    return {
+        'os_name': system_info.get('platform'),
+        'os_release': system_info.get('platform_release'),
+        'architecture': system_info.get('architecture'),
+        'processor': system_info.get('processor'),
+        'cpu_physical_cores': cpu_info.get('physical_cores'),
+        'cpu_logical_cores': cpu_info.get('logical_cores'),
+        'ram_total_gb': memory_info.get('total_gb'),
+        'disk_total_gb': storage_info.get('main_disk_total_gb'),
+        'disk_free_gb': storage_info.get('main_disk_free_gb')
+    }
+
+
+def save_scan(device_id, payload):
+    """حفظ نتائج فحص (كاملة أو فرق) وتحديث ملخص العتاد
+
+    payload: جسم طلب update-after-scan. إذا كان scan_partial يجب أن تطابق
+    base_scan_hash بصمة آخر فحص محفوظ، وإلا يُرفع ScanBaseMismatch.
+    يعيد (معرّف الفحص، الأقسام التي تغيرت)
+    """
+    db = get_db()
+    previous = latest_scan(device_id)
+    previous_sections = json.loads(previous['sections']) if previous else {}
+
+    if payload.get('scan_partial'):
+        if not previous or previous['scan_hash'] != payload.get('base_scan_hash'):
+            raise ScanBaseMismatch('الفحص الأساسي غير موجود - أرسل الفحص كاملاً')
+        scan_results = _merge_partial(load_scan(previous), payload)
+    else:
+        scan_results = payload.get('scan_results') or {}
+
+    sections = {key: _store_blob(db, value) for key, value in scan_results.items()}
+    changed_sections = sorted(
+        key for key, blob_hash in sections.items()
+        if key in SCAN_SECTIONS and previous_sections.get(key) != blob_hash
+    )
+
+    now = datetime.now()
+    cursor = db.execute('''
+        INSERT INTO device_scans
+        (device_id, scan_hash, sections, changed_sections, warnings_count, errors_count, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        device_id,
+        scan_hash(scan_results),
+        canonical_json(sections),
+        canonical_json(changed_sections),
+        len(scan_results.get('warnings') or []),
+        len(scan_results.get('errors') or []),
+        now
+    ))
+    scan_id = cursor.lastrowid
+
+    inventory = _inventory_row(scan_results)
+    columns = ', '.join(inventory)
+    db.execute(f'''
+        INSERT INTO device_inventory (device_id, scan_id, {columns}, updated_at)
+        VALUES (?, ?, {', '.join('?' * len(inventory))}, ?)
+        ON CONFLICT(device_id) DO UPDATE SET
+            scan_id = excluded.scan_id,
+            {', '.join(f'{column} = excluded.{column}' for column in inventory)},
+            updated_at = excluded.updated_at
+    ''', (device_id, scan_id, *inventory.values(), now))
+
+    prune_scans(db, device_id, scan_id)
+    db.commit()
+    return scan_id, changed_sections
+
+
+def query_inventory(filters, user_id=None):
+    """الأجهزة التي يطابق ملخص عتادها الفلاتر (مثلاً max_ram_gb=8)
+
+    filters: قاموس بمفاتيح INVENTORY_FILTERS، و user_id لتقييد النتائج بأجهزة مستخدم
+    """
+    conditions = ['d.is_active = 1']
+    params = []
+    for name, value in filters.items():
+        if name not in INVENTORY_FILTERS or value in (None, ''):
+            continue
+        column, operator = INVENTORY_FILTERS[name]
+        conditions.append(f'i.{column} {operator} ?')
+        params.append(value)
+    if user_id is not None:
+        conditions.append('d.user_id = ?')
+        params.append(user_id)
+
+    return query_db(f'''
+        SELECT i.*, d.name, d.location, d.device_type, d.status
+        FROM device_inventory i
+        JOIN devices d ON d.id = i.device_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY i.device_id
+    ''', tuple(params))
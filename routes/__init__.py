@@ -1,2 +1,2 @@
-# routes package
-
+# routes package
+
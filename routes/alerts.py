@@ -1,264 +1,413 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-إدارة التنبيهات
-معالجة التنبيهات والفحص التلقائي
-"""
-
-from flask import Blueprint, request, jsonify, render_template
-from models.database import get_db, query_db, execute_db
-from routes.auth import require_login
-from ml_models.smart_predictor import smart_predictor as predictor
-from datetime import datetime
-
-alerts_bp = Blueprint('alerts', __name__, url_prefix='/alerts')
-
-@alerts_bp.route('')
-@require_login
-def alerts_list():
-    """صفحة قائمة التنبيهات"""
-    # جلب التنبيهات من قاعدة البيانات لتمريرها للقالب (اختياري - يمكن جلبها عبر API)
-    try:
-        alerts = query_db('''
-            SELECT a.*, d.name as device_name, d.location as device_location,
-                   u.username as acknowledged_by_username
-            FROM alerts a
-            JOIN devices d ON a.device_id = d.id
-            LEFT JOIN users u ON a.acknowledged_by = u.id
-            ORDER BY a.created_at DESC
-            LIMIT 100
-        ''')
-        
-        # تحويل إلى قائمة dictionaries للقالب
-        alerts_list = []
-        for alert in alerts:
-            alerts_list.append({
-                'id': alert['id'],
-                'device_id': alert['device_id'],
-                'device_name': alert['device_name'],
-                'device_location': alert['device_location'],
-                'type': alert['severity'],  # استخدام severity كـ type
-                'alert_type': alert['alert_type'],
-                'severity': alert['severity'],
-                'message': alert['message'],
-                'status': alert['status'],
-                'acknowledged_by': alert['acknowledged_by'],
-                'acknowledged_by_username': alert['acknowledged_by_username'],
-                'acknowledged_at': alert['acknowledged_at'],
-                'resolved_at': alert['resolved_at'],
-                'timestamp': alert['created_at']
-            })
-    except Exception as e:
-        alerts_list = []
-    
-    return render_template('alerts.html', alerts=alerts_list)
-
-@alerts_bp.route('/api')
-@require_login
-def api_get_alerts():
-    """API للحصول على جميع التنبيهات"""
-    try:
-        status_filter = request.args.get('status', 'all')
-        severity_filter = request.args.get('severity', 'all')
-        device_filter = request.args.get('device', '')
-        
-        query = '''
-            SELECT a.*, d.name as device_name, d.location as device_location,
-                   u.username as acknowledged_by_username
-            FROM alerts a
-            JOIN devices d ON a.device_id = d.id
-            LEFT JOIN users u ON a.acknowledged_by = u.id
-            WHERE 1=1
-        '''
-        params = []
-        
-        if status_filter != 'all':
-            query += ' AND a.status = ?'
-            params.append(status_filter)
-        
-        if severity_filter != 'all':
-            query += ' AND a.severity = ?'
-            params.append(severity_filter)
-        
-        if device_filter:
-            query += ' AND d.name = ?'
-            params.append(device_filter)
-        
-        query += ' ORDER BY a.created_at DESC'
-        
-        alerts = query_db(query, tuple(params))
-        
-        alerts_list = []
-        for alert in alerts:
-            alerts_list.append({
-                'id': alert['id'],
-                'device_id': alert['device_id'],
-                'device_name': alert['device_name'],
-                'device_location': alert['device_location'],
-                'alert_type': alert['alert_type'],
-                'severity': alert['severity'],
-                'message': alert['message'],
-                'status': alert['status'],
-                'acknowledged_by': alert['acknowledged_by'],
-                'acknowledged_by_username': alert['acknowledged_by_username'],
-                'acknowledged_at': alert['acknowledged_at'],
-                'resolved_at': alert['resolved_at'],
-                'created_at': alert['created_at']
-            })
-        
-        return jsonify(alerts_list)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@alerts_bp.route('/api/devices', methods=['GET'])
-@require_login
-def api_get_devices_for_filter():
-    """API للحصول على قائمة الأجهزة للفلتر"""
-    try:
-        devices = query_db('''
-            SELECT DISTINCT d.id, d.name
-            FROM devices d
-            INNER JOIN alerts a ON d.id = a.device_id
-            WHERE d.is_active = 1
-            ORDER BY d.name
-        ''')
-        
-        devices_list = [{'id': d['id'], 'name': d['name']} for d in devices]
-        return jsonify(devices_list)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@alerts_bp.route('/api/<int:alert_id>/acknowledge', methods=['POST'])
-@require_login
-def api_acknowledge_alert(alert_id):
-    """API لتأكيد تنبيه"""
-    try:
-        from flask import session
-        user_id = session.get('user_id')
-        if not user_id:
-            return jsonify({'error': 'يجب تسجيل الدخول'}), 401
-        
-        execute_db('''
-            UPDATE alerts 
-            SET status = 'acknowledged', 
-                acknowledged_by = ?,
-                acknowledged_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (user_id, alert_id))
-        
-        return jsonify({'success': True, 'message': 'تم تأكيد التنبيه'})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@alerts_bp.route('/api/<int:alert_id>/resolve', methods=['POST'])
-@require_login
-def api_resolve_alert(alert_id):
-    """API لحل تنبيه"""
-    try:
-        execute_db('''
-            UPDATE alerts 
-            SET status = 'resolved', 
-                resolved_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (alert_id,))
-        
-        return jsonify({'success': True, 'message': 'تم حل التنبيه'})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@alerts_bp.route('/api/check-devices', methods=['POST'])
-@require_login
-def api_check_devices():
-    """API لفحص الأجهزة تلقائياً باستخدام الذكاء الاصطناعي"""
-    try:
-        db = get_db()
-        
-        # جلب جميع الأجهزة النشطة فقط
-        devices = query_db('SELECT * FROM devices WHERE is_active = 1')
-        
-        new_alerts = 0
-        updated_devices = 0
-        
-        for device in devices:
-            # الحصول على آخر القياسات
-            latest_metric = query_db('''
-                SELECT * FROM device_metrics 
-                WHERE device_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT 1
-            ''', (device['id'],), one=True)
-            
-            if not latest_metric:
-                continue
-            
-            # تحضير بيانات الجهاز
-            device_data = {
-                'cpu_usage': latest_metric['cpu_usage'] or 0,
-                'ram_usage': latest_metric['ram_usage'] or 0,
-                'disk_usage': latest_metric['disk_usage'] or 0,
-                'temperature': latest_metric['temperature'] or 0,
-                'battery_level': latest_metric['battery_level']
-            }
-            
-            # الحصول على القياسات التاريخية
-            historical_metrics = query_db('''
-                SELECT * FROM device_metrics 
-                WHERE device_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT 10
-            ''', (device['id'],))
-            
-            historical_data = [
-                {
-                    'cpu_usage': m['cpu_usage'] or 0,
-                    'ram_usage': m['ram_usage'] or 0,
-                    'temperature': m['temperature'] or 0
-                }
-                for m in historical_metrics
-            ] if len(historical_metrics) > 1 else None
-            
-            # استخدام النظام الذكي للتنبؤ (يتعلم من البيانات)
-            prediction = predictor.predict_failure(device_data, historical_data)
-            
-            # تحديث حالة الجهاز
-            new_status = prediction['risk_level'] if prediction['risk_level'] != 'low' else 'healthy'
-            if new_status != device['status']:
-                execute_db('UPDATE devices SET status = ? WHERE id = ?', (new_status, device['id']))
-                updated_devices += 1
-            
-            # إنشاء التنبيهات
-            for alert in prediction['alerts']:
-                # التحقق إذا كان التنبيه موجود مسبقاً
-                existing_alert = query_db('''
-                    SELECT id FROM alerts 
-                    WHERE device_id = ? 
-                    AND message LIKE ? 
-                    AND status IN ('active', 'acknowledged')
-                ''', (device['id'], f'%{alert["message"].split(":")[-1].strip()}%'), one=True)
-                
-                if not existing_alert:
-                    # إدخال التنبيه الجديد
-                    execute_db('''
-                        INSERT INTO alerts 
-                        (device_id, alert_type, severity, message, status, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        device['id'],
-                        alert['type'],
-                        alert['severity'],
-                        f'{device["name"]}: {alert["message"]}',
-                        'active',
-                        datetime.now()
-                    ))
-                    new_alerts += 1
-        
-        return jsonify({
-            'success': True,
-            'new_alerts': new_alerts,
-            'updated_devices': updated_devices,
-            'total_checked': len(devices),
-            'message': f'تم فحص {len(devices)} جهاز وإنشاء {new_alerts} تنبيه جديد وتحديث {updated_devices} جهاز'
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+إدارة التنبيهات
+معالجة التنبيهات والفحص التلقائي
+"""
+
+from flask import Blueprint, request, jsonify, render_template
+from models.database import get_db, query_db
+from routes.auth import require_login
+from ml_models.fleet_sweeper import fleet_sweeper
+from datetime import datetime, timedelta
+import json
+import sqlite3
+
+alerts_bp = Blueprint('alerts', __name__, url_prefix='/alerts')
+
+@alerts_bp.route('')
+@require_login
+def alerts_list():
+    """صفحة قائمة التنبيهات"""
+    # جلب التنبيهات من قاعدة البيانات لتمريرها للقالب (اختياري - يمكن جلبها عبر API)
+    try:
+        alerts = query_db('''
+            SELECT a.*, d.name as device_name, d.location as device_location,
+                   u.username as acknowledged_by_username
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+            LEFT JOIN users u ON a.acknowledged_by = u.id
+            ORDER BY a.created_at DESC
+            LIMIT 100
+        ''')
+        
+        # تحويل إلى قائمة dictionaries للقالب
+        alerts_list = []
+        for alert in alerts:
+            alerts_list.append({
+                'id': alert['id'],
+                'device_id': alert['device_id'],
+                'device_name': alert['device_name'],
+                'device_location': alert['device_location'],
+                'type': alert['severity'],  # استخدام severity كـ type
+                'alert_type': alert['alert_type'],
+                'severity': alert['severity'],
+                'message': alert['message'],
+                'status': alert['status'],
+                'acknowledged_by': alert['acknowledged_by'],
+                'acknowledged_by_username': alert['acknowledged_by_username'],
+                'acknowledged_at': alert['acknowledged_at'],
+                'resolved_at': alert['resolved_at'],
+                'timestamp': alert['created_at']
+            })
+    except Exception as e:
+        alerts_list = []
+    
+    return render_template('alerts.html', alerts=alerts_list)
+
+@alerts_bp.route('/api')
+@require_login
+def api_get_alerts():
+    """API للحصول على التنبيهات صفحة صفحة (limit/offset) مع العدد الكلي وإحصائيات الفلتر"""
+    try:
+        status_filter = request.args.get('status', 'all')
+        severity_filter = request.args.get('severity', 'all')
+        device_filter = request.args.get('device', '')
+        limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+        offset = max(0, request.args.get('offset', 0, type=int))
+        
+        where = ' WHERE 1=1'
+        params = []
+        
+        if status_filter != 'all':
+            where += ' AND a.status = ?'
+            params.append(status_filter)
+        
+        if severity_filter != 'all':
+            where += ' AND a.severity = ?'
+            params.append(severity_filter)
+        
+        if device_filter:
+            where += ' AND d.name = ?'
+            params.append(device_filter)
+        
+        # الإحصائيات على كل التنبيهات المطابقة وليس الصفحة الحالية فقط
+        summary = query_db('''
+            SELECT COUNT(*) AS total,
+                   COALESCE(SUM(a.severity = 'critical'), 0) AS critical,
+                   COALESCE(SUM(a.severity = 'warning'), 0) AS warning,
+                   COALESCE(SUM(a.status = 'resolved'), 0) AS resolved
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+        ''' + where, tuple(params), one=True)
+        
+        alerts = query_db('''
+            SELECT a.*, d.name as device_name, d.location as device_location,
+                   u.username as acknowledged_by_username
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+            LEFT JOIN users u ON a.acknowledged_by = u.id
+        ''' + where + ' ORDER BY a.created_at DESC LIMIT ? OFFSET ?', tuple(params) + (limit, offset))
+        
+        alerts_list = []
+        for alert in alerts:
+            alerts_list.append({
+                'id': alert['id'],
+                'device_id': alert['device_id'],
+                'device_name': alert['device_name'],
+                'device_location': alert['device_location'],
+                'alert_type': alert['alert_type'],
+                'severity': alert['severity'],
+                'message': alert['message'],
+                'status': alert['status'],
+                'acknowledged_by': alert['acknowledged_by'],
+                'acknowledged_by_username': alert['acknowledged_by_username'],
+                'acknowledged_at': alert['acknowledged_at'],
+                'resolved_at': alert['resolved_at'],
+                'created_at': alert['created_at'],
+                'incident_id': alert['incident_id']
+            })
+        
+        return jsonify({
+            'alerts': alerts_list,
+            'total': summary['total'],
+            'counts': {
+                'critical': summary['critical'],
+                'warning': summary['warning'],
+                'resolved': summary['resolved']
+            },
+            'limit': limit,
+            'offset': offset
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alerts_bp.route('/api/devices', methods=['GET'])
+@require_login
+def api_get_devices_for_filter():
+    """API للحصول على قائمة الأجهزة للفلتر"""
+    try:
+        devices = query_db('''
+            SELECT DISTINCT d.id, d.name
+            FROM devices d
+            INNER JOIN alerts a ON d.id = a.device_id
+            WHERE d.is_active = 1
+            ORDER BY d.name
+        ''')
+        
+        devices_list = [{'id': d['id'], 'name': d['name']} for d in devices]
+        return jsonify(devices_list)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alerts_bp.route('/api/incidents', methods=['GET'])
+@require_login
+def api_get_incidents():
+    """API للحصول على حوادث التنبيهات المجمّعة (الموقع + النوع + النافذة الزمنية)"""
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        
+        incidents = query_db('''
+            SELECT * FROM alert_incidents
+            WHERE last_seen >= datetime('now', 'localtime', ?)
+            ORDER BY last_seen DESC
+            LIMIT ?
+        ''', (f'-{hours} hours', limit))
+        
+        incidents_list = []
+        for incident in incidents:
+            incidents_list.append({
+                'id': incident['id'],
+                'location': incident['location'],
+                'alert_type': incident['alert_type'],
+                'severity': incident['severity'],
+                'window_start': incident['window_start'],
+                'alert_count': incident['alert_count'],
+                'written_count': incident['written_count'],
+                'suppressed_count': incident['suppressed_count'],
+                'first_seen': incident['first_seen'],
+                'last_seen': incident['last_seen']
+            })
+        
+        return jsonify(incidents_list)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alerts_bp.route('/api/incidents/<int:incident_id>/devices', methods=['GET'])
+@require_login
+def api_get_incident_devices(incident_id):
+    """API لأجهزة الحادثة: التي كُتب لها تنبيه والتي حُسبت فقط (تحديد المعدل)"""
+    try:
+        members = query_db('''
+            SELECT d.id AS device_id, d.name AS device_name, d.location,
+                   a.id AS alert_id, a.severity, a.status, a.created_at AS created_at, 0 AS suppressed
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+            WHERE a.incident_id = ?
+            UNION ALL
+            SELECT d.id, d.name, d.location, NULL, NULL, NULL, m.created_at, 1
+            FROM incident_members m
+            JOIN devices d ON m.device_id = d.id
+            WHERE m.incident_id = ?
+            ORDER BY suppressed, created_at
+        ''', (incident_id, incident_id))
+
+        return jsonify([{
+            'device_id': member['device_id'],
+            'device_name': member['device_name'],
+            'location': member['location'],
+            'alert_id': member['alert_id'],
+            'severity': member['severity'],
+            'status': member['status'],
+            'created_at': member['created_at'],
+            'suppressed': bool(member['suppressed'])
+        } for member in members])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _update_alert_status(alert_id, from_statuses, assignments, params=()):
+    """تغيير حالة تنبيه واحد فقط إذا كانت حالته الحالية ضمن from_statuses
+
+    يعيد None عند النجاح، أو رد خطأ (404 إذا لم يوجد التنبيه، 409 إذا كانت حالته
+    لا تسمح بالانتقال أو تعارض مع تنبيه مفتوح بنفس البصمة)
+    """
+    db = get_db()
+    placeholders = ', '.join('?' * len(from_statuses))
+    try:
+        cursor = db.execute(f'''
+            UPDATE alerts 
+            SET {assignments}
+            WHERE id = ? AND status IN ({placeholders})
+        ''', (*params, alert_id, *from_statuses))
+        db.commit()
+    except sqlite3.IntegrityError:
+        db.rollback()
+        return jsonify({'error': 'يوجد تنبيه مفتوح آخر لنفس الحالة'}), 409
+    
+    if cursor.rowcount:
+        return None
+    
+    alert = query_db('SELECT status FROM alerts WHERE id = ?', (alert_id,), one=True)
+    if not alert:
+        return jsonify({'error': 'التنبيه غير موجود'}), 404
+    return jsonify({'error': f"لا يمكن تغيير تنبيه حالته {alert['status']}", 'status': alert['status']}), 409
+
+@alerts_bp.route('/api/<int:alert_id>/acknowledge', methods=['POST'])
+@require_login
+def api_acknowledge_alert(alert_id):
+    """API لتأكيد تنبيه"""
+    try:
+        from flask import session
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'يجب تسجيل الدخول'}), 401
+        
+        conflict = _update_alert_status(alert_id, ('active',), '''
+            status = 'acknowledged', 
+            acknowledged_by = ?,
+            acknowledged_at = CURRENT_TIMESTAMP
+        ''', (user_id,))
+        if conflict:
+            return conflict
+        
+        return jsonify({'success': True, 'message': 'تم تأكيد التنبيه'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alerts_bp.route('/api/<int:alert_id>/resolve', methods=['POST'])
+@require_login
+def api_resolve_alert(alert_id):
+    """API لحل تنبيه"""
+    try:
+        conflict = _update_alert_status(alert_id, ('active', 'acknowledged'), '''
+            status = 'resolved', 
+            resolved_at = CURRENT_TIMESTAMP
+        ''')
+        if conflict:
+            return conflict
+        
+        return jsonify({'success': True, 'message': 'تم حل التنبيه'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _bulk_alerts_filter(data):
+    """بناء شرط التحديث الجماعي من قائمة المعرفات أو الفلتر
+
+    يعيد (الشرط، المعاملات) أو (None, رسالة الخطأ)
+    """
+    conditions = []
+    params = []
+    
+    ids = data.get('ids')
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return None, 'ids يجب أن تكون قائمة أرقام'
+        # تمرير القائمة كمعامل JSON واحد بدلاً من آلاف العلامات ?
+        conditions.append('id IN (SELECT value FROM json_each(?))')
+        params.append(json.dumps(ids))
+    
+    if data.get('device_id') is not None:
+        device_id = data['device_id']
+        if isinstance(device_id, str) and device_id.strip().isdigit():
+            device_id = int(device_id)
+        if isinstance(device_id, bool) or not isinstance(device_id, int):
+            return None, 'device_id يجب أن يكون رقماً صحيحاً'
+        conditions.append('device_id = ?')
+        params.append(device_id)
+    
+    if data.get('severity'):
+        conditions.append('severity = ?')
+        params.append(data['severity'])
+    
+    if data.get('older_than_minutes') is not None:
+        minutes = data['older_than_minutes']
+        try:
+            if isinstance(minutes, bool):
+                raise ValueError
+            minutes = float(minutes)
+            if not minutes >= 0:
+                raise ValueError
+            cutoff = datetime.now() - timedelta(minutes=minutes)
+        except (TypeError, ValueError, OverflowError):
+            return None, 'older_than_minutes يجب أن يكون رقماً موجباً'
+        conditions.append('created_at < ?')
+        params.append(cutoff)
+    
+    # حماية من تحديث جميع التنبيهات بالخطأ: يجب تحديد معرفات أو فلتر أو all صراحةً
+    if not conditions and not data.get('all'):
+        return None, 'يجب تحديد ids أو فلتر (device_id, severity, older_than_minutes) أو all'
+    
+    return ' AND '.join(conditions) or '1=1', params
+
+@alerts_bp.route('/api/bulk/acknowledge', methods=['POST'])
+@require_login
+def api_bulk_acknowledge_alerts():
+    """API لتأكيد مجموعة تنبيهات نشطة في استعلام واحد"""
+    try:
+        from flask import session
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'يجب تسجيل الدخول'}), 401
+        
+        where, params = _bulk_alerts_filter(request.json or {})
+        if where is None:
+            return jsonify({'error': params}), 400
+        
+        db = get_db()
+        cursor = db.execute(f'''
+            UPDATE alerts 
+            SET status = 'acknowledged', 
+                acknowledged_by = ?,
+                acknowledged_at = CURRENT_TIMESTAMP
+            WHERE status = 'active' AND {where}
+        ''', (user_id, *params))
+        db.commit()
+        
+        return jsonify({'success': True, 'updated': cursor.rowcount, 'message': f'تم تأكيد {cursor.rowcount} تنبيه'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alerts_bp.route('/api/bulk/resolve', methods=['POST'])
+@require_login
+def api_bulk_resolve_alerts():
+    """API لحل مجموعة تنبيهات مفتوحة في استعلام واحد"""
+    try:
+        where, params = _bulk_alerts_filter(request.json or {})
+        if where is None:
+            return jsonify({'error': params}), 400
+        
+        db = get_db()
+        cursor = db.execute(f'''
+            UPDATE alerts 
+            SET status = 'resolved', 
+                resolved_at = CURRENT_TIMESTAMP
+            WHERE status IN ('active', 'acknowledged') AND {where}
+        ''', tuple(params))
+        db.commit()
+        
+        return jsonify({'success': True, 'updated': cursor.rowcount, 'message': f'تم حل {cursor.rowcount} تنبيه'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alerts_bp.route('/api/check-devices', methods=['POST'])
+@require_login
+def api_check_devices():
+    """API لفحص الأجهزة تلقائياً باستخدام الذكاء الاصطناعي"""
+    try:
+        # الفحص اليدوي يقيّم جميع الأجهزة النشطة (وليس التي وصلتها قياسات جديدة فقط)
+        result = fleet_sweeper.sweep(only_dirty=False)
+        
+        new_alerts = result['new_alerts']
+        updated_devices = result['updated_devices']
+        total_checked = result['scanned']
+        
+        return jsonify({
+            'success': True,
+            'new_alerts': new_alerts,
+            'updated_devices': updated_devices,
+            'total_checked': total_checked,
+            'duration_seconds': result['duration_seconds'],
+            'message': f'تم فحص {total_checked} جهاز وإنشاء {new_alerts} تنبيه جديد وتحديث {updated_devices} جهاز'
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@alerts_bp.route('/api/sweeper/status', methods=['GET'])
+@require_login
+def api_sweeper_status():
+    """API لحالة الفحص الدوري (مدة الفحص، الأجهزة في الثانية، الأجهزة المنتظرة)"""
+    try:
+        return jsonify({'success': True, 'sweeper': fleet_sweeper.status()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,549 +1,553 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-نظام التحليلات المتقدمة
-تحليلات مفصلة ورسوم بيانية تفاعلية لأداء النظام
-"""
-
-from flask import Blueprint, render_template, request, jsonify, session
-from models.database import query_db
-from routes.auth import require_login, require_role
-from datetime import datetime, timedelta
-import traceback
-
-analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
-
-@analytics_bp.route('')
-@require_login
-def analytics_page():
-    """صفحة التحليلات المتقدمة"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # جلب الأجهزة حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            # الأدمن والفنيون والمديرون يرون جميع الأجهزة
-            devices = query_db('''
-                SELECT id, name, status, device_type, location
-                FROM devices
-                WHERE is_active = 1
-                ORDER BY name
-            ''')
-        else:
-            # المستخدمون العاديون يرون فقط أجهزتهم
-            devices = query_db('''
-                SELECT id, name, status, device_type, location
-                FROM devices
-                WHERE is_active = 1 AND user_id = ?
-                ORDER BY name
-            ''', (user_id,))
-        
-        return render_template('analytics.html', devices=devices, user_role=role)
-    except Exception as e:
-        return f"خطأ في تحميل صفحة التحليلات: {str(e)}", 500
-
-@analytics_bp.route('/api/kpi', methods=['GET'])
-@require_login
-def api_kpi():
-    """API للحصول على مقاييس الأداء الرئيسية (KPI)"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # حساب فترة زمنية (افتراضياً آخر 24 ساعة)
-        time_range = request.args.get('time_range', '24h')
-        hours = {
-            '1h': 1,
-            '24h': 24,
-            '7d': 168,
-            '30d': 720,
-            '90d': 2160
-        }.get(time_range, 24)
-        
-        time_threshold = datetime.now() - timedelta(hours=hours)
-        
-        # بناء الاستعلام حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            device_filter = ""
-            device_params = ()
-        else:
-            device_filter = "AND d.user_id = ?"
-            device_params = (user_id,)
-        
-        # معدل التوفر (نسبة الأجهزة السليمة)
-        availability_query = f'''
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN d.status = 'healthy' THEN 1 ELSE 0 END) as healthy
-            FROM devices d
-            WHERE d.is_active = 1 {device_filter}
-        '''
-        availability_result = query_db(availability_query, device_params, one=True)
-        availability = (availability_result['healthy'] / availability_result['total'] * 100) if availability_result['total'] > 0 else 0
-        
-        # متوسط وقت الاستجابة (متوسط آخر تحديث للأجهزة)
-        response_time_query = f'''
-            SELECT AVG(
-                CASE 
-                    WHEN julianday('now') - julianday(d.last_seen) < 0.01 THEN 0.5
-                    WHEN julianday('now') - julianday(d.last_seen) < 0.1 THEN 1.0
-                    WHEN julianday('now') - julianday(d.last_seen) < 1 THEN 2.0
-                    ELSE 5.0
-                END
-            ) as avg_response_time
-            FROM devices d
-            WHERE d.is_active = 1 AND d.last_seen IS NOT NULL {device_filter}
-        '''
-        response_time_result = query_db(response_time_query, device_params, one=True)
-        avg_response_time = response_time_result['avg_response_time'] or 0
-        
-        # التنبيهات النشطة
-        alerts_query = f'''
-            SELECT COUNT(*) as count
-            FROM alerts a
-            JOIN devices d ON a.device_id = d.id
-            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
-        '''
-        alerts_result = query_db(alerts_query, device_params, one=True)
-        active_alerts = alerts_result['count'] or 0
-        
-        # المستخدمون النشطون (للأدمن فقط)
-        active_users = 0
-        if role in ['admin', 'manager']:
-            users_query = '''
-                SELECT COUNT(DISTINCT user_id) as count
-                FROM activity_log
-                WHERE created_at >= datetime('now', '-24 hours')
-            '''
-            users_result = query_db(users_query, one=True)
-            active_users = users_result['count'] or 0
-        else:
-            # للمستخدمين العاديين، عدد أجهزتهم
-            devices_query = '''
-                SELECT COUNT(*) as count
-                FROM devices
-                WHERE is_active = 1 AND user_id = ?
-            '''
-            devices_result = query_db(devices_query, (user_id,), one=True)
-            active_users = devices_result['count'] or 0
-        
-        # حساب الاتجاهات (مقارنة مع الفترة السابقة)
-        prev_time_threshold = datetime.now() - timedelta(hours=hours*2)
-        
-        # معدل التوفر السابق
-        prev_availability_query = f'''
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN d.status = 'healthy' THEN 1 ELSE 0 END) as healthy
-            FROM devices d
-            WHERE d.is_active = 1 {device_filter}
-        '''
-        # ملاحظة: هذا تقريبي لأننا لا نخزن تاريخ الحالة
-        
-        # التنبيهات السابقة
-        prev_alerts_query = f'''
-            SELECT COUNT(*) as count
-            FROM alerts a
-            JOIN devices d ON a.device_id = d.id
-            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
-        '''
-        
-        return jsonify({
-            'availability': round(availability, 1),
-            'availability_trend': '+2.3',  # تقريبي
-            'avg_response_time': round(avg_response_time, 1),
-            'response_time_trend': '-0.3',  # تقريبي
-            'active_alerts': active_alerts,
-            'alerts_trend': '+1' if active_alerts > 0 else '0',  # تقريبي
-            'active_users': active_users,
-            'users_trend': '+12' if active_users > 0 else '0'  # تقريبي
-        })
-    except Exception as e:
-        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
-
-@analytics_bp.route('/api/performance', methods=['GET'])
-@require_login
-def api_performance():
-    """API للحصول على بيانات الأداء عبر الوقت"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # حساب فترة زمنية
-        time_range = request.args.get('time_range', '24h')
-        hours = {
-            '1h': 1,
-            '24h': 24,
-            '7d': 168,
-            '30d': 720,
-            '90d': 2160
-        }.get(time_range, 24)
-        
-        # حساب الوقت العتبة (استخدام datetime في SQLite)
-        time_threshold_str = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
-        
-        # بناء الاستعلام حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            device_filter = ""
-            device_params = (time_threshold_str,)
-        else:
-            device_filter = "AND d.user_id = ?"
-            device_params = (time_threshold_str, user_id)
-        
-        # جلب متوسط الاستخدام لكل ساعة
-        performance_query = f'''
-            SELECT 
-                strftime('%H', dm.timestamp) as hour,
-                AVG(COALESCE(dm.cpu_usage, 0)) as avg_cpu,
-                AVG(COALESCE(dm.ram_usage, 0)) as avg_ram,
-                AVG(COALESCE(dm.disk_usage, 0)) as avg_disk
-            FROM device_metrics dm
-            JOIN devices d ON dm.device_id = d.id
-            WHERE dm.timestamp >= datetime(?) AND d.is_active = 1 {device_filter}
-            GROUP BY strftime('%H', dm.timestamp)
-            ORDER BY hour
-            LIMIT 24
-        '''
-        performance_data = query_db(performance_query, device_params)
-        
-        # تحضير البيانات للرسم البياني
-        labels = []
-        cpu_data = []
-        ram_data = []
-        disk_data = []
-        
-        for row in performance_data:
-            labels.append(f"{row['hour']}:00")
-            cpu_data.append(round(row['avg_cpu'] or 0, 2))
-            ram_data.append(round(row['avg_ram'] or 0, 2))
-            disk_data.append(round(row['avg_disk'] or 0, 2))
-        
-        # إذا لم تكن هناك بيانات، إضافة بيانات افتراضية
-        if not labels:
-            for i in range(6):
-                labels.append(f"{i*4:02d}:00")
-                cpu_data.append(0)
-                ram_data.append(0)
-                disk_data.append(0)
-        
-        return jsonify({
-            'labels': labels,
-            'cpu': cpu_data,
-            'ram': ram_data,
-            'disk': disk_data
-        })
-    except Exception as e:
-        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
-
-@analytics_bp.route('/api/devices-distribution', methods=['GET'])
-@require_login
-def api_devices_distribution():
-    """API للحصول على توزيع الأجهزة حسب الحالة"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # بناء الاستعلام حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            device_filter = ""
-            device_params = ()
-        else:
-            device_filter = "AND user_id = ?"
-            device_params = (user_id,)
-        
-        distribution_query = f'''
-            SELECT 
-                status,
-                COUNT(*) as count
-            FROM devices
-            WHERE is_active = 1 {device_filter}
-            GROUP BY status
-        '''
-        distribution_data = query_db(distribution_query, device_params)
-        
-        # تحضير البيانات
-        healthy = 0
-        warning = 0
-        critical = 0
-        
-        for row in distribution_data:
-            if row['status'] == 'healthy':
-                healthy = row['count']
-            elif row['status'] == 'warning':
-                warning = row['count']
-            elif row['status'] == 'critical':
-                critical = row['count']
-        
-        return jsonify({
-            'healthy': healthy,
-            'warning': warning,
-            'critical': critical
-        })
-    except Exception as e:
-        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
-
-@analytics_bp.route('/api/alerts-analysis', methods=['GET'])
-@require_login
-def api_alerts_analysis():
-    """API لتحليل التنبيهات"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # بناء الاستعلام حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            device_filter = ""
-            device_params = ()
-        else:
-            device_filter = "AND d.user_id = ?"
-            device_params = (user_id,)
-        
-        alerts_query = f'''
-            SELECT 
-                a.severity,
-                COUNT(*) as count
-            FROM alerts a
-            JOIN devices d ON a.device_id = d.id
-            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
-            GROUP BY a.severity
-        '''
-        alerts_data = query_db(alerts_query, device_params)
-        
-        # تحضير البيانات
-        critical = 0
-        warning = 0
-        info = 0
-        
-        for row in alerts_data:
-            if row['severity'] == 'critical':
-                critical = row['count']
-            elif row['severity'] == 'warning':
-                warning = row['count']
-            else:
-                info = row['count']
-        
-        return jsonify({
-            'critical': critical,
-            'warning': warning,
-            'info': info
-        })
-    except Exception as e:
-        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
-
-@analytics_bp.route('/api/resource-usage', methods=['GET'])
-@require_login
-def api_resource_usage():
-    """API للحصول على متوسط استخدام الموارد"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # بناء الاستعلام حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            device_filter = ""
-            device_params = ()
-        else:
-            device_filter = "AND d.user_id = ?"
-            device_params = (user_id,)
-        
-        # جلب متوسط الاستخدام من آخر القياسات
-        usage_query = f'''
-            SELECT 
-                AVG(COALESCE(dm.cpu_usage, 0)) as avg_cpu,
-                AVG(COALESCE(dm.ram_usage, 0)) as avg_ram,
-                AVG(COALESCE(dm.disk_usage, 0)) as avg_disk,
-                AVG(COALESCE(dm.network_in, 0) + COALESCE(dm.network_out, 0)) as avg_network
-            FROM device_metrics dm
-            JOIN devices d ON dm.device_id = d.id
-            WHERE dm.timestamp >= datetime('now', '-1 hour') 
-                AND d.is_active = 1 {device_filter}
-        '''
-        usage_data = query_db(usage_query, device_params, one=True)
-        
-        # إذا لم تكن هناك بيانات، استخدام آخر القياسات
-        if not usage_data or (usage_data['avg_cpu'] is None and usage_data['avg_ram'] is None):
-            usage_query = f'''
-                SELECT 
-                    AVG(COALESCE(dm.cpu_usage, 0)) as avg_cpu,
-                    AVG(COALESCE(dm.ram_usage, 0)) as avg_ram,
-                    AVG(COALESCE(dm.disk_usage, 0)) as avg_disk,
-                    AVG(COALESCE(dm.network_in, 0) + COALESCE(dm.network_out, 0)) as avg_network
-                FROM device_metrics dm
-                JOIN (
-                    SELECT device_id, MAX(timestamp) as max_timestamp
-                    FROM device_metrics
-                    GROUP BY device_id
-                ) latest ON dm.device_id = latest.device_id AND dm.timestamp = latest.max_timestamp
-                JOIN devices d ON dm.device_id = d.id
-                WHERE d.is_active = 1 {device_filter}
-            '''
-            usage_data = query_db(usage_query, device_params, one=True)
-        
-        # إذا لم تكن هناك بيانات على الإطلاق، استخدام قيم افتراضية
-        if not usage_data or (usage_data['avg_cpu'] is None and usage_data['avg_ram'] is None):
-            usage_data = {'avg_cpu': 0, 'avg_ram': 0, 'avg_disk': 0, 'avg_network': 0}
-        
-        return jsonify({
-            'cpu': round(usage_data.get('avg_cpu', 0) or 0, 1),
-            'ram': round(usage_data.get('avg_ram', 0) or 0, 1),
-            'disk': round(usage_data.get('avg_disk', 0) or 0, 1),
-            'network': round(usage_data.get('avg_network', 0) or 0, 1)
-        })
-    except Exception as e:
-        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
-
-@analytics_bp.route('/api/trends', methods=['GET'])
-@require_login
-def api_trends():
-    """API للحصول على تحليل الاتجاهات"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # بناء الاستعلام حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            device_filter = ""
-            device_params = ()
-        else:
-            device_filter = "AND d.user_id = ?"
-            device_params = (user_id,)
-        
-        # مقارنة الأداء الحالي مع الأسبوع الماضي
-        current_week_query = f'''
-            SELECT 
-                AVG(dm.cpu_usage) as avg_cpu,
-                AVG(dm.ram_usage) as avg_ram
-            FROM device_metrics dm
-            JOIN devices d ON dm.device_id = d.id
-            WHERE dm.timestamp >= datetime('now', '-7 days') 
-                AND d.is_active = 1 {device_filter}
-        '''
-        current_week = query_db(current_week_query, device_params, one=True)
-        
-        prev_week_query = f'''
-            SELECT 
-                AVG(dm.cpu_usage) as avg_cpu,
-                AVG(dm.ram_usage) as avg_ram
-            FROM device_metrics dm
-            JOIN devices d ON dm.device_id = d.id
-            WHERE dm.timestamp >= datetime('now', '-14 days') 
-                AND dm.timestamp < datetime('now', '-7 days')
-                AND d.is_active = 1 {device_filter}
-        '''
-        prev_week = query_db(prev_week_query, device_params, one=True)
-        
-        # حساب الفرق
-        cpu_current = current_week['avg_cpu'] or 0
-        cpu_prev = prev_week['avg_cpu'] or 0
-        cpu_change = ((cpu_current - cpu_prev) / cpu_prev * 100) if cpu_prev > 0 else 0
-        
-        ram_current = current_week['avg_ram'] or 0
-        ram_prev = prev_week['avg_ram'] or 0
-        ram_change = ((ram_current - ram_prev) / ram_prev * 100) if ram_prev > 0 else 0
-        
-        # التنبيهات
-        current_alerts_query = f'''
-            SELECT COUNT(*) as count
-            FROM alerts a
-            JOIN devices d ON a.device_id = d.id
-            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
-        '''
-        current_alerts = query_db(current_alerts_query, device_params, one=True)['count'] or 0
-        
-        return jsonify({
-            'performance': {
-                'trend': 'positive' if cpu_change < 0 else 'negative',
-                'value': abs(round(cpu_change, 1)),
-                'description': f'{"انخفاض" if cpu_change < 0 else "ارتفاع"} في متوسط وقت الاستجابة بنسبة {abs(round(cpu_change, 1))}% هذا الأسبوع'
-            },
-            'alerts': {
-                'trend': 'negative' if current_alerts > 0 else 'positive',
-                'value': current_alerts,
-                'description': f'{"ارتفاع" if current_alerts > 0 else "انخفاض"} في عدد التنبيهات الحرجة'
-            },
-            'availability': {
-                'trend': 'positive',
-                'value': 2.3,
-                'description': 'زيادة في معدل توفر النظام بنسبة 2.3%'
-            }
-        })
-    except Exception as e:
-        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
-
-@analytics_bp.route('/api/predictions', methods=['GET'])
-@require_login
-def api_predictions():
-    """API للحصول على التوقعات والتنبؤات"""
-    try:
-        user_id = session.get('user_id')
-        role = session.get('role')
-        
-        # بناء الاستعلام حسب الدور
-        if role in ['admin', 'technician', 'manager']:
-            device_filter = ""
-            device_params = ()
-        else:
-            device_filter = "AND d.user_id = ?"
-            device_params = (user_id,)
-        
-        # جلب متوسط استخدام الذاكرة خلال الأسبوع الماضي
-        ram_usage_query = f'''
-            SELECT 
-                AVG(dm.ram_usage) as avg_ram
-            FROM device_metrics dm
-            JOIN devices d ON dm.device_id = d.id
-            WHERE dm.timestamp >= datetime('now', '-7 days') 
-                AND d.is_active = 1 {device_filter}
-        '''
-        ram_usage = query_db(ram_usage_query, device_params, one=True)
-        avg_ram = ram_usage['avg_ram'] or 0
-        
-        # توقعات بسيطة بناءً على البيانات الحالية
-        predictions = []
-        
-        if avg_ram > 80:
-            predictions.append({
-                'type': 'warning',
-                'title': 'تحذير محتمل',
-                'description': f'احتمالية 75% لارتفاع في استخدام الذاكرة خلال الأسبوع القادم (المتوسط الحالي: {round(avg_ram, 1)}%)',
-                'probability': 75
-            })
-        else:
-            predictions.append({
-                'type': 'success',
-                'title': 'استقرار متوقع',
-                'description': 'الأداء سيبقى مستقراً خلال الشهر القادم',
-                'probability': 85
-            })
-        
-        # عدد الأجهزة
-        devices_count_query = f'''
-            SELECT COUNT(*) as count
-            FROM devices
-            WHERE is_active = 1 {device_filter}
-        '''
-        devices_count = query_db(devices_count_query, device_params, one=True)['count'] or 0
-        
-        if devices_count > 0:
-            predictions.append({
-                'type': 'info',
-                'title': 'نمو متوقع',
-                'description': f'زيادة متوقعة في عدد الأجهزة المراقبة',
-                'probability': 60
-            })
-        
-        return jsonify({'predictions': predictions})
-    except Exception as e:
-        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
-
-@analytics_bp.route('/api/export', methods=['GET'])
-@require_login
-def api_export():
-    """API لتصدير التحليلات"""
-    try:
-        # هذا يمكن تطويره لتصدير البيانات إلى CSV أو PDF
-        return jsonify({'message': 'تم تصدير التحليلات بنجاح', 'file': 'analytics_export.csv'})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+نظام التحليلات المتقدمة
+تحليلات مفصلة ورسوم بيانية تفاعلية لأداء النظام
+"""
+
+from flask import Blueprint, render_template, request, jsonify, session
+from models.database import query_db
+from routes.auth import require_login, require_role
+from datetime import datetime, timedelta
+import traceback
+
+analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
+
+@analytics_bp.route('')
+@require_login
+def analytics_page():
+    """صفحة التحليلات المتقدمة"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # جلب الأجهزة حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            # الأدمن والفنيون والمديرون يرون جميع الأجهزة
+            devices = query_db('''
+                SELECT id, name, status, device_type, location
+                FROM devices
+                WHERE is_active = 1
+                ORDER BY name
+            ''')
+        else:
+            # المستخدمون العاديون يرون فقط أجهزتهم
+            devices = query_db('''
+                SELECT id, name, status, device_type, location
+                FROM devices
+                WHERE is_active = 1 AND user_id = ?
+                ORDER BY name
+            ''', (user_id,))
+        
+        return render_template('analytics.html', devices=devices, user_role=role)
+    except Exception as e:
+        return f"خطأ في تحميل صفحة التحليلات: {str(e)}", 500
+
+@analytics_bp.route('/api/kpi', methods=['GET'])
+@require_login
+def api_kpi():
+    """API للحصول على مقاييس الأداء الرئيسية (KPI)"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # حساب فترة زمنية (افتراضياً آخر 24 ساعة)
+        time_range = request.args.get('time_range', '24h')
+        hours = {
+            '1h': 1,
+            '24h': 24,
+            '7d': 168,
+            '30d': 720,
+            '90d': 2160
+        }.get(time_range, 24)
+        
+        time_threshold = datetime.now() - timedelta(hours=hours)
+        
+        # بناء الاستعلام حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            device_filter = ""
+            device_params = ()
+        else:
+            device_filter = "AND d.user_id = ?"
+            device_params = (user_id,)
+        
+        # معدل التوفر (نسبة الأجهزة السليمة)
+        availability_query = f'''
+            SELECT 
+                COUNT(*) as total,
+                SUM(CASE WHEN d.status = 'healthy' THEN 1 ELSE 0 END) as healthy
+            FROM devices d
+            WHERE d.is_active = 1 {device_filter}
+        '''
+        availability_result = query_db(availability_query, device_params, one=True)
+        availability = (availability_result['healthy'] / availability_result['total'] * 100) if availability_result['total'] > 0 else 0
+        
+        # متوسط وقت الاستجابة (متوسط آخر تحديث للأجهزة)
+        response_time_query = f'''
+            SELECT AVG(
+                CASE 
+                    WHEN julianday('now') - julianday(d.last_seen) < 0.01 THEN 0.5
+                    WHEN julianday('now') - julianday(d.last_seen) < 0.1 THEN 1.0
+                    WHEN julianday('now') - julianday(d.last_seen) < 1 THEN 2.0
+                    ELSE 5.0
+                END
+            ) as avg_response_time
+            FROM devices d
+            WHERE d.is_active = 1 AND d.last_seen IS NOT NULL {device_filter}
+        '''
+        response_time_result = query_db(response_time_query, device_params, one=True)
+        avg_response_time = response_time_result['avg_response_time'] or 0
+        
+        # التنبيهات النشطة
+        alerts_query = f'''
+            SELECT COUNT(*) as count
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
+        '''
+        alerts_result = query_db(alerts_query, device_params, one=True)
+        active_alerts = alerts_result['count'] or 0
+        
+        # المستخدمون النشطون (للأدمن فقط)
+        active_users = 0
+        if role in ['admin', 'manager']:
+            users_query = '''
+                SELECT COUNT(DISTINCT user_id) as count
+                FROM activity_log
+                WHERE created_at >= datetime('now', '-24 hours')
+            '''
+            users_result = query_db(users_query, one=True)
+            active_users = users_result['count'] or 0
+        else:
+            # للمستخدمين العاديين، عدد أجهزتهم
+            devices_query = '''
+                SELECT COUNT(*) as count
+                FROM devices
+                WHERE is_active = 1 AND user_id = ?
+            '''
+            devices_result = query_db(devices_query, (user_id,), one=True)
+            active_users = devices_result['count'] or 0
+        
+        # حساب الاتجاهات (مقارنة مع الفترة السابقة)
+        prev_time_threshold = datetime.now() - timedelta(hours=hours*2)
+        
+        # معدل التوفر السابق
+        prev_availability_query = f'''
+            SELECT 
+                COUNT(*) as total,
+                SUM(CASE WHEN d.status = 'healthy' THEN 1 ELSE 0 END) as healthy
+            FROM devices d
+            WHERE d.is_active = 1 {device_filter}
+        '''
+        # ملاحظة: هذا تقريبي لأننا لا نخزن تاريخ الحالة
+        
+        # التنبيهات السابقة
+        prev_alerts_query = f'''
+            SELECT COUNT(*) as count
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
+        '''
+        
+        return jsonify({
+            'availability': round(availability, 1),
+            'availability_trend': '+2.3',  # تقريبي
+            'avg_response_time': round(avg_response_time, 1),
+            'response_time_trend': '-0.3',  # تقريبي
+            'active_alerts': active_alerts,
+            'alerts_trend': '+1' if active_alerts > 0 else '0',  # تقريبي
+            'active_users': active_users,
+            'users_trend': '+12' if active_users > 0 else '0'  # تقريبي
+        })
+    except Exception as e:
+        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
+
+@analytics_bp.route('/api/performance', methods=['GET'])
+@require_login
+def api_performance():
+    """API للحصول على بيانات الأداء عبر الوقت"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # حساب فترة زمنية
+        time_range = request.args.get('time_range', '24h')
+        hours = {
+            '1h': 1,
+            '24h': 24,
+            '7d': 168,
+            '30d': 720,
+            '90d': 2160
+        }.get(time_range, 24)
+        
+        # حساب الوقت العتبة (استخدام datetime في SQLite)
+        time_threshold_str = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        # بناء الاستعلام حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            device_filter = ""
+            device_params = (time_threshold_str,)
+        else:
+            device_filter = "AND d.user_id = ?"
+            device_params = (time_threshold_str, user_id)
+        
+        # جلب متوسط الاستخدام لكل ساعة
+        performance_query = f'''
+            SELECT 
+                strftime('%H', dm.timestamp) as hour,
+                AVG(COALESCE(dm.cpu_usage, 0)) as avg_cpu,
+                AVG(COALESCE(dm.ram_usage, 0)) as avg_ram,
+                AVG(COALESCE(dm.disk_usage, 0)) as avg_disk
+            FROM device_metrics dm
+            JOIN devices d ON dm.device_id = d.id
+            WHERE dm.timestamp >= datetime(?) AND d.is_active = 1 {device_filter}
+            GROUP BY strftime('%H', dm.timestamp)
+            ORDER BY hour
+            LIMIT 24
+        '''
+        performance_data = query_db(performance_query, device_params)
+        
+        # تحضير البيانات للرسم البياني
+        labels = []
+        cpu_data = []
+        ram_data = []
+        disk_data = []
+        
+        for row in performance_data:
+            labels.append(f"{row['hour']}:00")
+            cpu_data.append(round(row['avg_cpu'] or 0, 2))
+            ram_data.append(round(row['avg_ram'] or 0, 2))
+            disk_data.append(round(row['avg_disk'] or 0, 2))
+        
+        # إذا لم تكن هناك بيانات، إضافة بيانات افتراضية
+        if not labels:
+            for i in range(6):
+                labels.append(f"{i*4:02d}:00")
+                cpu_data.append(0)
+                ram_data.append(0)
+                disk_data.append(0)
+        
+        return jsonify({
+            'labels': labels,
+            'cpu': cpu_data,
+            'ram': ram_data,
+            'disk': disk_data
+        })
+    except Exception as e:
+        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
+
+@analytics_bp.route('/api/devices-distribution', methods=['GET'])
+@require_login
+def api_devices_distribution():
+    """API للحصول على توزيع الأجهزة حسب الحالة"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # بناء الاستعلام حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            device_filter = ""
+            device_params = ()
+        else:
+            device_filter = "AND user_id = ?"
+            device_params = (user_id,)
+        
+        distribution_query = f'''
+            SELECT 
+                status,
+                COUNT(*) as count
+            FROM devices
+            WHERE is_active = 1 {device_filter}
+            GROUP BY status
+        '''
+        distribution_data = query_db(distribution_query, device_params)
+        
+        # تحضير البيانات
+        healthy = 0
+        warning = 0
+        critical = 0
+        
+        for row in distribution_data:
+            if row['status'] == 'healthy':
+                healthy = row['count']
+            elif row['status'] == 'warning':
+                warning = row['count']
+            elif row['status'] == 'critical':
+                critical = row['count']
+        
+        return jsonify({
+            'healthy': healthy,
+            'warning': warning,
+            'critical': critical
+        })
+    except Exception as e:
+        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
+
+@analytics_bp.route('/api/alerts-analysis', methods=['GET'])
+@require_login
+def api_alerts_analysis():
+    """API لتحليل التنبيهات"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # بناء الاستعلام حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            device_filter = ""
+            device_params = ()
+        else:
+            device_filter = "AND d.user_id = ?"
+            device_params = (user_id,)
+        
+        alerts_query = f'''
+            SELECT 
+                a.severity,
+                COUNT(*) as count
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
+            GROUP BY a.severity
+        '''
+        alerts_data = query_db(alerts_query, device_params)
+        
+        # تحضير البيانات
+        critical = 0
+        warning = 0
+        info = 0
+        
+        for row in alerts_data:
+            if row['severity'] == 'critical':
+                critical = row['count']
+            elif row['severity'] == 'warning':
+                warning = row['count']
+            else:
+                info = row['count']
+        
+        return jsonify({
+            'critical': critical,
+            'warning': warning,
+            'info': info
+        })
+    except Exception as e:
+        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
+
+@analytics_bp.route('/api/resource-usage', methods=['GET'])
+@require_login
+def api_resource_usage():
+    """API للحصول على متوسط استخدام الموارد"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # بناء الاستعلام حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            device_filter = ""
+            device_params = ()
+        else:
+            device_filter = "AND d.user_id = ?"
+            device_params = (user_id,)
+        
+        # جلب متوسط الاستخدام من آخر القياسات
+        usage_query = f'''
+            SELECT 
+                AVG(COALESCE(dm.cpu_usage, 0)) as avg_cpu,
+                AVG(COALESCE(dm.ram_usage, 0)) as avg_ram,
+                AVG(COALESCE(dm.disk_usage, 0)) as avg_disk,
+                AVG(dm.network_in_rate) as avg_network_in,
+                AVG(dm.network_out_rate) as avg_network_out
+            FROM device_metrics dm
+            JOIN devices d ON dm.device_id = d.id
+            WHERE dm.timestamp >= datetime('now', '-1 hour') 
+                AND d.is_active = 1 {device_filter}
+        '''
+        usage_data = query_db(usage_query, device_params, one=True)
+        
+        # إذا لم تكن هناك بيانات، استخدام آخر القياسات
+        if not usage_data or (usage_data['avg_cpu'] is None and usage_data['avg_ram'] is None):
+            usage_query = f'''
+                SELECT 
+                    AVG(COALESCE(dm.cpu_usage, 0)) as avg_cpu,
+                    AVG(COALESCE(dm.ram_usage, 0)) as avg_ram,
+                    AVG(COALESCE(dm.disk_usage, 0)) as avg_disk,
+                    AVG(dm.network_in_rate) as avg_network_in,
+                    AVG(dm.network_out_rate) as avg_network_out
+                FROM device_metrics dm
+                JOIN (
+                    SELECT device_id, MAX(timestamp) as max_timestamp
+                    FROM device_metrics
+                    GROUP BY device_id
+                ) latest ON dm.device_id = latest.device_id AND dm.timestamp = latest.max_timestamp
+                JOIN devices d ON dm.device_id = d.id
+                WHERE d.is_active = 1 {device_filter}
+            '''
+            usage_data = query_db(usage_query, device_params, one=True)
+        
+        # إذا لم تكن هناك بيانات على الإطلاق، استخدام قيم افتراضية
+        if not usage_data or (usage_data['avg_cpu'] is None and usage_data['avg_ram'] is None):
+            usage_data = {'avg_cpu': 0, 'avg_ram': 0, 'avg_disk': 0, 'avg_network_in': 0, 'avg_network_out': 0}
+        
+        return jsonify({
+            'cpu': round(usage_data['avg_cpu'] or 0, 1),
+            'ram': round(usage_data['avg_ram'] or 0, 1),
+            'disk': round(usage_data['avg_disk'] or 0, 1),
+            # متوسط معدل الشبكة (وارد + صادر) بالكيلوبايت/ثانية؛ كل اتجاه يُتوسط على حدة
+            # لأن المعدل NULL في أول قياس للجهاز أو عند غياب العداد ولا يُحسب صفراً
+            'network': round(((usage_data['avg_network_in'] or 0) + (usage_data['avg_network_out'] or 0)) / 1024, 1)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
+
+@analytics_bp.route('/api/trends', methods=['GET'])
+@require_login
+def api_trends():
+    """API للحصول على تحليل الاتجاهات"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # بناء الاستعلام حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            device_filter = ""
+            device_params = ()
+        else:
+            device_filter = "AND d.user_id = ?"
+            device_params = (user_id,)
+        
+        # مقارنة الأداء الحالي مع الأسبوع الماضي
+        current_week_query = f'''
+            SELECT 
+                AVG(dm.cpu_usage) as avg_cpu,
+                AVG(dm.ram_usage) as avg_ram
+            FROM device_metrics dm
+            JOIN devices d ON dm.device_id = d.id
+            WHERE dm.timestamp >= datetime('now', '-7 days') 
+                AND d.is_active = 1 {device_filter}
+        '''
+        current_week = query_db(current_week_query, device_params, one=True)
+        
+        prev_week_query = f'''
+            SELECT 
+                AVG(dm.cpu_usage) as avg_cpu,
+                AVG(dm.ram_usage) as avg_ram
+            FROM device_metrics dm
+            JOIN devices d ON dm.device_id = d.id
+            WHERE dm.timestamp >= datetime('now', '-14 days') 
+                AND dm.timestamp < datetime('now', '-7 days')
+                AND d.is_active = 1 {device_filter}
+        '''
+        prev_week = query_db(prev_week_query, device_params, one=True)
+        
+        # حساب الفرق
+        cpu_current = current_week['avg_cpu'] or 0
+        cpu_prev = prev_week['avg_cpu'] or 0
+        cpu_change = ((cpu_current - cpu_prev) / cpu_prev * 100) if cpu_prev > 0 else 0
+        
+        ram_current = current_week['avg_ram'] or 0
+        ram_prev = prev_week['avg_ram'] or 0
+        ram_change = ((ram_current - ram_prev) / ram_prev * 100) if ram_prev > 0 else 0
+        
+        # التنبيهات
+        current_alerts_query = f'''
+            SELECT COUNT(*) as count
+            FROM alerts a
+            JOIN devices d ON a.device_id = d.id
+            WHERE a.status = 'active' AND d.is_active = 1 {device_filter}
+        '''
+        current_alerts = query_db(current_alerts_query, device_params, one=True)['count'] or 0
+        
+        return jsonify({
+            'performance': {
+                'trend': 'positive' if cpu_change < 0 else 'negative',
+                'value': abs(round(cpu_change, 1)),
+                'description': f'{"انخفاض" if cpu_change < 0 else "ارتفاع"} في متوسط وقت الاستجابة بنسبة {abs(round(cpu_change, 1))}% هذا الأسبوع'
+            },
+            'alerts': {
+                'trend': 'negative' if current_alerts > 0 else 'positive',
+                'value': current_alerts,
+                'description': f'{"ارتفاع" if current_alerts > 0 else "انخفاض"} في عدد التنبيهات الحرجة'
+            },
+            'availability': {
+                'trend': 'positive',
+                'value': 2.3,
+                'description': 'زيادة في معدل توفر النظام بنسبة 2.3%'
+            }
+        })
+    except Exception as e:
+        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
+
+@analytics_bp.route('/api/predictions', methods=['GET'])
+@require_login
+def api_predictions():
+    """API للحصول على التوقعات والتنبؤات"""
+    try:
+        user_id = session.get('user_id')
+        role = session.get('role')
+        
+        # بناء الاستعلام حسب الدور
+        if role in ['admin', 'technician', 'manager']:
+            device_filter = ""
+            device_params = ()
+        else:
+            device_filter = "AND d.user_id = ?"
+            device_params = (user_id,)
+        
+        # جلب متوسط استخدام الذاكرة خلال الأسبوع الماضي
+        ram_usage_query = f'''
+            SELECT 
+                AVG(dm.ram_usage) as avg_ram
+            FROM device_metrics dm
+            JOIN devices d ON dm.device_id = d.id
+            WHERE dm.timestamp >= datetime('now', '-7 days') 
+                AND d.is_active = 1 {device_filter}
+        '''
+        ram_usage = query_db(ram_usage_query, device_params, one=True)
+        avg_ram = ram_usage['avg_ram'] or 0
+        
+        # توقعات بسيطة بناءً على البيانات الحالية
+        predictions = []
+        
+        if avg_ram > 80:
+            predictions.append({
+                'type': 'warning',
+                'title': 'تحذير محتمل',
+                'description': f'احتمالية 75% لارتفاع في استخدام الذاكرة خلال الأسبوع القادم (المتوسط الحالي: {round(avg_ram, 1)}%)',
+                'probability': 75
+            })
+        else:
+            predictions.append({
+                'type': 'success',
+                'title': 'استقرار متوقع',
+                'description': 'الأداء سيبقى مستقراً خلال الشهر القادم',
+                'probability': 85
+            })
+        
+        # عدد الأجهزة
+        devices_count_query = f'''
+            SELECT COUNT(*) as count
+            FROM devices
+            WHERE is_active = 1 {device_filter}
+        '''
+        devices_count = query_db(devices_count_query, device_params, one=True)['count'] or 0
+        
+        if devices_count > 0:
+            predictions.append({
+                'type': 'info',
+                'title': 'نمو متوقع',
+                'description': f'زيادة متوقعة في عدد الأجهزة المراقبة',
+                'probability': 60
+            })
+        
+        return jsonify({'predictions': predictions})
+    except Exception as e:
+        return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
+
+@analytics_bp.route('/api/export', methods=['GET'])
+@require_login
+def api_export():
+    """API لتصدير التحليلات"""
+    try:
+        # هذا يمكن تطويره لتصدير البيانات إلى CSV أو PDF
+        return jsonify({'message': 'تم تصدير التحليلات بنجاح', 'file': 'analytics_export.csv'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
@@ -7,13 +7,203 @@
 
 from flask import Blueprint, request, jsonify, render_template, session
 from models.database import get_db, query_db, execute_db
+from models.alerts import upsert_open_alerts
+from models.metrics import METRICS_INGESTED, BATCH_INGEST_IN_FLIGHT
+from models.scan_store import save_scan, load_scan, latest_scan, delete_device_scans, query_inventory, INVENTORY_FILTERS, ScanBaseMismatch
+from routes.actions import pending_actions_for_device
 from routes.auth import require_login, require_role
+from ml_models.prediction_cache import prediction_cache
+from ml_models.feature_store import feature_store
+from ml_models.anomaly_detector import anomaly_detector
 from datetime import datetime
+import json
+import os
 import secrets
 import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+
+# msgpack اختياري - بدونه يقبل الخادم JSON (مضغوطاً أو لا) فقط
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 devices_bp = Blueprint('devices', __name__, url_prefix='/devices')
 
+# أقصى عدد قياسات في طلب دفعة واحد من طابور الجهاز المحلي
+MAX_BATCH_SAMPLES = 500
+# عدد طلبات الدفعات التي يعالجها كل عامل في نفس الوقت؛ الباقي يُرد بـ 503 و Retry-After
+# حتى لا تُغرق الأجهزة الخادم عند عودتها جميعاً بعد انقطاع
+BATCH_INGEST_SLOTS = threading.BoundedSemaphore(int(os.environ.get('BATCH_INGEST_CONCURRENCY', '4')))
+BATCH_RETRY_AFTER_SECONDS = 10
+
+# ملخص نافذة القياس في عميل الجهاز (الحد الأقصى و p95 بين إرسالين)
+WINDOW_STAT_FIELDS = ('cpu_max', 'cpu_p95', 'ram_max', 'ram_p95', 'temperature_max', 'temperature_p95')
+# حقول القياس؛ الحقول الغائبة من قياس delta تؤخذ من القياس الأساسي
+METRIC_FIELDS = ('cpu_usage', 'ram_usage', 'disk_usage', 'temperature', 'battery_level',
+                 'network_in', 'network_out') + WINDOW_STAT_FIELDS
+# صيغ جسم الطلب المدعومة (يعلنها الخادم للعميل في رد إرسال القياسات)
+SUPPORTED_ENCODINGS = ['gzip'] + (['msgpack'] if msgpack is not None else [])
+# أقصى حجم لجسم الطلب بعد فك الضغط
+MAX_DECODED_BODY = 5 * 1024 * 1024
+# أقصى طول لمعرّف القياس الذي يولده عميل الجهاز
+MAX_SAMPLE_ID_LENGTH = 64
+
+def _latest_metric(device_id, before=None):
+    """آخر قياس للجهاز (قبل وقت محدد إن وُجد): المعرّف وعدادات الشبكة ووقته، أو None"""
+    return query_db(f'''
+        SELECT id, network_in, network_out, timestamp FROM device_metrics 
+        WHERE device_id = ? {'AND timestamp < ?' if before is not None else ''}
+        ORDER BY timestamp DESC 
+        LIMIT 1
+    ''', (device_id,) + ((before,) if before is not None else ()), one=True)
+
+def _network_rates(previous, network_in, network_out, timestamp):
+    """معدل الشبكة (بايت/ثانية) بين قياسين من العدادات التراكمية (MB منذ إقلاع الجهاز)
+
+    إذا نقص العداد (إعادة تشغيل الجهاز) يُعتبر العداد الجديد كله زيادة منذ التصفير.
+    يعيد (None, None) للقياس الأول
+    """
+    if not previous or not previous['timestamp']:
+        return None, None
+    try:
+        previous_time = previous['timestamp']
+        if not isinstance(previous_time, datetime):
+            previous_time = datetime.fromisoformat(previous_time)
+        elapsed = (timestamp - previous_time).total_seconds()
+    except ValueError:
+        return None, None
+    if elapsed <= 0:
+        return None, None
+    
+    rates = []
+    for current, last in ((network_in, previous['network_in']), (network_out, previous['network_out'])):
+        try:
+            current, last = float(current), float(last)
+        except (TypeError, ValueError):
+            rates.append(None)
+            continue
+        increase = current - last if current >= last else current
+        rates.append(round(increase * 1024 * 1024 / elapsed, 2))
+    return tuple(rates)
+
+def _emit_anomaly_alerts(device, anomalies, received_at):
+    """حفظ تنبيهات الشذوذ المكتشفة عند الاستقبال مباشرة"""
+    # عدة عمال قد يكتشفون نفس الشذوذ - البصمة تضمن تنبيهاً مفتوحاً واحداً
+    emitted = upsert_open_alerts([
+        {
+            'device_id': device['id'],
+            'location': device['location'],
+            'alert_type': f"anomaly_{anomaly['metric']}",
+            'severity': anomaly['severity'],
+            'message': f"{device['name']}: ارتفاع غير طبيعي في {anomaly['label']}: {anomaly['value']} "
+                       f"(المعتاد {anomaly['mean']}، z={anomaly['z_score']})",
+            'created_at': datetime.now()
+        }
+        for anomaly in anomalies
+    ])
+    for _ in range(emitted):
+        anomaly_detector.record_alert(received_at)
+    
+    return emitted
+
+# إعدادات جدولة الإرسال في العميل: (مفتاح الإعداد، القيمة الافتراضية)
+DEVICE_CONFIG_SETTINGS = {
+    # الفترة الأساسية (عند تذبذب القياسات أو تجاوزها للعتبات)
+    'report_interval': ('device_report_interval', 2),
+    # أقصى فترة عندما تكون القياسات مستقرة
+    'max_report_interval': ('device_max_report_interval', 30),
+    # حد أدنى عام لجميع الأجهزة - يُرفع أثناء ضغط الخادم لتقليل معدل الإرسال
+    'min_report_interval': ('device_min_report_interval', 0)
+}
+
+def _device_config():
+    """الإعدادات التي يطبقها عميل الجهاز (تُرسل مع رد إرسال القياسات)"""
+    keys = [setting_key for setting_key, _ in DEVICE_CONFIG_SETTINGS.values()]
+    rows = query_db(f'''
+        SELECT setting_key, setting_value FROM settings
+        WHERE setting_key IN ({','.join('?' * len(keys))})
+    ''', keys)
+    values = {row['setting_key']: row['setting_value'] for row in rows}
+    
+    config = {}
+    for name, (setting_key, default) in DEVICE_CONFIG_SETTINGS.items():
+        try:
+            config[name] = float(values.get(setting_key, default))
+        except (TypeError, ValueError):
+            config[name] = default
+    return config
+
+def _request_payload():
+    """قراءة جسم الطلب: JSON، أو JSON/msgpack مضغوط بـ gzip (Content-Encoding)، أو msgpack
+
+    يرفع ValueError إذا لم يكن الجسم كائناً (قاموساً)، مثل قائمة أو جسم فارغ أو JSON غير صالح
+    """
+    body = None
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        decompressor = zlib.decompressobj(wbits=31)
+        body = decompressor.decompress(request.get_data(), MAX_DECODED_BODY)
+        if decompressor.unconsumed_tail:
+            raise ValueError('جسم الطلب أكبر من المسموح')
+    
+    if request.mimetype == 'application/msgpack':
+        if msgpack is None:
+            raise ValueError('صيغة msgpack غير مدعومة على الخادم')
+        payload = msgpack.unpackb(body if body is not None else request.get_data(), raw=False)
+    elif body is not None:
+        payload = json.loads(body)
+    else:
+        payload = request.get_json(silent=True)
+    
+    if not isinstance(payload, dict):
+        raise ValueError('يجب أن يكون كائن JSON')
+    return payload
+
+def _expand_delta(device_id, data):
+    """إعادة بناء القياس الكامل من قياس delta (الحقول المتغيرة فقط + base_metric_id)
+
+    يعيد None إذا لم يعد القياس الأساسي موجوداً (يجب على العميل إرسال قياس كامل)
+    """
+    base_metric_id = data.get('base_metric_id')
+    if base_metric_id is None:
+        return data
+    
+    base = query_db('SELECT * FROM device_metrics WHERE id = ? AND device_id = ?',
+                    (base_metric_id, device_id), one=True)
+    if not base:
+        return None
+    
+    full = {field: base[field] for field in METRIC_FIELDS}
+    full.update(data)
+    return full
+
+def _sample_id(data):
+    """معرّف القياس من عميل الجهاز (None للعملاء القدامى أو القيمة غير الصالحة)"""
+    sample_id = data.get('sample_id')
+    if isinstance(sample_id, str) and 0 < len(sample_id) <= MAX_SAMPLE_ID_LENGTH:
+        return sample_id
+    return None
+
+def _window_stats(data):
+    """قيم WINDOW_STAT_FIELDS من القياس (None للعملاء القدامى)"""
+    return tuple(
+        _clean_temperature(data.get(field)) if field.startswith('temperature') else data.get(field)
+        for field in WINDOW_STAT_FIELDS
+    )
+
+def _clean_temperature(temperature):
+    """قبول درجات الحرارة المنطقية فقط (بين 0 و 150)، وإلا None"""
+    if temperature is None:
+        return None
+    try:
+        temp_float = float(temperature)
+    except (ValueError, TypeError):
+        return None
+    return temp_float if 0 < temp_float <= 150 else None
+
 @devices_bp.route('')
 @require_login
 def devices_list():
@@ -271,10 +461,18 @@ def api_update_metrics(device_id):
         if temperature is not None and (temperature == 0 or temperature == '0'):
             temperature = None
         
+        # آخر قياس قبل الإدراج (لتحديث مخزن الخصائص المتدحرجة وحساب معدل الشبكة)
+        previous = _latest_metric(device_id)
+        previous_metric_id = previous['id'] if previous else None
+        timestamp = datetime.now()
+        network_in_rate, network_out_rate = _network_rates(
+            previous, data.get('network_in'), data.get('network_out'), timestamp)
+        
         metric_id = execute_db('''
             INSERT INTO device_metrics 
-            (device_id, cpu_usage, ram_usage, disk_usage, temperature, battery_level, network_in, network_out, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (device_id, cpu_usage, ram_usage, disk_usage, temperature, battery_level, network_in, network_out, timestamp,
+             network_in_rate, network_out_rate)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             device_id,
             data.get('cpu_usage'),
@@ -284,12 +482,23 @@ def api_update_metrics(device_id):
             data.get('battery_level'),
             data.get('network_in'),
             data.get('network_out'),
-            datetime.now()
+            timestamp,
+            network_in_rate,
+            network_out_rate
         ))
         
         # تحديث آخر ظهور
         execute_db('UPDATE devices SET last_seen = CURRENT_TIMESTAMP WHERE id = ?', (device_id,))
         
+        # إبطال التنبؤ المحفوظ لأن هناك قياساً جديداً
+        prediction_cache.invalidate(device_id)
+        feature_store.update(device_id, previous_metric_id, metric_id, {
+            'cpu_usage': data.get('cpu_usage'),
+            'ram_usage': data.get('ram_usage'),
+            'temperature': temperature
+        })
+        METRICS_INGESTED.inc(source='manual')
+        
         return jsonify({'success': True, 'metric_id': metric_id})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -552,6 +761,9 @@ def api_delete_device(device_id):
         # حذف الإجراءات المرتبطة بالجهاز
         execute_db('DELETE FROM system_actions WHERE device_id = ?', (device_id,))
         
+        # حذف سجل الفحوصات وملخص العتاد (والأقسام التي لم يعد يستخدمها أي فحص)
+        delete_device_scans(device_id)
+        
         # تعطيل الجهاز (بدلاً من الحذف الفعلي)
         execute_db('''
             UPDATE devices 
@@ -559,6 +771,10 @@ def api_delete_device(device_id):
             WHERE id = ?
         ''', (device_id,))
         
+        prediction_cache.invalidate(device_id)
+        feature_store.discard(device_id)
+        anomaly_detector.discard(device_id)
+        
         # تسجيل النشاط
         try:
             execute_db('''
@@ -682,6 +898,12 @@ def api_update_after_scan():
         if not device:
             return jsonify({'error': 'الجهاز غير موجود أو غير مفعل'}), 404
         
+        # حفظ نتائج الفحص (الفرق يُدمج مع آخر فحص محفوظ)
+        try:
+            scan_id, changed_sections = save_scan(device['id'], data)
+        except ScanBaseMismatch as e:
+            return jsonify({'error': str(e)}), 409
+        
         # تحديث معلومات الجهاز بناءً على نتائج الفحص
         update_fields = []
         update_values = []
@@ -709,9 +931,7 @@ def api_update_after_scan():
         # تحديث last_seen
         update_fields.append('last_seen = CURRENT_TIMESTAMP')
         
-        # حفظ نتائج الفحص الكاملة في قاعدة البيانات (إذا كان هناك جدول scan_results)
-        # أو يمكن حفظها كـ JSON في حقل scan_results إذا كان موجوداً
-        scan_results = data.get('scan_results', {})
+        scan = query_db('SELECT warnings_count, errors_count FROM device_scans WHERE id = ?', (scan_id,), one=True)
         
         # تحديث قاعدة البيانات
         if update_fields:
@@ -723,17 +943,16 @@ def api_update_after_scan():
             '''
             execute_db(query, tuple(update_values))
         
-        # حفظ نتائج الفحص في activity_log أو جدول منفصل
+        # تسجيل الفحص في activity_log
         try:
-            # يمكن حفظ نتائج الفحص في activity_log كـ description
-            warnings_count = len(scan_results.get('warnings', []))
-            errors_count = len(scan_results.get('errors', []))
+            warnings_count = scan['warnings_count']
+            errors_count = scan['errors_count']
             
             execute_db('''
                 INSERT INTO activity_log (user_id, action, description, ip_address)
                 VALUES (?, ?, ?, ?)
             ''', (
-                device.get('user_id') or 0,  # إذا كان user_id موجود
+                device['user_id'] or 0,
                 'device_scan',
                 f'تم فحص الجهاز {device["name"]}. التحذيرات: {warnings_count}، الأخطاء: {errors_count}',
                 request.remote_addr
@@ -745,19 +964,121 @@ def api_update_after_scan():
         return jsonify({
             'success': True,
             'message': 'تم تحديث معلومات الجهاز بعد الفحص بنجاح',
-            'warnings_count': len(scan_results.get('warnings', [])),
-            'errors_count': len(scan_results.get('errors', []))
+            'scan_id': scan_id,
+            'changed_sections': changed_sections,
+            'warnings_count': scan['warnings_count'],
+            'errors_count': scan['errors_count']
         })
     except Exception as e:
         import traceback
         return jsonify({'error': str(e), 'details': traceback.format_exc()}), 500
 
+def _scan_access_error(device_id):
+    """التحقق من صلاحية عرض فحوصات الجهاز (المستخدم العادي يرى أجهزته فقط)"""
+    device = query_db('SELECT id, user_id FROM devices WHERE id = ? AND is_active = 1', (device_id,), one=True)
+    if not device:
+        return jsonify({'error': 'الجهاز غير موجود'}), 404
+    if session.get('role', 'user') not in ['admin', 'technician', 'manager']:
+        if device['user_id'] != session.get('user_id'):
+            return jsonify({'error': 'ليس لديك صلاحية لعرض هذا الجهاز'}), 403
+    return None
+
+def _scan_dict(scan, with_results=False):
+    scan_dict = {
+        'id': scan['id'],
+        'device_id': scan['device_id'],
+        'scan_hash': scan['scan_hash'],
+        'changed_sections': json.loads(scan['changed_sections'] or '[]'),
+        'warnings_count': scan['warnings_count'],
+        'errors_count': scan['errors_count'],
+        'created_at': scan['created_at']
+    }
+    if with_results:
+        scan_dict['scan_results'] = load_scan(scan)
+    return scan_dict
+
+@devices_bp.route('/api/<int:device_id>/scans')
+@require_login
+def api_get_device_scans(device_id):
+    """API لسجل فحوصات الجهاز (بدون النتائج الكاملة)"""
+    try:
+        error = _scan_access_error(device_id)
+        if error:
+            return error
+        
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        scans = query_db('''
+            SELECT * FROM device_scans
+            WHERE device_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (device_id, limit))
+        
+        return jsonify({'scans': [_scan_dict(scan) for scan in scans]})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@devices_bp.route('/api/<int:device_id>/scans/latest')
+@devices_bp.route('/api/<int:device_id>/scans/<int:scan_id>')
+@require_login
+def api_get_device_scan(device_id, scan_id=None):
+    """API لنتائج فحص محفوظ كاملة (آخر فحص إذا لم يُحدد المعرّف)"""
+    try:
+        error = _scan_access_error(device_id)
+        if error:
+            return error
+        
+        if scan_id is None:
+            scan = latest_scan(device_id)
+        else:
+            scan = query_db('SELECT * FROM device_scans WHERE id = ? AND device_id = ?', (scan_id, device_id), one=True)
+        
+        if not scan:
+            return jsonify({'error': 'لا توجد نتائج فحص محفوظة'}), 404
+        
+        return jsonify(_scan_dict(scan, with_results=True))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@devices_bp.route('/api/inventory')
+@require_login
+def api_get_inventory():
+    """API للاستعلام عن عتاد الأجهزة من آخر فحص محفوظ (مثلاً ?max_ram_gb=8)"""
+    try:
+        filters = {}
+        for name, (column, _) in INVENTORY_FILTERS.items():
+            if name in request.args:
+                value = request.args[name]
+                if column not in ('os_name', 'architecture'):
+                    value = request.args.get(name, type=float)
+                    if value is None:
+                        return jsonify({'error': f'قيمة غير صالحة للمعامل {name}'}), 400
+                filters[name] = value
+        
+        # المستخدم العادي يرى أجهزته فقط
+        user_id = None
+        if session.get('role', 'user') not in ['admin', 'technician', 'manager']:
+            user_id = session.get('user_id')
+        
+        devices = query_inventory(filters, user_id=user_id)
+        return jsonify({
+            'filters': filters,
+            'count': len(devices),
+            'devices': [dict(device) for device in devices]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # API للأجهزة لإرسال البيانات باستخدام token
 @devices_bp.route('/api/report', methods=['POST'])
 def api_report_metrics():
     """API للأجهزة لإرسال القياسات (باستخدام device_token)"""
+    received_at = time.time()
     try:
-        data = request.json
+        try:
+            data = _request_payload()
+        except (ValueError, zlib.error) as e:
+            return jsonify({'error': f'جسم الطلب غير صالح: {e}'}), 400
         device_token = request.headers.get('X-Device-Token') or data.get('device_token')
         
         if not device_token:
@@ -769,38 +1090,60 @@ def api_report_metrics():
         if not device:
             return jsonify({'error': 'الجهاز غير موجود أو غير مفعل'}), 404
         
+        # إعادة إرسال قياس محفوظ مسبقاً (لم يصل الرد للعميل): إرجاع نفس الرد بدون إدراج
+        sample_id = _sample_id(data)
+        if sample_id is not None:
+            duplicate = _duplicate_report(data, device, sample_id)
+            if duplicate:
+                return duplicate
+        
+        # قياس delta: الحقول غير المرسلة لم تتغير عن القياس الأساسي
+        data = _expand_delta(device['id'], data)
+        if data is None:
+            return jsonify({'error': 'القياس الأساسي غير موجود - أرسل قياساً كاملاً', 'resync': True}), 409
+        
         # إدراج القياسات الجديدة
         # معالجة temperature: قبول القيم الصحيحة فقط
-        temperature = data.get('temperature')
-        # معالجة temperature: إذا كانت موجودة وتحويلها إلى float
-        if temperature is not None:
-            try:
-                temp_float = float(temperature)
-                # قبول القيم بين 0 و 150 (درجة حرارة منطقية)
-                if temp_float > 0 and temp_float <= 150:
-                    temperature = temp_float
-                else:
-                    # إذا كانت خارج النطاق، استخدم None
-                    temperature = None
-            except (ValueError, TypeError):
-                temperature = None
         # إذا كانت temperature None أو غير موجودة، اتركها None (سيتم عرض "لا توجد بيانات")
+        temperature = _clean_temperature(data.get('temperature'))
         
-        metric_id = execute_db('''
-            INSERT INTO device_metrics 
-            (device_id, cpu_usage, ram_usage, disk_usage, temperature, battery_level, network_in, network_out, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            device['id'],
-            data.get('cpu_usage', 0),
-            data.get('ram_usage', 0),
-            data.get('disk_usage', 0),
-            temperature,  # None إذا كانت 0 أو غير موجودة
-            data.get('battery_level'),
-            data.get('network_in', 0),
-            data.get('network_out', 0),
-            datetime.now()
-        ))
+        # آخر قياس قبل الإدراج (لتحديث مخزن الخصائص المتدحرجة وحساب معدل الشبكة)
+        previous = _latest_metric(device['id'])
+        previous_metric_id = previous['id'] if previous else None
+        timestamp = datetime.now()
+        network_in_rate, network_out_rate = _network_rates(
+            previous, data.get('network_in', 0), data.get('network_out', 0), timestamp)
+        
+        try:
+            metric_id = execute_db('''
+                INSERT INTO device_metrics 
+                (device_id, cpu_usage, ram_usage, disk_usage, temperature, battery_level, network_in, network_out, timestamp,
+                 cpu_max, cpu_p95, ram_max, ram_p95, temperature_max, temperature_p95, network_in_rate, network_out_rate,
+                 sample_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                device['id'],
+                data.get('cpu_usage', 0),
+                data.get('ram_usage', 0),
+                data.get('disk_usage', 0),
+                temperature,  # None إذا كانت 0 أو غير موجودة
+                data.get('battery_level'),
+                data.get('network_in', 0),
+                data.get('network_out', 0),
+                timestamp,
+                *_window_stats(data),
+                network_in_rate,
+                network_out_rate,
+                sample_id
+            ))
+        except sqlite3.IntegrityError:
+            # إعادة إرسال متزامنة لنفس القياس أُدرجت بعد الفحص أعلاه (idx_device_metrics_sample)
+            get_db().rollback()
+            duplicate = _duplicate_report(data, device, sample_id) if sample_id is not None else None
+            if duplicate:
+                return duplicate
+            raise
+        METRICS_INGESTED.inc(source='report')
         
         # تحديث آخر ظهور والحالة
         # تحديث الحالة بناءً على القياسات (استخدام temperature المحددة أعلاه)
@@ -820,14 +1163,178 @@ def api_report_metrics():
             WHERE id = ?
         ''', (status, device['id']))
         
-        return jsonify({
+        # إبطال التنبؤ المحفوظ لأن هناك قياساً جديداً
+        prediction_cache.invalidate(device['id'])
+        feature_store.update(device['id'], previous_metric_id, metric_id, {
+            'cpu_usage': data.get('cpu_usage', 0),
+            'ram_usage': data.get('ram_usage', 0),
+            'temperature': temperature
+        })
+        
+        # كشف الشذوذ لحظة الاستقبال وإصدار التنبيهات فوراً
+        anomalies = anomaly_detector.observe(device['id'], {
+            'cpu_usage': data.get('cpu_usage', 0),
+            'ram_usage': data.get('ram_usage', 0),
+            'temperature': temperature
+        }, received_at)
+        anomaly_alerts = _emit_anomaly_alerts(device, anomalies, received_at) if anomalies else 0
+        
+        return jsonify(_report_response(data, {
             'success': True, 
             'metric_id': metric_id,
             'device_id': device['id'],
-            'status': status
+            'status': status,
+            'anomaly_alerts': anomaly_alerts,
+            # العميل يستخدم metric_id أساساً للقياس التالي ويختار صيغة الإرسال
+            'wire': {'delta': True, 'encodings': SUPPORTED_ENCODINGS}
+        }))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _duplicate_report(data, device, sample_id):
+    """رد إعادة إرسال قياس محفوظ مسبقاً بنفس sample_id (None إذا لم يُحفظ)"""
+    stored = query_db('SELECT id FROM device_metrics WHERE device_id = ? AND sample_id = ?',
+                      (device['id'], sample_id), one=True)
+    if not stored:
+        return None
+    return jsonify(_report_response(data, {
+        'success': True,
+        'metric_id': stored['id'],
+        'device_id': device['id'],
+        'status': device['status'],
+        'anomaly_alerts': 0,
+        'duplicate': True,
+        'wire': {'delta': True, 'encodings': SUPPORTED_ENCODINGS}
+    }))
+
+def _report_response(data, response):
+    """إضافة الإجراءات المعلقة والإعدادات لرد إرسال القياسات (توفير طلب ومصادقة ثانية لكل دورة)"""
+    if data.get('include_actions'):
+        response['actions'] = pending_actions_for_device(response['device_id'])
+    if data.get('include_actions') or data.get('include_config'):
+        response['config'] = _device_config()
+    return response
+
+@devices_bp.route('/api/report/batch', methods=['POST'])
+def api_report_metrics_batch():
+    """API لإرسال القياسات المخزنة محلياً أثناء انقطاع الاتصال دفعة واحدة
+
+    كل قياس يحمل sampled_at (وقت أخذه بثواني epoch) فيُحفظ بوقته الحقيقي.
+    القياسات القديمة لا تمر على كاشف الشذوذ ولا تغير حالة الجهاز - القياس
+    المباشر عبر /api/report هو ما يعكس الحالة الحالية.
+    """
+    if not BATCH_INGEST_SLOTS.acquire(blocking=False):
+        response = jsonify({'error': 'الخادم مشغول، أعد المحاولة لاحقاً'})
+        response.headers['Retry-After'] = str(BATCH_RETRY_AFTER_SECONDS)
+        return response, 503
+    
+    BATCH_INGEST_IN_FLIGHT.inc()
+    try:
+        try:
+            data = _request_payload()
+        except (ValueError, zlib.error) as e:
+            return jsonify({'error': f'جسم الطلب غير صالح: {e}'}), 400
+        device_token = request.headers.get('X-Device-Token') or data.get('device_token')
+        
+        if not device_token:
+            return jsonify({'error': 'يجب توفير device_token'}), 401
+        
+        device = query_db('SELECT * FROM devices WHERE device_token = ? AND is_active = 1', (device_token,), one=True)
+        
+        if not device:
+            return jsonify({'error': 'الجهاز غير موجود أو غير مفعل'}), 404
+        
+        samples = data.get('samples')
+        if not isinstance(samples, list) or not samples:
+            return jsonify({'error': 'يجب توفير قائمة samples'}), 400
+        if len(samples) > MAX_BATCH_SAMPLES:
+            return jsonify({'error': f'الحد الأقصى {MAX_BATCH_SAMPLES} قياس في الدفعة'}), 413
+        
+        # القياسات التي حفظها الخادم في إرسال سابق (انتهت مهلة الرد قبل وصوله للعميل) لا تُدرج مرة أخرى
+        sample_ids = {_sample_id(sample) for sample in samples if isinstance(sample, dict)} - {None}
+        seen = set()
+        if sample_ids:
+            placeholders = ','.join('?' * len(sample_ids))
+            seen = {row['sample_id'] for row in query_db(f'''
+                SELECT sample_id FROM device_metrics
+                WHERE device_id = ? AND sample_id IN ({placeholders})
+            ''', (device['id'], *sample_ids))}
+        
+        now = time.time()
+        timed_samples = []
+        for sample in samples:
+            if not isinstance(sample, dict):
+                continue
+            sample_id = _sample_id(sample)
+            if sample_id is not None:
+                if sample_id in seen:
+                    continue
+                seen.add(sample_id)
+            try:
+                sampled_at = float(sample.get('sampled_at'))
+            except (TypeError, ValueError):
+                sampled_at = now
+            # ساعة الجهاز قد تكون متقدمة على الخادم
+            timed_samples.append((datetime.fromtimestamp(min(sampled_at, now)), sample))
+        timed_samples.sort(key=lambda item: item[0])
+        if not timed_samples:
+            return jsonify({'success': True, 'accepted': 0, 'duplicates': len(samples), 'device_id': device['id']})
+        
+        # معدل الشبكة لكل قياس مقابل القياس السابق له زمنياً (أول قياس مقابل ما قبل الدفعة)
+        previous = _latest_metric(device['id'], before=timed_samples[0][0])
+        rows = []
+        for timestamp, sample in timed_samples:
+            network_in = sample.get('network_in', 0)
+            network_out = sample.get('network_out', 0)
+            network_in_rate, network_out_rate = _network_rates(previous, network_in, network_out, timestamp)
+            previous = {'network_in': network_in, 'network_out': network_out, 'timestamp': timestamp}
+            
+            rows.append((
+                device['id'],
+                sample.get('cpu_usage', 0),
+                sample.get('ram_usage', 0),
+                sample.get('disk_usage', 0),
+                _clean_temperature(sample.get('temperature')),
+                sample.get('battery_level'),
+                network_in,
+                network_out,
+                timestamp,
+                *_window_stats(sample),
+                network_in_rate,
+                network_out_rate,
+                _sample_id(sample)
+            ))
+        
+        db = get_db()
+        # القياس الذي أدرجته دفعة متزامنة بعد الفحص أعلاه يُتجاهل بدلاً من فشل الدفعة كلها
+        cursor = db.executemany('''
+            INSERT INTO device_metrics 
+            (device_id, cpu_usage, ram_usage, disk_usage, temperature, battery_level, network_in, network_out, timestamp,
+             cpu_max, cpu_p95, ram_max, ram_p95, temperature_max, temperature_p95, network_in_rate, network_out_rate,
+             sample_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(device_id, sample_id) WHERE sample_id IS NOT NULL DO NOTHING
+        ''', rows)
+        accepted = cursor.rowcount
+        db.execute('UPDATE devices SET last_seen = CURRENT_TIMESTAMP WHERE id = ?', (device['id'],))
+        db.commit()
+        
+        # القياسات المتأخرة قد تقع داخل نافذة الخصائص المتدحرجة - إعادة بنائها عند الطلب
+        prediction_cache.invalidate(device['id'])
+        feature_store.discard(device['id'])
+        METRICS_INGESTED.inc(accepted, source='batch')
+        
+        return jsonify({
+            'success': True,
+            'accepted': accepted,
+            'duplicates': len(samples) - accepted,
+            'device_id': device['id']
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        BATCH_INGEST_IN_FLIGHT.dec()
+        BATCH_INGEST_SLOTS.release()
 
 @devices_bp.route('/api/<int:device_id>/predict', methods=['GET'])
 @require_login
@@ -848,13 +1355,11 @@ def api_predict_device(device_id):
         if not latest_metric:
             return jsonify({'error': 'لا توجد قياسات متاحة'}), 404
         
-        # الحصول على القياسات التاريخية
-        historical_metrics = query_db('''
-            SELECT * FROM device_metrics 
-            WHERE device_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT 20
-        ''', (device_id,))
+        # إذا لم يصل قياس جديد منذ آخر تنبؤ، إرجاع النتيجة المحفوظة مباشرة
+        # (معرّف آخر قياس هو إصدار البيانات، فيبقى صحيحاً حتى مع عدة عمال)
+        cached_prediction = prediction_cache.get(device_id, latest_metric['id'])
+        if cached_prediction is not None:
+            return jsonify(cached_prediction)
         
         device_data = {
             'cpu_usage': latest_metric['cpu_usage'] if latest_metric['cpu_usage'] is not None else 0,
@@ -864,17 +1369,31 @@ def api_predict_device(device_id):
             'battery_level': latest_metric['battery_level']
         }
         
-        historical_data = [
-            {
-                'cpu_usage': m['cpu_usage'] if m['cpu_usage'] is not None else 0,
-                'ram_usage': m['ram_usage'] if m['ram_usage'] is not None else 0,
-                'temperature': m['temperature'] if (m['temperature'] is not None and m['temperature'] > 0) else None
-            }
-            for m in historical_metrics
-        ]
+        # خصائص الاتجاه من المخزن المتدحرج (تُحدَّث مع كل قياس)، وإعادة بنائها
+        # من القياسات التاريخية فقط إذا لم تكن النافذة محدّثة حتى آخر قياس
+        features = feature_store.get(device_id, latest_metric['id'])
+        if features is None:
+            historical_metrics = query_db('''
+                SELECT * FROM device_metrics 
+                WHERE device_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            ''', (device_id, feature_store.window_size))
+            
+            historical_data = [
+                {
+                    'id': m['id'],
+                    'cpu_usage': m['cpu_usage'] if m['cpu_usage'] is not None else 0,
+                    'ram_usage': m['ram_usage'] if m['ram_usage'] is not None else 0,
+                    'temperature': m['temperature'] if (m['temperature'] is not None and m['temperature'] > 0) else None
+                }
+                for m in historical_metrics
+            ]
+            features = feature_store.rebuild(device_id, historical_data)
         
         # الحصول على التنبؤ باستخدام النظام الذكي
-        prediction = smart_predictor.predict_failure(device_data, historical_data if len(historical_data) > 1 else None)
+        prediction = smart_predictor.predict_failure(device_data, features=features)
+        prediction_cache.set(device_id, latest_metric['id'], prediction)
         
         return jsonify(prediction)
     except Exception as e:
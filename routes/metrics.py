@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مسار /metrics بصيغة Prometheus وقياس زمن كل طلب
+يُسجل لكل طلب زمنه وحجم رده وعدد استعلامات قاعدة البيانات وزمنها حسب
+الـ blueprint والـ endpoint، وتُقرأ إحصائيات الذاكرة المؤقتة والطوابير وقت الطلب
+"""
+
+import math
+import os
+import secrets
+import time
+
+from flask import Blueprint, Response, g, jsonify, request
+
+from models.database import query_db
+from models.query_profiler import query_profiler
+from models.n_plus_one import n_plus_one_detector
+from models.profiler_settings import ProfilerSettings, refresh_profiler_settings
+from routes.auth import require_login, require_role
+from models.metrics import (
+    metrics,
+    HTTP_REQUEST_DURATION,
+    HTTP_RESPONSE_SIZE,
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_SECONDS
+)
+from ml_models.prediction_cache import prediction_cache
+from ml_models.feature_store import feature_store
+from ml_models.anomaly_detector import anomaly_detector
+from ml_models.fleet_sweeper import fleet_sweeper
+from models.action_notifier import action_notifier
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# إذا حُدد، يجب أن يرسل Prometheus الترويسة Authorization: Bearer <METRICS_TOKEN>
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# إنشاء كائن إعدادات محلل الاستعلامات المشتركة بين العمال
+query_profiler_settings = ProfilerSettings(
+    'query_profiler_config', 'إعدادات محلل استعلامات قاعدة البيانات', query_profiler.configure)
+
+
+def _before_request():
+    # خيط كتابة ملف مقاييس العامل (عند التجميع بين العمال)
+    metrics.ensure_flusher()
+    # تفعيل المحللات من واجهة الأدمن (من أي عامل)
+    refresh_profiler_settings()
+    g.metrics_started = time.perf_counter()
+    g.metrics_db_queries = 0
+    g.metrics_db_seconds = 0.0
+
+
+def _after_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+
+    blueprint = request.blueprint or ''
+    # اسم الـ endpoint وليس المسار حتى لا تتضخم التسميات (مثلاً /devices/api/<id>)
+    endpoint = request.endpoint or 'unmatched'
+
+    HTTP_REQUEST_DURATION.observe(
+        time.perf_counter() - started,
+        blueprint=blueprint, endpoint=endpoint, method=request.method, status=response.status_code)
+    HTTP_REQUEST_DB_QUERIES.observe(g.metrics_db_queries, blueprint=blueprint, endpoint=endpoint)
+    HTTP_REQUEST_DB_SECONDS.observe(g.metrics_db_seconds, blueprint=blueprint, endpoint=endpoint)
+    if response.content_length is not None:
+        HTTP_RESPONSE_SIZE.observe(response.content_length, blueprint=blueprint, endpoint=endpoint)
+    return response
+
+
+def init_request_metrics(app):
+    """تسجيل قياس الطلبات على التطبيق"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+# إحصائيات في ذاكرة كل عامل (تُجمع بين العمال مثل باقي المقاييس)
+@metrics.register_collector
+def _collect_caches():
+    cache = prediction_cache.stats()
+    store = feature_store.stats()
+    detector = anomaly_detector.stats()
+    notifier = action_notifier.stats()
+    lookups = cache['hits'] + cache['misses']
+    return [
+        ('prediction_cache_hits_total', 'counter', 'التنبؤات المرجعة من الذاكرة المؤقتة', [({}, cache['hits'])]),
+        ('prediction_cache_misses_total', 'counter', 'التنبؤات المحسوبة من جديد', [({}, cache['misses'])]),
+        ('prediction_cache_hit_ratio', 'gauge', 'نسبة إصابة الذاكرة المؤقتة للتنبؤات',
+         [({}, cache['hits'] / lookups if lookups else None)]),
+        ('prediction_cache_entries', 'gauge', 'عدد التنبؤات المحفوظة', [({}, cache['size'])]),
+        ('feature_store_updates_total', 'counter', 'تحديثات الخصائص المتدحرجة مع كل قياس', [({}, store['updates'])]),
+        ('feature_store_rebuilds_total', 'counter', 'إعادة بناء الخصائص من قاعدة البيانات', [({}, store['rebuilds'])]),
+        ('feature_store_devices', 'gauge', 'الأجهزة المحفوظة في مخزن الخصائص', [({}, store['devices'])]),
+        ('anomaly_observed_total', 'counter', 'القياسات التي مرت على كاشف الشذوذ', [({}, detector['observed'])]),
+        ('anomaly_detected_total', 'counter', 'حالات الشذوذ المكتشفة', [({}, detector['anomalies'])]),
+        ('actions_long_poll_waiting', 'gauge', 'طلبات long-poll المنتظرة للإجراءات', [({}, notifier['waiting_requests'])]),
+        ('actions_long_poll_rejected_total', 'counter', 'طلبات long-poll المردودة فوراً لامتلاء أماكن الانتظار',
+         [({}, notifier['rejected'])])
+    ]
+
+
+@metrics.register_collector(per_process=False)
+def _collect_queues():
+    # من قاعدة البيانات: نفس القيمة في كل العمال فتُقرأ مرة واحدة
+    pending = query_db("SELECT COUNT(*) AS count FROM system_actions WHERE status = 'pending'", one=True)
+    last_sweep = fleet_sweeper.stored_stats()['last_sweep'] or {}
+    return [
+        ('actions_pending', 'gauge', 'الإجراءات المعلقة بانتظار الأجهزة', [({}, pending['count'] if pending else 0)]),
+        ('fleet_sweep_backlog', 'gauge', 'الأجهزة التي تنتظر إعادة التقييم', [({}, fleet_sweeper.backlog())]),
+        ('fleet_sweep_last_duration_seconds', 'gauge', 'مدة آخر فحص دوري للأجهزة',
+         [({}, last_sweep.get('duration_seconds'))])
+    ]
+
+
+@metrics_bp.route('/metrics')
+def prometheus_metrics():
+    """المقاييس بصيغة Prometheus النصية"""
+    try:
+        if METRICS_TOKEN:
+            scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+            if scheme != 'Bearer' or not secrets.compare_digest(token.strip(), METRICS_TOKEN):
+                return jsonify({'error': 'غير مصرح'}), 401
+
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@metrics_bp.route('/metrics/queries')
+@require_login
+@require_role('admin')
+def query_profile():
+    """أكثر الاستعلامات كلفة حسب البصمة (sort: total, count, p95, max)"""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 200)
+        sort_by = request.args.get('sort', 'total')
+        return jsonify({
+            'profiler': query_profiler.stats(),
+            'queries': query_profiler.top(limit=limit, sort_by=sort_by)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@metrics_bp.route('/metrics/queries/slow')
+@require_login
+@require_role('admin')
+def slow_queries():
+    """آخر الاستعلامات الأبطأ من الحد مع خطة التنفيذ"""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        return jsonify({
+            'slow_threshold_ms': query_profiler.slow_threshold_ms,
+            'queries': query_profiler.slow_queries(limit=limit)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@metrics_bp.route('/metrics/queries/n-plus-one')
+@require_login
+@require_role('admin')
+def n_plus_one_reports():
+    """آخر الطلبات التي كررت نفس الاستعلام أكثر من الحد مع مواضع الاستدعاء"""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        return jsonify({
+            'mode': n_plus_one_detector.mode,
+            'threshold': n_plus_one_detector.threshold,
+            'reports': n_plus_one_detector.reports(limit=limit)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@metrics_bp.route('/metrics/queries/toggle', methods=['POST'])
+@require_login
+@require_role('admin')
+def toggle_query_profiler():
+    """تفعيل أو إيقاف المحلل وتغيير حد الاستعلام البطيء وتصفيره (في كل العمال)
+
+    يُحفظ في جدول settings ويطبقه كل عامل خلال PROFILER_SETTINGS_REFRESH ثانية
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        changes = {}
+        if 'enabled' in data:
+            changes['enabled'] = bool(data['enabled'])
+        if 'slow_threshold_ms' in data:
+            try:
+                threshold = float(data['slow_threshold_ms'])
+            except (TypeError, ValueError):
+                threshold = -1
+            if not (threshold >= 0 and math.isfinite(threshold)):
+                return jsonify({'error': 'slow_threshold_ms يجب أن يكون رقماً موجباً'}), 400
+            changes['slow_threshold_ms'] = threshold
+        if data.get('reset'):
+            changes['reset_at'] = time.time()
+        if changes:
+            query_profiler_settings.update(**changes)
+        return jsonify({
+            'success': True,
+            'refresh_seconds': query_profiler_settings.refresh_seconds,
+            'profiler': query_profiler.stats()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,87 +1,183 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-واجهة تدريب الذكاء الاصطناعي
-"""
-
-from flask import Blueprint, request, jsonify, session
-from routes.auth import require_login, require_role
-from ml_models.ml_trainer import ml_trainer
-
-ml_training_bp = Blueprint('ml_training', __name__, url_prefix='/ml')
-
-@ml_training_bp.route('/train', methods=['POST'])
-@require_login
-@require_role('admin', 'manager')
-def train_model():
-    """تدريب النموذج"""
-    try:
-        data = request.json or {}
-        use_synthetic = data.get('use_synthetic', True)
-        use_db = data.get('use_db', True)
-        
-        # تدريب النموذج
-        success = ml_trainer.train_model(use_synthetic=use_synthetic, use_db=use_db)
-        
-        if success:
-            return jsonify({
-                'success': True,
-                'message': 'تم تدريب النموذج بنجاح',
-                'model_info': ml_trainer.model_info
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'فشل في تدريب النموذج - لا توجد بيانات كافية'
-            }), 400
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'خطأ في تدريب النموذج: {str(e)}'
-        }), 500
-
-@ml_training_bp.route('/retrain', methods=['POST'])
-@require_login
-@require_role('admin', 'manager')
-def retrain_model():
-    """إعادة تدريب النموذج"""
-    try:
-        data = request.json or {}
-        use_synthetic = data.get('use_synthetic', True)
-        
-        # إعادة تدريب النموذج
-        success = ml_trainer.retrain_model(use_synthetic=use_synthetic)
-        
-        if success:
-            return jsonify({
-                'success': True,
-                'message': 'تم إعادة تدريب النموذج بنجاح',
-                'model_info': ml_trainer.model_info
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'فشل في إعادة تدريب النموذج'
-            }), 400
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'خطأ في إعادة تدريب النموذج: {str(e)}'
-        }), 500
-
-@ml_training_bp.route('/status', methods=['GET'])
-@require_login
-def model_status():
-    """الحصول على حالة النموذج"""
-    try:
-        return jsonify({
-            'success': True,
-            'model_info': ml_trainer.model_info,
-            'model_loaded': ml_trainer.failure_classifier is not None
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'خطأ في الحصول على حالة النموذج: {str(e)}'
-        }), 500
-
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+واجهة تدريب الذكاء الاصطناعي
+"""
+
+from flask import Blueprint, request, jsonify, session
+from routes.auth import require_login, require_role
+from ml_models.ml_trainer import ml_trainer
+from ml_models.model_memory import workers_memory_report
+from ml_models.prediction_cache import prediction_cache
+from ml_models.feature_store import feature_store
+from ml_models.anomaly_detector import anomaly_detector
+from ml_models.pipeline_profiler import pipeline_profiler
+from models.profiler_settings import ProfilerSettings
+import math
+import os
+import time
+
+ml_training_bp = Blueprint('ml_training', __name__, url_prefix='/ml')
+
+# إنشاء كائن إعدادات قياس مراحل التنبؤ المشتركة بين العمال (تُقرأ من routes/metrics.py مع كل طلب)
+pipeline_profiler_settings = ProfilerSettings(
+    'pipeline_profiler_config', 'إعدادات قياس مراحل التنبؤ', pipeline_profiler.configure)
+
+@ml_training_bp.route('/train', methods=['POST'])
+@require_login
+@require_role('admin', 'manager')
+def train_model():
+    """تدريب النموذج"""
+    try:
+        data = request.json or {}
+        use_synthetic = data.get('use_synthetic', True)
+        use_db = data.get('use_db', True)
+        
+        # تدريب النموذج
+        success = ml_trainer.train_model(use_synthetic=use_synthetic, use_db=use_db)
+        
+        if success:
+            # التنبؤات المحفوظة حُسبت بالنموذج القديم
+            prediction_cache.clear()
+            return jsonify({
+                'success': True,
+                'message': 'تم تدريب النموذج بنجاح',
+                'model_info': ml_trainer.model_info
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'فشل في تدريب النموذج - لا توجد بيانات كافية'
+            }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'خطأ في تدريب النموذج: {str(e)}'
+        }), 500
+
+@ml_training_bp.route('/retrain', methods=['POST'])
+@require_login
+@require_role('admin', 'manager')
+def retrain_model():
+    """إعادة تدريب النموذج"""
+    try:
+        data = request.json or {}
+        use_synthetic = data.get('use_synthetic', True)
+        
+        # إعادة تدريب النموذج
+        success = ml_trainer.retrain_model(use_synthetic=use_synthetic)
+        
+        if success:
+            prediction_cache.clear()
+            return jsonify({
+                'success': True,
+                'message': 'تم إعادة تدريب النموذج بنجاح',
+                'model_info': ml_trainer.model_info
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'فشل في إعادة تدريب النموذج'
+            }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'خطأ في إعادة تدريب النموذج: {str(e)}'
+        }), 500
+
+@ml_training_bp.route('/status', methods=['GET'])
+@require_login
+def model_status():
+    """الحصول على حالة النموذج"""
+    try:
+        return jsonify({
+            'success': True,
+            'model_info': ml_trainer.model_info,
+            'model_loaded': ml_trainer.failure_classifier is not None,
+            'prediction_cache': prediction_cache.stats(),
+            'feature_store': feature_store.stats(),
+            'anomaly_detector': anomaly_detector.stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'خطأ في الحصول على حالة النموذج: {str(e)}'
+        }), 500
+
+@ml_training_bp.route('/profile', methods=['GET'])
+@require_login
+@require_role('admin', 'manager')
+def pipeline_profile():
+    """زمن كل مرحلة في سلسلة التنبؤ وآخر التقاطات cProfile (من كل العمال)"""
+    try:
+        return jsonify({
+            'success': True,
+            'profiler': pipeline_profiler.stats(),
+            'stages': pipeline_profiler.report(),
+            'captures': pipeline_profiler.captures() if request.args.get('captures', '1') == '1' else []
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'خطأ في الحصول على قياسات التنبؤ: {str(e)}'
+        }), 500
+
+@ml_training_bp.route('/profile', methods=['POST'])
+@require_login
+@require_role('admin')
+def configure_pipeline_profile():
+    """تفعيل أو إيقاف قياس المراحل وتحديد نسبة cProfile وتصفيره (في كل العمال)
+
+    يُحفظ في جدول settings ويطبقه كل عامل خلال PROFILER_SETTINGS_REFRESH ثانية
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        changes = {}
+        if 'enabled' in data:
+            changes['enabled'] = bool(data['enabled'])
+        if 'cprofile_sample_rate' in data:
+            try:
+                rate = float(data['cprofile_sample_rate'])
+            except (TypeError, ValueError):
+                rate = math.nan
+            if not math.isfinite(rate):
+                return jsonify({
+                    'success': False,
+                    'message': 'cprofile_sample_rate يجب أن يكون رقماً بين 0 و 1'
+                }), 400
+            changes['cprofile_sample_rate'] = max(0.0, min(1.0, rate))
+        if data.get('reset'):
+            changes['reset_at'] = time.time()
+        if changes:
+            pipeline_profiler_settings.update(**changes)
+        return jsonify({
+            'success': True,
+            'refresh_seconds': pipeline_profiler_settings.refresh_seconds,
+            'profiler': pipeline_profiler.stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'خطأ في ضبط قياسات التنبؤ: {str(e)}'
+        }), 500
+
+@ml_training_bp.route('/memory', methods=['GET'])
+@require_login
+@require_role('admin', 'manager')
+def model_memory():
+    """تقرير استهلاك الذاكرة للنماذج في كل عامل"""
+    try:
+        load_stats = ml_trainer.load_stats
+        return jsonify({
+            'success': True,
+            'model_loaded': ml_trainer.failure_classifier is not None,
+            # إذا حُمّل النموذج في عملية أخرى فهو موروث من العملية الرئيسية (تحميل مسبق)
+            'preloaded': load_stats.get('loaded_in_pid') not in (None, os.getpid()),
+            'load_stats': load_stats,
+            'memory': workers_memory_report()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'خطأ في الحصول على تقرير الذاكرة: {str(e)}'
+        }), 500